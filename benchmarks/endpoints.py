@@ -0,0 +1,349 @@
+"""Time the Neo4j sync job, the topology API and the REST list endpoints on synthetic inventories of several sizes.
+
+For each size, a `SyntheticVPNInventory` is grown inside one database transaction that is rolled back at the end,
+so the configured database is left as it was (its existing objects do count towards the results, so prefer an
+empty one). Every benchmark is run once to warm up and then `--repeat` times; the median wall time, the number of
+database queries, the peak RSS of this process and the response size are recorded.
+
+By default `SyncNeo4jJob.run` writes to a fake, in-process Neo4j driver (so the job's Nautobot side and payload
+building are measured, plus the number of Neo4j statements and rows it would send) and the topology views read
+from the relational backend. With `--neo4j` the sync writes to the configured Neo4j (replacing its VPNNode
+subgraph, so point it at a disposable database) and the views read it back through the Neo4j backend. Response
+caches and the topology snapshot are disabled, so every timed request builds its response.
+
+Each run is appended to a JSON history file and compared with the previous run recorded there:
+
+    NAUTOBOT_CONFIG=... python benchmarks/endpoints.py --sizes 1000 10000 --history benchmarks/history.json
+"""
+
+import argparse
+import copy
+import datetime
+import json
+import os
+import statistics
+import subprocess
+import sys
+import threading
+import time
+from contextlib import contextmanager
+from pathlib import Path
+
+import nautobot
+
+nautobot.setup()
+
+# pylint: disable=wrong-import-position
+from django.conf import settings  # noqa: E402
+from django.contrib.auth import get_user_model  # noqa: E402
+from django.db import connection, transaction  # noqa: E402
+from django.test import Client, override_settings  # noqa: E402
+from django.test.utils import CaptureQueriesContext  # noqa: E402
+from django.urls import reverse  # noqa: E402
+
+from nautobot_app_vpn import __version__  # noqa: E402
+from nautobot_app_vpn.jobs.sync_neo4j_job import SyncNeo4jJob  # noqa: E402
+from nautobot_app_vpn.synthetic import SyntheticVPNInventory  # noqa: E402
+from nautobot_app_vpn.topology import driver as neo4j_driver  # noqa: E402
+from nautobot_app_vpn.topology.writer import process_rss_mib  # noqa: E402
+
+API = "plugins-api:nautobot_app_vpn-api"
+ENDPOINTS = {
+    "topology": (f"{API}:vpn-topology-neo4j", {}),
+    "topology_filtered": (f"{API}:vpn-topology-neo4j", {"role": "primary"}),
+    "filter_options": (f"{API}:vpn-topology-filters", {}),
+    "ipsectunnel_list": (f"{API}:ipsectunnel-list", {}),
+    "ikegateway_list": (f"{API}:ikegateway-list", {}),
+}
+
+
+class Rollback(Exception):
+    """Raised to roll back the benchmark transaction."""
+
+
+class FakeResult:
+    """Empty result of a fake Neo4j query."""
+
+    counters = type("Counters", (), {"properties_set": 0})()
+
+    def __iter__(self):
+        """No records."""
+        return iter(())
+
+    def consume(self):
+        """Return the (empty) summary."""
+        return self
+
+    def single(self):
+        """No record."""
+        return None
+
+
+class FakeSession:
+    """Neo4j session counting statements and parameter rows instead of sending them."""
+
+    def __init__(self, counter):
+        """Count into `counter` (``{"statements", "rows"}``)."""
+        self.counter = counter
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        return False
+
+    def run(self, query, parameters=None, **kwargs):  # pylint: disable=unused-argument
+        """Record one statement and the size of its list parameters."""
+        self.counter["statements"] += 1
+        self.counter["rows"] += sum(len(value) for value in (parameters or {}).values() if isinstance(value, list))
+        return FakeResult()
+
+    def execute_write(self, work, *args, **kwargs):
+        """Run `work` with this session standing in for the transaction."""
+        return work(self, *args, **kwargs)
+
+    execute_read = execute_write
+
+
+class FakeDriver:
+    """Neo4j driver handing out counting `FakeSession`s."""
+
+    def __init__(self):
+        """Start with zeroed counters."""
+        self.counter = {"statements": 0, "rows": 0}
+
+    def verify_connectivity(self):
+        """Always reachable."""
+
+    def session(self, **kwargs):  # pylint: disable=unused-argument
+        """Return a new counting session."""
+        return FakeSession(self.counter)
+
+    def close(self):
+        """Nothing to close."""
+
+
+@contextmanager
+def fake_neo4j_driver():
+    """Make the shared driver of this process a `FakeDriver` (see topology.driver) while the block runs."""
+    # pylint: disable=protected-access
+    fake = FakeDriver()
+    with neo4j_driver._lock:
+        previous = neo4j_driver._driver, neo4j_driver._driver_pid, neo4j_driver._last_healthy
+        neo4j_driver._driver, neo4j_driver._driver_pid = fake, os.getpid()
+    try:
+        yield fake
+    finally:
+        with neo4j_driver._lock:
+            neo4j_driver._driver, neo4j_driver._driver_pid, neo4j_driver._last_healthy = previous
+
+
+class PeakRSS:
+    """Sample the RSS of this process in a background thread and keep the maximum."""
+
+    def __init__(self, interval=0.005):
+        """Sample every `interval` seconds."""
+        self.interval = interval
+        self.peak = None
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._sample, daemon=True)
+
+    def _sample(self):
+        while True:
+            rss = process_rss_mib()
+            if rss is not None and (self.peak is None or rss > self.peak):
+                self.peak = rss
+            if self._stop.wait(self.interval):
+                return
+
+    def __enter__(self):
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc_info):
+        self._stop.set()
+        self._thread.join()
+        return False
+
+
+def measure(func, repeat):
+    """Call `func` once to warm up, then `repeat` times, and return the recorded metrics.
+
+    `func` returns the response size in bytes (or None); the query count is that of the last run.
+    """
+    func()
+    timings = []
+    with PeakRSS() as rss:
+        for _ in range(repeat):
+            with CaptureQueriesContext(connection) as queries:
+                started = time.perf_counter()
+                size = func()
+                timings.append(time.perf_counter() - started)
+    return {
+        "seconds": statistics.median(timings),
+        "queries": len(queries),
+        "peak_rss_mib": rss.peak,
+        "response_bytes": size,
+    }
+
+
+def get_endpoint(client, viewname, params):
+    """GET an endpoint and return the size of its (possibly streamed) body."""
+    response = client.get(reverse(viewname), params)
+    if response.status_code != 200:
+        raise RuntimeError(f"GET {reverse(viewname)} {params} returned {response.status_code}")
+    if response.streaming:
+        return sum(len(chunk) for chunk in response.streaming_content)
+    return len(response.content)
+
+
+def run_sync_job():
+    """Run a full (non-incremental) SyncNeo4jJob, so every run rewrites the whole graph."""
+    SyncNeo4jJob().run(incremental=False)
+
+
+def benchmark_overrides(use_neo4j):
+    """Settings for the benchmark: caches, snapshot and (without `use_neo4j`) Neo4j replaced by local stand-ins."""
+    plugins_config = copy.deepcopy(getattr(settings, "PLUGINS_CONFIG", {}))
+    app_config = plugins_config.setdefault("nautobot_app_vpn", {})
+    app_config["cache"] = {**(app_config.get("cache") or {}), "enabled": False}
+    app_config["sync"] = {**(app_config.get("sync") or {}), "write_snapshot": False}
+    app_config["realtime_sync"] = {**(app_config.get("realtime_sync") or {}), "enabled": False}
+    if not use_neo4j:
+        app_config["topology"] = {**(app_config.get("topology") or {}), "backend": "relational"}
+    overrides = {
+        "PLUGINS_CONFIG": plugins_config,
+        # Nothing written to the (rolled back) database may leave cache entries behind in the shared cache.
+        "CACHES": {**settings.CACHES, "default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}},
+        "ALLOWED_HOSTS": [*settings.ALLOWED_HOSTS, "testserver"],
+    }
+    if not use_neo4j:
+        overrides.update(NEO4J_URI="bolt://fake", NEO4J_USER="fake", NEO4J_PASSWORD="fake")  # noqa: S106
+    return overrides
+
+
+def run_benchmarks(args):
+    """Grow the inventory through `args.sizes` and return one result row per benchmark and size."""
+    results = []
+    try:
+        with transaction.atomic():
+            user = get_user_model().objects.create(username="vpn-benchmark", is_superuser=True, is_staff=True)
+            client = Client()
+            client.force_login(user)
+            inventory = SyntheticVPNInventory("benchmark", locations=args.locations, seed=args.seed)
+            for size in sorted(args.sizes):
+                while inventory.units < size:
+                    inventory.create(min(1000, size - inventory.units))
+                if connection.vendor == "postgresql":
+                    # Autovacuum cannot see the uncommitted rows; plan the queries for the current size.
+                    with connection.cursor() as cursor:
+                        cursor.execute("ANALYZE")
+
+                if args.neo4j:
+                    row = measure(run_sync_job, args.repeat)
+                else:
+                    with fake_neo4j_driver() as fake:
+                        row = measure(run_sync_job, args.repeat)
+                    runs = args.repeat + 1
+                    row["neo4j_statements"] = fake.counter["statements"] // runs
+                    row["neo4j_rows"] = fake.counter["rows"] // runs
+                results.append({"benchmark": "sync_job", "tunnels": size, **row})
+                print(f"{size:>8} tunnels  sync_job done", file=sys.stderr)
+
+                for name, (viewname, params) in ENDPOINTS.items():
+                    row = measure(
+                        lambda viewname=viewname, params=params: get_endpoint(client, viewname, params), args.repeat
+                    )
+                    results.append({"benchmark": name, "tunnels": size, **row})
+                print(f"{size:>8} tunnels  endpoints done", file=sys.stderr)
+            raise Rollback
+    except Rollback:
+        pass
+    return results
+
+
+def git_commit():
+    """Return the commit of the working tree this script lives in, or None."""
+    try:
+        return subprocess.run(  # noqa: S603
+            ["git", "rev-parse", "--short", "HEAD"],  # noqa: S607
+            cwd=Path(__file__).parent,
+            capture_output=True,
+            check=True,
+            text=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def previous_results(history):
+    """Index the most recent earlier result of every (benchmark, tunnels) pair in `history`."""
+    previous = {}
+    for run in history:
+        for row in run["results"]:
+            previous[(row["benchmark"], row["tunnels"])] = row
+    return previous
+
+
+def main():
+    """Run the benchmarks, print them next to the previous run and append them to the history file."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 10000], help="Tunnel counts")
+    parser.add_argument("--repeat", type=int, default=3, help="Timed runs per benchmark and size")
+    parser.add_argument("--locations", type=int, default=50, help="Locations of the synthetic inventory")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--neo4j", action="store_true", help="Sync to and read from the configured Neo4j")
+    parser.add_argument("--history", type=Path, default=Path(__file__).parent / "history.json")
+    parser.add_argument("--label", default="", help="Free-form label stored with the run, e.g. a release")
+    parser.add_argument(
+        "--max-slowdown",
+        type=float,
+        default=None,
+        help="Exit with status 1 if a median time exceeds the previous run's by this factor (e.g. 1.25)",
+    )
+    parser.add_argument("--json", action="store_true", help="Print the run as JSON")
+    args = parser.parse_args()
+
+    with override_settings(**benchmark_overrides(args.neo4j)):
+        results = run_benchmarks(args)
+
+    history = json.loads(args.history.read_text()) if args.history.exists() else []
+    previous = previous_results(history)
+    run = {
+        "timestamp": datetime.datetime.now(datetime.UTC).isoformat(timespec="seconds"),
+        "label": args.label,
+        "version": __version__,
+        "commit": git_commit(),
+        "database": connection.vendor,
+        "neo4j": args.neo4j,
+        "repeat": args.repeat,
+        "results": results,
+    }
+    history.append(run)
+    args.history.write_text(json.dumps(history, indent=2) + "\n")
+
+    if args.json:
+        print(json.dumps(run, indent=2))
+    else:
+        print(
+            f"{'benchmark':<18} {'tunnels':>8} {'median s':>9} {'vs prev':>8} {'queries':>8} {'peak MiB':>9} "
+            f"{'bytes':>10}"
+        )
+    regressions = []
+    for row in results:
+        before = previous.get((row["benchmark"], row["tunnels"]))
+        ratio = row["seconds"] / before["seconds"] if before and before["seconds"] else None
+        if ratio is not None and args.max_slowdown and ratio > args.max_slowdown:
+            regressions.append(f"{row['benchmark']} @ {row['tunnels']}: {ratio:.2f}x slower")
+        if not args.json:
+            print(
+                f"{row['benchmark']:<18} {row['tunnels']:>8} {row['seconds']:>9.4f} "
+                f"{f'{ratio:.2f}x' if ratio else '-':>8} {row['queries']:>8} "
+                f"{row['peak_rss_mib'] or 0:>9.1f} {row['response_bytes'] if row['response_bytes'] is not None else '-':>10}"
+            )
+    if regressions:
+        sys.exit("Slower than the previous run:\n" + "\n".join(regressions))
+
+
+if __name__ == "__main__":
+    main()
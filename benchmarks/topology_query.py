@@ -0,0 +1,251 @@
+"""Compare Neo4j round trips and wall time of the topology view query: legacy two-pass vs single-pass.
+
+Seeds a synthetic VPNNode / TUNNEL graph of each requested size into the Neo4j database configured for Nautobot
+(NEO4J_URI / NEO4J_USER / NEO4J_PASSWORD / NEO4J_DATABASE) and times both implementations on it. The VPNNode
+subgraph is replaced, so point it at a disposable database:
+
+    NAUTOBOT_CONFIG=... python benchmarks/topology_query.py --sizes 1000 10000 50000 --force
+"""
+
+import argparse
+import json
+import random
+import statistics
+import sys
+import time
+
+import nautobot
+
+nautobot.setup()
+
+# pylint: disable=wrong-import-position
+from nautobot_app_vpn.topology import backends  # noqa: E402
+from nautobot_app_vpn.topology.backends import Neo4jTopologyBackend, node_feature, tunnel_feature  # noqa: E402
+from nautobot_app_vpn.topology.driver import get_neo4j_database, get_neo4j_driver  # noqa: E402
+from nautobot_app_vpn.topology.writer import ChunkedGraphWriter, get_sync_settings  # noqa: E402
+
+COUNTRIES = ("US", "DE", "GB", "FR", "JP", "SG", "AU", "BR", "IN", "ZA")
+PLATFORMS = ("paloalto_panos", "cisco_asa", "fortinet_fortios")
+SCENARIOS = {"unfiltered": {}, "country": {"country": "de"}, "device": {"device": "de-fw-00001"}}
+
+
+class CountingSession:
+    """Session proxy counting `run()` calls, i.e. query round trips."""
+
+    def __init__(self, session, counter):
+        """Wrap `session`, incrementing `counter["runs"]` per query."""
+        self._session = session
+        self._counter = counter
+
+    def __enter__(self):
+        """Enter the wrapped session."""
+        self._session.__enter__()
+        return self
+
+    def __exit__(self, *exc_info):
+        """Exit the wrapped session."""
+        return self._session.__exit__(*exc_info)
+
+    def run(self, *args, **kwargs):
+        """Count and forward a query."""
+        self._counter["runs"] += 1
+        return self._session.run(*args, **kwargs)
+
+
+class CountingDriver:
+    """Driver proxy handing out CountingSessions."""
+
+    def __init__(self, driver, counter):
+        """Wrap `driver`."""
+        self._driver = driver
+        self._counter = counter
+
+    def session(self, **kwargs):
+        """Open a counted session."""
+        return CountingSession(self._driver.session(**kwargs), self._counter)
+
+
+def legacy_build_graph(driver, filters):
+    """The previous two-pass implementation: node query, then an edge query with the matched ids as a parameter."""
+    qp = {}
+    node_where = Neo4jTopologyBackend.build_node_where(filters, qp)
+    node_query = "MATCH (n:VPNNode)"
+    if node_where:
+        node_query += " WHERE " + " AND ".join(node_where)
+    node_query += " RETURN n"
+
+    devices_fc = {"type": "FeatureCollection", "features": []}
+    tunnels_fc = {"type": "FeatureCollection", "features": []}
+    with driver.session(database=get_neo4j_database()) as session:
+        nodes_map = {}
+        for rec in session.run(node_query, qp):
+            feat = node_feature(dict(rec["n"]))
+            if feat is not None:
+                devices_fc["features"].append(feat)
+                nodes_map[feat["properties"]["id"]] = feat
+
+        edge_qp = {}
+        edge_conds = Neo4jTopologyBackend.build_edge_filter(filters, edge_qp)
+        base = (
+            "MATCH (a:VPNNode)-[r:TUNNEL]->(b:VPNNode) "
+            "WHERE a.lat IS NOT NULL AND a.lon IS NOT NULL AND b.lat IS NOT NULL AND b.lon IS NOT NULL "
+        )
+        if nodes_map:
+            base += "AND (a.id IN $node_ids OR b.id IN $node_ids) "
+            edge_qp["node_ids"] = list(nodes_map)
+        if edge_conds:
+            base += "AND " + " AND ".join(edge_conds) + " "
+        for rec in session.run(base + "RETURN a AS a, b AS b, r AS r", edge_qp):
+            aprops, bprops, rprops = dict(rec["a"]), dict(rec["b"]), dict(rec["r"])
+            for props in (aprops, bprops):
+                if props.get("id") and props["id"] not in nodes_map:
+                    feat = node_feature(props)
+                    if feat is not None:
+                        devices_fc["features"].append(feat)
+                        nodes_map[props["id"]] = feat
+            feat = tunnel_feature(aprops, bprops, rprops)
+            if feat is not None:
+                tunnels_fc["features"].append(feat)
+    return Neo4jTopologyBackend.summarize(devices_fc, tunnels_fc)
+
+
+def single_pass_build_graph(driver, filters):
+    """The current Neo4jTopologyBackend implementation, run on `driver`."""
+    original = backends.verify_neo4j_connectivity
+    backends.verify_neo4j_connectivity = lambda: driver
+    try:
+        return Neo4jTopologyBackend().build_graph(filters)
+    finally:
+        backends.verify_neo4j_connectivity = original
+
+
+IMPLEMENTATIONS = {"two-pass": legacy_build_graph, "single-pass": single_pass_build_graph}
+
+
+def synthetic_graph(tunnels, seed):
+    """Yield ``("node", props)`` / ``("edge", data)`` items for `tunnels` tunnels between ~tunnels/4 sites."""
+    rng = random.Random(seed)
+    node_ids = []
+    for index in range(max(tunnels // 4, 2)):
+        country = COUNTRIES[index % len(COUNTRIES)]
+        name = f"{country.lower()}-fw-{index:05d}"
+        node_ids.append(name)
+        yield (
+            "node",
+            {
+                "id": name,
+                "name": name,
+                "label": name,
+                "status": "active",
+                "role": "firewall",
+                "platform_name": PLATFORMS[index % len(PLATFORMS)],
+                "country": country,
+                "location_name": f"{country} site {index % 50}",
+                "is_ha_pair": index % 7 == 0,
+                "device_names": [name],
+                "nautobot_device_pks": [f"pk-{index}"],
+                "lat": rng.uniform(-60, 60),
+                "lon": rng.uniform(-180, 180),
+            },
+        )
+    for index in range(tunnels):
+        source, target = rng.sample(node_ids, 2)
+        yield (
+            "edge",
+            {
+                "source_id": source,
+                "target_id": target,
+                "properties": {
+                    "nautobot_tunnel_pk": f"tunnel-{index}",
+                    "label": f"tunnel-{index}",
+                    "status": rng.choice(("active", "down", "planned")),
+                    "role": rng.choice(("primary", "secondary")),
+                    "ike_version": rng.choice(("ikev1", "ikev2")),
+                    "scope": "external",
+                    "local_ip": f"10.{index // 65536 % 256}.{index // 256 % 256}.{index % 256}",
+                    "peer_ip": f"172.16.{index // 256 % 256}.{index % 256}",
+                    "tooltip_details_json": json.dumps({"tunnel": f"tunnel-{index}"}),
+                },
+            },
+        )
+
+
+def clear_graph(session):
+    """Remove the VPNNode subgraph."""
+    session.run("MATCH (n:VPNNode) CALL { WITH n DETACH DELETE n } IN TRANSACTIONS OF 10000 ROWS").consume()
+
+
+def fingerprint(graph):
+    """Order-independent summary of a topology payload, to check both implementations agree."""
+    return (
+        sorted(f["properties"]["id"] for f in graph["devices"]["features"]),
+        sorted(f["properties"]["name"] for f in graph["tunnels"]["features"]),
+    )
+
+
+def main():
+    """Seed each size, time every implementation per scenario and print a table (or JSON)."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 10000, 50000], help="Tunnel counts")
+    parser.add_argument("--repeat", type=int, default=5, help="Timed runs per implementation and scenario")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--force", action="store_true", help="Replace an existing VPNNode subgraph")
+    parser.add_argument("--json", action="store_true", help="Print results as JSON")
+    args = parser.parse_args()
+
+    driver = get_neo4j_driver()
+    with driver.session(database=get_neo4j_database()) as session:
+        existing = session.run("MATCH (n:VPNNode) RETURN count(n) AS count").single()["count"]
+    if existing and not args.force:
+        sys.exit(f"Refusing to replace {existing} existing VPNNodes without --force.")
+
+    results = []
+    for size in args.sizes:
+        with driver.session(database=get_neo4j_database()) as session:
+            clear_graph(session)
+            writer = ChunkedGraphWriter(session, config={**get_sync_settings(), "batch_size": 5000})
+            writer.write_graph(synthetic_graph(size, args.seed))
+        for scenario, filters in SCENARIOS.items():
+            outputs = {}
+            for impl_name, impl in IMPLEMENTATIONS.items():
+                counter = {"runs": 0}
+                counting_driver = CountingDriver(driver, counter)
+                outputs[impl_name] = impl(counting_driver, filters)  # warm-up, also counts round trips
+                round_trips = counter["runs"]
+                timings = []
+                for _ in range(args.repeat):
+                    started = time.perf_counter()
+                    impl(driver, filters)
+                    timings.append(time.perf_counter() - started)
+                results.append(
+                    {
+                        "tunnels": size,
+                        "scenario": scenario,
+                        "implementation": impl_name,
+                        "round_trips": round_trips,
+                        "median_seconds": statistics.median(timings),
+                        "devices": outputs[impl_name]["meta"]["devices_count"],
+                        "tunnels_returned": outputs[impl_name]["meta"]["tunnels_count"],
+                    }
+                )
+            if len({repr(fingerprint(graph)) for graph in outputs.values()}) != 1:
+                print(f"WARNING: implementations disagree for {size} tunnels / {scenario}", file=sys.stderr)
+
+    with driver.session(database=get_neo4j_database()) as session:
+        clear_graph(session)
+
+    if args.json:
+        print(json.dumps(results, indent=2))
+        return
+    print(
+        f"{'tunnels':>8} {'scenario':<11} {'implementation':<12} {'trips':>5} {'median s':>9} {'devices':>8} {'edges':>7}"
+    )
+    for row in results:
+        print(
+            f"{row['tunnels']:>8} {row['scenario']:<11} {row['implementation']:<12} {row['round_trips']:>5} "
+            f"{row['median_seconds']:>9.4f} {row['devices']:>8} {row['tunnels_returned']:>7}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -48,11 +48,28 @@ class NautobotAppVpnConfig(NautobotAppConfig):
         )
 
         from nautobot.apps import jobs  # pylint: disable=import-outside-toplevel
+        from .jobs.neo4j_schema_job import BootstrapNeo4jSchemaJob  # pylint: disable=import-outside-toplevel
         from .jobs.sync_neo4j_job import SyncNeo4jJob  # pylint: disable=import-outside-toplevel
+        from .jobs.synthetic_inventory_job import (  # pylint: disable=import-outside-toplevel
+            GenerateSyntheticInventoryJob,
+        )
 
         jobs.register_jobs(
             SyncNeo4jJob,
+            BootstrapNeo4jSchemaJob,
+            GenerateSyntheticInventoryJob,
+        )
+
+        from .topology.backends import get_topology_backend  # pylint: disable=import-outside-toplevel
+        from .topology.realtime import get_realtime_sync_settings  # pylint: disable=import-outside-toplevel
+        from .signals import (  # pylint: disable=import-outside-toplevel
+            connect_filter_options_signals,
+            connect_realtime_sync_signals,
         )
 
+        connect_filter_options_signals()
+        if get_realtime_sync_settings()["enabled"] or get_topology_backend().live:
+            connect_realtime_sync_signals()
+
 
 config = NautobotAppVpnConfig  # pylint: disable=invalid-name
@@ -0,0 +1,48 @@
+"""Conditional GET (ETag / Last-Modified) support for the topology API views."""
+
+import hashlib
+import json
+
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date
+
+# Browsers may keep the response but must revalidate it (cheaply, via If-None-Match) before every reuse.
+TOPOLOGY_CACHE_CONTROL = "private, no-cache"
+
+
+def topology_validators(request, kind, filters, sync_state, scope="all", data_version=None):
+    """Return ``(etag, last_modified)`` for a topology API response.
+
+    The strong ETag covers everything the response body depends on: the endpoint, the normalised filters, the
+    sync generation, the permission scope and the negotiated renderer. `last_modified` is a POSIX timestamp of
+    the last topology change, or None before the first sync.
+
+    Responses that also carry data changing between syncs (the live tunnel counts) pass `data_version`, the
+    filter-options token replaced on every tunnel change (see signals.py). It is folded into the ETag, and no
+    `last_modified` is returned since the sync time does not move with those changes.
+    """
+    renderer = getattr(getattr(request, "accepted_renderer", None), "format", "")
+    fingerprint = json.dumps(
+        [kind, filters, sync_state["generation"], scope, renderer, data_version], sort_keys=True, separators=(",", ":")
+    )
+    etag = f'"{hashlib.sha256(fingerprint.encode("utf-8")).hexdigest()[:40]}"'
+    last_updated = sync_state.get("last_updated")
+    last_modified = int(last_updated.timestamp()) if last_updated and data_version is None else None
+    return etag, last_modified
+
+
+def not_modified_response(request, etag, last_modified):
+    """Return a 304 response when the request's validators match, otherwise None."""
+    response = get_conditional_response(request, etag=etag, last_modified=last_modified)
+    if response is not None:
+        set_validator_headers(response, etag, last_modified)
+    return response
+
+
+def set_validator_headers(response, etag, last_modified):
+    """Attach ETag, Last-Modified and Cache-Control headers to a response and return it."""
+    response["ETag"] = etag
+    if last_modified is not None:
+        response["Last-Modified"] = http_date(last_modified)
+    response["Cache-Control"] = TOPOLOGY_CACHE_CONTROL
+    return response
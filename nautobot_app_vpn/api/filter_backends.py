@@ -0,0 +1,33 @@
+"""Filter backends for the Nautobot VPN plugin API."""
+
+from nautobot.core.api.constants import NON_FILTER_QUERY_PARAMS
+from nautobot.core.api.filter_backends import NautobotFilterBackend
+from rest_framework.settings import api_settings
+
+from nautobot_app_vpn.api.pagination import KeysetPagination, StandardResultsSetPagination
+
+# Parameters of the plugin's pagination, ordering and search backends, on top of Nautobot's own.
+VPN_NON_FILTER_QUERY_PARAMS = (
+    *NON_FILTER_QUERY_PARAMS,
+    StandardResultsSetPagination.page_query_param,
+    StandardResultsSetPagination.page_size_query_param,
+    StandardResultsSetPagination.mode_query_param,
+    KeysetPagination.cursor_query_param,
+    api_settings.ORDERING_PARAM,
+    api_settings.SEARCH_PARAM,
+)
+
+
+class VPNFilterBackend(NautobotFilterBackend):
+    """Filter backend that keeps pagination, ordering and search parameters out of the filterset.
+
+    With STRICT_FILTERING (Nautobot's default) the filtersets reject unknown parameters, which would otherwise
+    include ``page_size``, ``cursor``, ``ordering`` and ``search``.
+    """
+
+    def get_filterset_kwargs(self, request, queryset, view):
+        """Drop the non-filter parameters from the filterset data."""
+        kwargs = super().get_filterset_kwargs(request, queryset, view)
+        for param in VPN_NON_FILTER_QUERY_PARAMS:
+            kwargs["data"].pop(param, None)
+        return kwargs
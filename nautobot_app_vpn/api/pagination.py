@@ -1,6 +1,117 @@
 """Custom pagination classes for the Nautobot VPN plugin API."""
 
-from rest_framework.pagination import PageNumberPagination
+import base64
+import binascii
+import json
+from functools import reduce
+
+from django.core.exceptions import ValidationError as DjangoValidationError
+from django.db.models import Q
+from rest_framework.exceptions import NotFound, ValidationError
+from rest_framework.pagination import BasePagination, PageNumberPagination
+from rest_framework.response import Response
+from rest_framework.settings import api_settings
+from rest_framework.utils.urls import replace_query_param
+
+
+def ordering_field(model, path):
+    """Return the model field at the end of the ``__``-separated `path`, following relations from `model`."""
+    *relations, name = path.split("__")
+    for relation in relations:
+        model = model._meta.get_field(relation).related_model
+    return model._meta.get_field(name)
+
+
+class KeysetPagination(BasePagination):
+    """Keyset ("cursor") pagination: forward-only pages ordered by ``(name, id)``, without a total count.
+
+    Each page is fetched with ``WHERE (name, id) > (last name, last id) ORDER BY name, id LIMIT n``, so the
+    thousandth page costs the same as the first (given an index on the ordering). Responses are
+    ``{"next": url or null, "results": [...]}``; follow `next` until it is null. The ordering can be changed per
+    view with a `keyset_ordering` attribute: an optional field followed by a unique tiebreaker.
+    """
+
+    cursor_query_param = "cursor"
+    page_size = 25
+    page_size_query_param = "page_size"
+    max_page_size = 1000
+    ordering = ("name", "id")
+
+    def paginate_queryset(self, queryset, request, view=None):
+        """Return the page of `queryset` after the position encoded in the request's cursor."""
+        if request.query_params.get(api_settings.ORDERING_PARAM):
+            raise ValidationError({api_settings.ORDERING_PARAM: "Not supported with cursor pagination."})
+        self.request = request
+        self.ordering = tuple(getattr(view, "keyset_ordering", self.ordering))
+        page_size = self.get_page_size(request)
+
+        queryset = queryset.order_by(*self.ordering)
+        position = self.decode_cursor(request, queryset.model)
+        if position is not None:
+            queryset = queryset.filter(self.after(position))
+        rows = list(queryset[: page_size + 1])
+        self.next_position = self.position(rows[page_size - 1]) if len(rows) > page_size else None
+        return rows[:page_size]
+
+    def after(self, position):
+        """Q object selecting the rows sorted after `position` (the ordering values of the previous page's last row).
+
+        ``a >= x AND (a > x OR id > y)`` rather than ``a > x OR (a = x AND id > y)``, so the leading column is a
+        plain range condition the database can seek to with an index.
+        """
+        *leading, (tiebreaker, last) = zip(self.ordering, position)
+        condition = Q(**{f"{tiebreaker}__gt": last})
+        for field, value in reversed(leading):
+            condition = Q(**{f"{field}__gte": value}) & (Q(**{f"{field}__gt": value}) | condition)
+        return condition
+
+    def position(self, instance):
+        """Return the ordering values of `instance`, as stored in a cursor."""
+        return [str(reduce(getattr, field.split("__"), instance)) for field in self.ordering]
+
+    def get_page_size(self, request):
+        """Page size from the `page_size` query parameter, capped at `max_page_size`."""
+        try:
+            page_size = int(request.query_params[self.page_size_query_param])
+        except (KeyError, ValueError):
+            return self.page_size
+        return min(page_size, self.max_page_size) if page_size > 0 else self.page_size
+
+    def decode_cursor(self, request, model):
+        """Return the position encoded in the cursor query parameter, or None on the first page.
+
+        Every value is converted with the corresponding field of `model`, so a cursor that decodes but does not
+        fit the ordering (e.g. a non-UUID id) is rejected here rather than failing in the query.
+        """
+        encoded = request.query_params.get(self.cursor_query_param)
+        if not encoded:
+            return None
+        try:
+            position = json.loads(base64.urlsafe_b64decode(encoded.encode("ascii")))
+        except (UnicodeEncodeError, binascii.Error, ValueError) as exc:
+            raise NotFound("Invalid cursor") from exc
+        if not isinstance(position, list) or len(position) != len(self.ordering):
+            raise NotFound("Invalid cursor")
+        try:
+            position = [ordering_field(model, field).to_python(value) for field, value in zip(self.ordering, position)]
+        except DjangoValidationError as exc:
+            raise NotFound("Invalid cursor") from exc
+        if None in position:
+            raise NotFound("Invalid cursor")
+        return position
+
+    def encode_cursor(self, position):
+        """Return the URL of the page after `position`."""
+        token = base64.urlsafe_b64encode(json.dumps(position).encode("utf-8")).decode("ascii")
+        return replace_query_param(self.request.build_absolute_uri(), self.cursor_query_param, token)
+
+    def get_next_link(self):
+        """URL of the next page, or None on the last one."""
+        return self.encode_cursor(self.next_position) if self.next_position is not None else None
+
+    def get_paginated_response(self, data):
+        """Return ``{"next", "results"}``; there is deliberately no count."""
+        return Response({"next": self.get_next_link(), "results": data})
 
 
 class StandardResultsSetPagination(PageNumberPagination):
@@ -10,12 +121,54 @@ class StandardResultsSetPagination(PageNumberPagination):
     - Prevents excessive page loads with `max_page_size=100`
     - Defaults to 25 results per page
       for a better balance of performance and usability.
+    - `?pagination=cursor` (or a `cursor` from a previous page) switches to `KeysetPagination`,
+      for clients walking through large collections.
     """
 
     page_size = 25
     page_size_query_param = "page_size"
     max_page_size = 200
     last_page_strings = ("last",)
+    mode_query_param = "pagination"
+    keyset_class = KeysetPagination
+
+    def __init__(self):
+        """Page-number pagination until a request opts into keyset pagination."""
+        self.keyset = None
+
+    def paginate_queryset(self, queryset, request, view=None):
+        """Paginate by page number, or by keyset if the request asks for a cursor."""
+        params = request.query_params
+        if params.get(self.mode_query_param) == "cursor" or self.keyset_class.cursor_query_param in params:
+            self.keyset = self.keyset_class()
+            return self.keyset.paginate_queryset(queryset, request, view)
+        return super().paginate_queryset(queryset, request, view)
+
+    def get_paginated_response(self, data):
+        """Return the response of whichever pagination the request used."""
+        if self.keyset is not None:
+            return self.keyset.get_paginated_response(data)
+        return super().get_paginated_response(data)
+
+    def get_schema_operation_parameters(self, view):
+        """Document the keyset parameters next to the page-number ones."""
+        return [
+            *super().get_schema_operation_parameters(view),
+            {
+                "name": self.mode_query_param,
+                "required": False,
+                "in": "query",
+                "description": "Set to `cursor` for keyset pagination: no count, follow `next` until it is null.",
+                "schema": {"type": "string", "enum": ["cursor"]},
+            },
+            {
+                "name": self.keyset_class.cursor_query_param,
+                "required": False,
+                "in": "query",
+                "description": "Opaque position of a keyset page, taken from the previous page's `next` link.",
+                "schema": {"type": "string"},
+            },
+        ]
 
 
 class LargeResultsSetPagination(PageNumberPagination):
@@ -0,0 +1,23 @@
+"""Alternative wire formats for the topology API."""
+
+from rest_framework.renderers import JSONRenderer
+
+from nautobot_app_vpn.topology.columnar import columnar_payload
+
+
+class TopologyColumnarRenderer(JSONRenderer):
+    """Render topology payloads (``devices`` / ``tunnels`` FeatureCollections) as parallel columns.
+
+    Selected with ``?format=columnar``; any other payload (e.g. an error) is rendered as plain JSON.
+    """
+
+    # Still JSON, so clients asking for application/json can opt in with the format parameter alone; listed
+    # after the default JSON renderer, it is never picked by Accept-header negotiation.
+    media_type = "application/json"
+    format = "columnar"
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        """Convert the FeatureCollections to columns, then serialise like JSONRenderer."""
+        if isinstance(data, dict) and "devices" in data and "tunnels" in data:
+            data = columnar_payload(data)
+        return super().render(data, accepted_media_type, renderer_context)
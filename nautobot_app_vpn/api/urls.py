@@ -12,6 +12,7 @@ from nautobot_app_vpn.api.viewsets import (
     TunnelMonitorProfileViewSet,
     VPNTopologyFilterOptionsView,
     VPNTopologyNeo4jView,
+    VPNTopologyTileView,
     EncryptionAlgorithmViewSet,
     AuthenticationAlgorithmViewSet,
     DiffieHellmanGroupViewSet,
@@ -35,4 +36,5 @@ urlpatterns = [
     path("v1/", include(router.urls)),  # ✅ Current versioned API path
     path("v1/topology-neo4j/", VPNTopologyNeo4jView.as_view(), name="vpn-topology-neo4j"),
     path("v1/topology-filters/", VPNTopologyFilterOptionsView.as_view(), name="vpn-topology-filters"),
+    path("v1/topology-tiles/<int:z>/<int:x>/<int:y>.mvt", VPNTopologyTileView.as_view(), name="vpn-topology-tiles"),
 ]
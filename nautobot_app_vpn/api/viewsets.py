@@ -1,24 +1,46 @@
 """API viewsets for the Nautobot VPN plugin."""
 # pylint: disable=too-many-ancestors, too-many-locals, too-many-branches, too-many-statements, too-many-nested-blocks
 
+import itertools
+import json
 import logging
-from django.apps import apps
-from django.conf import settings
-from django.db import DatabaseError
-from django.db.models import Count, Q
-from django_filters.rest_framework import DjangoFilterBackend
+from django.http import HttpResponse, StreamingHttpResponse
+from django.utils.cache import patch_vary_headers
 
 from rest_framework import filters, viewsets
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.response import Response
+from rest_framework.settings import api_settings
 from rest_framework.views import APIView
 
-from neo4j import GraphDatabase
 from neo4j import exceptions as neo4j_exceptions
 
-from nautobot.dcim.models import Platform
+from nautobot_app_vpn.api.conditional import not_modified_response, set_validator_headers, topology_validators
+from nautobot_app_vpn.api.filter_backends import VPNFilterBackend
 from nautobot_app_vpn.api.pagination import StandardResultsSetPagination
 from nautobot_app_vpn.api.permissions import IsAdminOrReadOnly
+from nautobot_app_vpn.api.renderers import TopologyColumnarRenderer
+from nautobot_app_vpn.topology.cache import (
+    CACHE_KEY_PREFIX,
+    cached_topology_data,
+    get_filter_options_version,
+    get_cache_scope,
+    get_sync_state,
+    normalize_topology_filters,
+    topology_cache_key,
+)
+from nautobot_app_vpn.topology.backends import (
+    TopologyBackendUnavailable,
+    get_topology_backend,
+    get_topology_settings,
+)
+from nautobot_app_vpn.topology.facets import facet_counts, get_facet_index
+from nautobot_app_vpn.topology.filter_options import build_filter_options
+from nautobot_app_vpn.topology.snapshot import SNAPSHOT_FORMATS, get_topology_snapshot, snapshot_body
+from nautobot_app_vpn.topology.stats import topology_response_payload, tunnel_statistics
+from nautobot_app_vpn.topology.streaming import stream_topology_json
+from nautobot_app_vpn.topology.tiles import MVT_CONTENT_TYPE, encode_tile, tiles_available, valid_tile
+from nautobot_app_vpn.topology.viewport import ViewportError, cluster_graph, parse_viewport, viewport_graph
 
 
 from nautobot_app_vpn.api.serializers import (
@@ -47,7 +69,6 @@ from nautobot_app_vpn.models import (
     IPSecProxyID,
     IPSECTunnel,
     TunnelMonitorProfile,
-    VPNDashboard,
 )
 
 from nautobot_app_vpn.models.algorithms import (
@@ -89,10 +110,14 @@ class DiffieHellmanGroupViewSet(viewsets.ReadOnlyModelViewSet):
 class IKECryptoViewSet(viewsets.ModelViewSet):
     """API endpoint for managing IKE Crypto Profiles."""
 
-    queryset = IKECrypto.objects.all().order_by("name")
+    queryset = (
+        IKECrypto.objects.select_related("tenant_group", "tenant", "status")
+        .prefetch_related("dh_group", "encryption", "authentication")
+        .order_by("name")
+    )
     serializer_class = IKECryptoSerializer
     permission_classes = [IsAdminOrReadOnly]
-    filter_backends = [DjangoFilterBackend, filters.OrderingFilter, filters.SearchFilter]
+    filter_backends = [VPNFilterBackend, filters.OrderingFilter, filters.SearchFilter]
     filterset_class = IKECryptoFilterSet
     ordering_fields = ["name", "dh_group", "encryption", "lifetime"]
     search_fields = ["name", "dh_group", "encryption"]
@@ -102,10 +127,14 @@ class IKECryptoViewSet(viewsets.ModelViewSet):
 class IPSecCryptoViewSet(viewsets.ModelViewSet):
     """API endpoint for managing IPSec Crypto Profiles."""
 
-    queryset = IPSecCrypto.objects.all().order_by("name")
+    queryset = (
+        IPSecCrypto.objects.select_related("tenant_group", "tenant", "status")
+        .prefetch_related("dh_group", "encryption", "authentication")
+        .order_by("name")
+    )
     serializer_class = IPSecCryptoSerializer
     permission_classes = [IsAdminOrReadOnly]
-    filter_backends = [DjangoFilterBackend, filters.OrderingFilter, filters.SearchFilter]
+    filter_backends = [VPNFilterBackend, filters.OrderingFilter, filters.SearchFilter]
     filterset_class = IPSecCryptoFilterSet
     ordering_fields = ["name", "encryption", "authentication", "dh_group"]
     search_fields = ["name", "encryption", "authentication"]
@@ -117,9 +146,13 @@ class IKEGatewayViewSet(viewsets.ModelViewSet):
 
     queryset = (
         IKEGateway.objects.select_related(
+            "tenant_group",
+            "tenant",
             "ike_crypto_profile",
             "status",
-            "bind_interface",
+            "bind_interface__device",
+            "local_platform",
+            "peer_platform",
         )
         .prefetch_related("local_devices", "peer_devices", "local_locations", "peer_locations")
         .order_by("name")
@@ -127,7 +160,7 @@ class IKEGatewayViewSet(viewsets.ModelViewSet):
 
     serializer_class = IKEGatewaySerializer
     permission_classes = [IsAdminOrReadOnly]
-    filter_backends = [DjangoFilterBackend, filters.OrderingFilter, filters.SearchFilter]
+    filter_backends = [VPNFilterBackend, filters.OrderingFilter, filters.SearchFilter]
     filterset_class = IKEGatewayFilterSet
     ordering_fields = ["name", "local_ip", "peer_ip", "bind_interface__name"]
 
@@ -152,10 +185,10 @@ class IKEGatewayViewSet(viewsets.ModelViewSet):
 class TunnelMonitorProfileViewSet(viewsets.ModelViewSet):
     """API viewset for Tunnel Monitor Profiles."""
 
-    queryset = TunnelMonitorProfile.objects.all().order_by("name")
+    queryset = TunnelMonitorProfile.objects.select_related("tenant_group", "tenant").order_by("name")
     serializer_class = TunnelMonitorProfileSerializer
     permission_classes = [IsAdminOrReadOnly]
-    filter_backends = [DjangoFilterBackend, filters.OrderingFilter, filters.SearchFilter]
+    filter_backends = [VPNFilterBackend, filters.OrderingFilter, filters.SearchFilter]
     filterset_class = TunnelMonitorProfileFilterSet
     ordering_fields = ["name", "action", "interval", "threshold"]
     search_fields = ["name"]
@@ -167,10 +200,12 @@ class IPSECTunnelViewSet(viewsets.ModelViewSet):
 
     queryset = (
         IPSECTunnel.objects.select_related(
+            "tenant_group",
+            "tenant",
             "ike_gateway",
             "ipsec_crypto_profile",
             "status",
-            "tunnel_interface",
+            "tunnel_interface__device",
             "monitor_profile",
         )
         .prefetch_related(
@@ -183,7 +218,7 @@ class IPSECTunnelViewSet(viewsets.ModelViewSet):
 
     serializer_class = IPSECTunnelSerializer
     permission_classes = [IsAdminOrReadOnly]
-    filter_backends = [DjangoFilterBackend, filters.OrderingFilter, filters.SearchFilter]
+    filter_backends = [VPNFilterBackend, filters.OrderingFilter, filters.SearchFilter]
     filterset_class = IPSECTunnelFilterSet
 
     ordering_fields = [
@@ -218,11 +253,13 @@ class IPSecProxyIDViewSet(viewsets.ModelViewSet):
     queryset = IPSecProxyID.objects.select_related("tunnel").order_by("tunnel__name")
     serializer_class = IPSecProxyIDSerializer
     permission_classes = [IsAdminOrReadOnly]
-    filter_backends = [DjangoFilterBackend, filters.OrderingFilter, filters.SearchFilter]
+    filter_backends = [VPNFilterBackend, filters.OrderingFilter, filters.SearchFilter]
     filterset_class = IPSecProxyIDFilterSet
     ordering_fields = ["tunnel__name", "local_subnet", "remote_subnet", "protocol"]
     search_fields = ["local_subnet", "remote_subnet", "protocol"]
     pagination_class = StandardResultsSetPagination
+    # Proxy IDs have no name; keyset pages follow the primary key.
+    keyset_ordering = ("id",)
 
 
 # -----------------------------
@@ -237,12 +274,43 @@ def latlon_to_xy(lat, lon, svg_width=2754, svg_height=1398):
     return x, y
 
 
-def _neo4j_driver():
-    """Create a Neo4j driver based on settings."""
-    return GraphDatabase.driver(settings.NEO4J_URI, auth=(settings.NEO4J_USER, settings.NEO4J_PASSWORD))
+class TopologyGraphMixin:
+    """Shared loading of the (cached) backend graph for the topology API views."""
+
+    def _cached_graph(self, backend, filters, generation):
+        """Backend graph for `filters`, cached per backend, filter set and sync generation."""
+        return cached_topology_data(
+            topology_cache_key(f"graph-{backend.name}", filters, generation), lambda: backend.build_graph(filters)
+        )
+
+    def _graph_error_response(self, backend, exc):
+        """Map an error raised while building the graph to an API error response."""
+        if isinstance(exc, TopologyBackendUnavailable):
+            return Response({"error": str(exc)}, status=503)
+        if isinstance(exc, neo4j_exceptions.CypherSyntaxError):
+            logger.error("Neo4j Cypher Syntax Error in %s: %s", type(self).__name__, exc, exc_info=True)
+            return Response({"error": "Error querying graph database (query syntax problem)."}, status=500)
+        if isinstance(exc, (neo4j_exceptions.ServiceUnavailable, neo4j_exceptions.AuthError)):
+            logger.error("Neo4j Service Unavailable during VPN topology query.", exc_info=True)
+            return Response({"error": "Graph database service unavailable during query."}, status=503)
+        logger.error("Error building topology with the %s backend: %s", backend.name, exc, exc_info=True)
+        return Response({"error": "Could not retrieve topology data."}, status=500)
+
+    def _zoom_graph(self, backend, graph, filters, zoom, generation):
+        """Return ``(graph, clustered)``: `graph` clustered for `zoom` (cached per zoom level) when zoomed out."""
+        config = get_topology_settings()
+        if zoom is None or zoom > config["cluster_max_zoom"]:
+            return graph, False
+        clustered = cached_topology_data(
+            topology_cache_key(
+                f"clusters-{backend.name}", {**filters, "zoom": zoom, "grid": config["cluster_grid_size"]}, generation
+            ),
+            lambda: cluster_graph(graph, zoom, config["cluster_grid_size"]),
+        )
+        return clustered, True
 
 
-class VPNTopologyNeo4jView(APIView):
+class VPNTopologyNeo4jView(TopologyGraphMixin, APIView):
     """
     Returns GeoJSON for MapLibre:
 
@@ -263,374 +331,183 @@ class VPNTopologyNeo4jView(APIView):
 
     serializer_class = DummySerializer
     permission_classes = [IsAuthenticated]
+    # ?format=columnar selects the compact columnar wire format.
+    renderer_classes = [*api_settings.DEFAULT_RENDERER_CLASSES, TopologyColumnarRenderer]
+
+    def _tunnel_statistics(self, user, filters):
+        """Relational tunnel counts by status and role, restricted to what `user` may view."""
+        return tunnel_statistics(IPSECTunnel.objects.restrict(user, "view"), filters)
+
+    def _cached_tunnel_statistics(self, user, filters, generation, scope, data_version):
+        """Tunnel statistics for the "status" / "role" filters, cached per user scope, sync generation and data version.
+
+        `data_version` is the filter-options token, replaced whenever a tunnel is saved or deleted.
+        """
+        stat_filters = {key: filters[key] for key in ("status", "role") if key in filters}
+        return cached_topology_data(
+            topology_cache_key(f"tunnel-stats.{data_version}", stat_filters, generation, scope),
+            lambda: self._tunnel_statistics(user, stat_filters),
+        )
 
-    def _build_node_where(self, params_in, qp_out):
-        where = []
-        if params_in.get("country"):
-            where.append("toLower(n.country) = toLower($country)")
-            qp_out["country"] = params_in["country"]
-
-        if params_in.get("platform"):
-            where.append("toLower(n.platform_name) CONTAINS toLower($platform)")
-            qp_out["platform"] = params_in["platform"]
-
-        if params_in.get("location"):
-            where.append("toLower(n.location_name) CONTAINS toLower($location)")
-            qp_out["location"] = params_in["location"]
-
-        if params_in.get("device"):
-            val = str(params_in["device"]).strip()
-            # Guard against null lists with coalesce()
-            where.append(
-                "("
-                "toLower($device_name) IN [dev IN coalesce(n.device_names, []) | toLower(dev)] "
-                "OR $device_name IN coalesce(n.nautobot_device_pks, []) "
-                "OR toLower(n.label) CONTAINS toLower($device_name)"
-                ")"
-            )
-            qp_out["device_name"] = val
+    def _streaming_response(  # pylint: disable=too-many-arguments
+        self, request, backend, filters, sync_state, scope, data_version, etag, last_modified
+    ):
+        """Stream the topology JSON straight from the backend, feature by feature, without caching the graph.
 
-        if params_in.get("role"):
-            where.append("toLower(n.role) = toLower($node_role)")
-            qp_out["node_role"] = params_in["role"]
+        The first feature is pulled before answering, so connection errors still produce an error status.
+        """
+        tunnel_stats = self._cached_tunnel_statistics(
+            request.user, filters, sync_state["generation"], scope, data_version
+        )
+        items = backend.iter_graph(filters)
+        try:
+            first = next(items, None)
+        except Exception as exc:  # pylint: disable=broad-exception-caught
+            return self._graph_error_response(backend, exc)
+        if first is not None:
+            items = itertools.chain((first,), items)
+        response = StreamingHttpResponse(
+            stream_topology_json(items, sync_state, tunnel_stats), content_type="application/json"
+        )
+        return set_validator_headers(response, etag, last_modified)
 
-        return where
+    def _snapshot_response(self, request, snapshot, sync_state, scope, data_version):
+        """Serve a pre-built TopologySnapshot with the user's tunnel statistics spliced in.
 
-    def _build_edge_filter(self, params_in, qp_out):
-        conds = []
-        if params_in.get("status"):
-            conds.append("toLower(r.status) = toLower($tunnel_status)")
-            qp_out["tunnel_status"] = params_in["status"]
+        Bodies in the negotiated format are sent gzip-encoded when the client allows it, compressed per response;
+        other renderers (e.g. the browsable API) get the JSON snapshot re-rendered.
+        """
+        tunnel_stats = self._cached_tunnel_statistics(request.user, {}, sync_state["generation"], scope, data_version)
+        if getattr(request.accepted_renderer, "format", None) != snapshot.format:
+            return Response(json.loads(snapshot_body(snapshot, tunnel_stats, compress=False)))
 
-        if params_in.get("ike_version"):
-            conds.append("toLower(r.ike_version) = toLower($ike_version)")
-            qp_out["ike_version"] = params_in["ike_version"]
+        accepts_gzip = "gzip" in request.META.get("HTTP_ACCEPT_ENCODING", "")
+        response = HttpResponse(snapshot_body(snapshot, tunnel_stats, accepts_gzip), content_type="application/json")
+        if accepts_gzip:
+            response["Content-Encoding"] = "gzip"
+        patch_vary_headers(response, ("Accept-Encoding",))
+        return response
 
-        if params_in.get("role"):
-            conds.append("toLower(r.role) = toLower($tunnel_role)")
-            qp_out["tunnel_role"] = params_in["role"]
+    def get(self, request):
+        """Return VPN topology GeoJSON and summary metadata from the configured topology backend.
 
-        return conds
+        The graph part is cached per backend, normalised filter set and sync generation; the permission-restricted
+        tunnel counts are cached per user on top of that, so repeat loads between syncs skip the backend entirely.
+        Optional ``zoom`` / ``bbox`` parameters restrict the features to a viewport and cluster them when zoomed out;
+        ``stream=true`` streams the JSON from the backend instead of building it in memory.
+        """
+        logger.info("VPN Topology GET request from user %s with filters: %s", request.user, request.GET.dict())
 
-    def get(self, request):
-        """Return VPN topology GeoJSON and summary metadata sourced from Neo4j."""
-        logger.info("Neo4j VPN Topology GET request from user %s with filters: %s", request.user, request.GET.dict())
+        backend = get_topology_backend()
+        try:
+            backend.check_available()
+        except TopologyBackendUnavailable as exc:
+            logger.error("Topology backend %s is not available: %s", backend.name, exc)
+            return Response({"error": str(exc)}, status=503)
 
-        # Settings check
-        for attr in ("NEO4J_URI", "NEO4J_USER", "NEO4J_PASSWORD"):
-            if not hasattr(settings, attr):
-                logger.error("Neo4j connection settings are not fully configured in Nautobot settings.")
-                return Response({"error": "Graph database service is not configured."}, status=503)
+        filters = normalize_topology_filters(request.GET)
+        try:
+            viewport = parse_viewport(request.GET)
+        except ViewportError as exc:
+            return Response({"error": str(exc)}, status=400)
+        # Streaming applies to the plain JSON graph; clustering needs the whole graph and columnar its own renderer.
+        stream = (
+            str(request.GET.get("stream", "")).lower() in ("1", "true", "yes")
+            and not viewport
+            and getattr(request.accepted_renderer, "format", None) == "json"
+        )
+        sync_state = get_sync_state()
+        generation = sync_state["generation"]
+        scope = get_cache_scope(request.user)
+        # The tunnel counts are live: tunnel changes between syncs must change the validators too.
+        data_version = get_filter_options_version()
+
+        validator_key = {**filters, **viewport, **({"stream": True} if stream else {})}
+        etag, last_modified = topology_validators(
+            request, f"topology:{backend.name}", validator_key, sync_state, scope, data_version
+        )
+        not_modified = not_modified_response(request, etag, last_modified)
+        if not_modified is not None:
+            return not_modified
+
+        if not filters and not viewport:
+            renderer_format = getattr(request.accepted_renderer, "format", None)
+            snapshot = get_topology_snapshot(
+                backend.name, generation, renderer_format if renderer_format in SNAPSHOT_FORMATS else "json"
+            )
+            if snapshot is not None:
+                response = self._snapshot_response(request, snapshot, sync_state, scope, data_version)
+                # The body may be gzip-encoded, so only a weak validator is accurate for it (as with GZipMiddleware).
+                return set_validator_headers(response, f"W/{etag}", last_modified)
+
+        if stream:
+            return self._streaming_response(
+                request, backend, filters, sync_state, scope, data_version, etag, last_modified
+            )
 
-        driver = None
         try:
-            driver = _neo4j_driver()
-            driver.verify_connectivity()
+            graph = self._cached_graph(backend, filters, generation)
+            if viewport:
+                graph, clustered = self._zoom_graph(backend, graph, filters, viewport.get("zoom"), generation)
+                graph = viewport_graph(graph, viewport, clustered)
         except Exception as exc:  # pylint: disable=broad-exception-caught
-            logger.error("Failed to connect to Neo4j for topology view: %s", exc, exc_info=True)
-            return Response({"error": "Could not connect to graph database."}, status=503)
-
-        params_in = request.GET.dict()
-
-        # --- Relational statistics for ribbon summary ---
-        tracked_status = [
-            ("active", "Active"),
-            ("down", "Down"),
-            ("decommissioned", "Decommissioned"),
-            ("disabled", "Disabled"),
-            ("planned", "Planned"),
-        ]
-        status_counts = {slug: 0 for slug, _ in tracked_status}
-        status_labels = dict(tracked_status)
-        status_order = [slug for slug, _ in tracked_status]
-
-        role_labels = {
-            "primary": "Primary",
-            "secondary": "Secondary",
-            "tertiary": "Tertiary",
-            "unassigned": "Unassigned",
-        }
-        role_counts = {key: 0 for key in role_labels}
-        role_order = ["primary", "secondary", "tertiary"]
-        total_tunnels = 0
+            return self._graph_error_response(backend, exc)
+
+        tunnel_stats = self._cached_tunnel_statistics(request.user, filters, generation, scope, data_version)
+        response = Response(topology_response_payload(graph, sync_state, tunnel_stats))
+        return set_validator_headers(response, etag, last_modified)
+
+
+class VPNTopologyTileView(TopologyGraphMixin, APIView):
+    """
+    Returns Mapbox Vector Tiles (``application/vnd.mapbox-vector-tile``) with two layers:
+
+      "devices": points with the device feature properties (or cluster properties when zoomed out)
+      "tunnels": lines with the tunnel feature properties (or bundle properties when zoomed out)
+
+    Accepts the same filters as the topology view. Needs the optional mapbox-vector-tile package.
+    """
+
+    serializer_class = DummySerializer
+    permission_classes = [IsAuthenticated]
 
+    def perform_content_negotiation(self, request, force=False):
+        """Tiles are requested with arbitrary Accept headers (e.g. application/x-protobuf); errors stay JSON."""
+        return super().perform_content_negotiation(request, force=True)
+
+    def get(self, request, z, x, y):
+        """Return tile ``z/x/y`` of the topology, cached per backend, filters, tile and sync generation."""
+        if not tiles_available():
+            return Response({"error": "Vector tiles need the optional 'mapbox-vector-tile' package."}, status=501)
+        if not valid_tile(z, x, y):
+            return Response({"error": f"Tile {z}/{x}/{y} does not exist."}, status=404)
+
+        backend = get_topology_backend()
         try:
-            tunnels_qs = IPSECTunnel.objects.restrict(request.user, "view")
-
-            status_filter = (params_in.get("status") or "").strip()
-            role_filter = (params_in.get("role") or "").strip()
-
-            status_model = apps.get_model("extras", "Status")
-            status_fields = {f.name for f in status_model._meta.get_fields()}
-            has_status_slug = "slug" in status_fields
-
-            if status_filter:
-                status_lookup = Q(status__name__iexact=status_filter)
-                if has_status_slug:
-                    status_lookup |= Q(status__slug__iexact=status_filter)
-                tunnels_qs = tunnels_qs.filter(status_lookup)
-
-            if role_filter:
-                tunnels_qs = tunnels_qs.filter(role__iexact=role_filter)
-
-            status_value_fields = ["status__name"]
-            if has_status_slug:
-                status_value_fields.append("status__slug")
-
-            for row in tunnels_qs.values(*status_value_fields).annotate(total=Count("id")):
-                status_name = (row.get("status__name") or "").strip()
-                raw_key = row.get("status__slug") if has_status_slug else status_name
-                slug_key = (raw_key or status_name or "unknown").strip().lower().replace(" ", "-")
-                if not slug_key:
-                    slug_key = "unknown"
-                status_counts[slug_key] = row["total"]
-                status_labels[slug_key] = status_name or status_labels.get(slug_key, slug_key.title())
-                if slug_key not in status_order:
-                    status_order.append(slug_key)
-
-            for row in tunnels_qs.values("role").annotate(total=Count("id")):
-                role_value = (row["role"] or "unassigned").lower()
-                role_counts[role_value] = row["total"]
-                if role_value not in role_order:
-                    role_order.append(role_value)
-
-            total_tunnels = tunnels_qs.count()
-        except (DatabaseError, LookupError) as agg_exc:
-            logger.error("Failed to compute relational tunnel statistics: %s", agg_exc, exc_info=True)
-
-        qp = {}
-
-        node_where = self._build_node_where(params_in, qp)
-        node_query = "MATCH (n:VPNNode)"
-        if node_where:
-            node_query += " WHERE " + " AND ".join(node_where)
-        node_query += " RETURN n"
+            backend.check_available()
+        except TopologyBackendUnavailable as exc:
+            return Response({"error": str(exc)}, status=503)
+
+        filters = normalize_topology_filters(request.GET)
+        sync_state = get_sync_state()
+        generation = sync_state["generation"]
+        tile_key = {**filters, "tile": [z, x, y]}
+        etag, last_modified = topology_validators(request, f"tiles:{backend.name}", tile_key, sync_state)
+        not_modified = not_modified_response(request, etag, last_modified)
+        if not_modified is not None:
+            return not_modified
+
+        def build_tile():
+            graph, _ = self._zoom_graph(
+                backend, self._cached_graph(backend, filters, generation), filters, z, generation
+            )
+            return encode_tile(graph, z, x, y)
 
         try:
-            devices_fc = {"type": "FeatureCollection", "features": []}
-            tunnels_fc = {"type": "FeatureCollection", "features": []}
-
-            with driver.session(database=getattr(settings, "NEO4J_DATABASE", "neo4j")) as session:
-                # ---- Nodes
-                logger.debug("Node query: %s params=%s", node_query, qp)
-                node_records = session.run(node_query, qp)
-
-                node_ids = set()
-                for rec in node_records:
-                    nprops = dict(rec["n"])
-                    node_id = nprops.get("id")
-                    if not node_id:
-                        continue
-                    # accept several possible coord keys
-                    lat = nprops.get("lat", nprops.get("latitude"))
-                    lon = nprops.get("lon", nprops.get("longitude"))
-                    if lat is None or lon is None:
-                        # skip nodes without geo
-                        continue
-
-                    node_ids.add(node_id)
-                    props = {
-                        "id": node_id,
-                        "name": nprops.get("name") or nprops.get("label") or "",
-                        "status": nprops.get("status") or "unknown",
-                        "role": nprops.get("role"),
-                        "platform": nprops.get("platform_name"),
-                        "country": nprops.get("country"),
-                        "location": nprops.get("location_name"),
-                        "is_ha_pair": bool(nprops.get("is_ha_pair")),
-                        # Include backing device info to make device filter work with HA groups
-                        "device_names": nprops.get("device_names") or [],
-                        "nautobot_device_pks": nprops.get("nautobot_device_pks") or [],
-                        "search_text": " ".join(
-                            str(x)
-                            for x in [
-                                nprops.get("name") or nprops.get("label"),
-                                nprops.get("role"),
-                                nprops.get("platform_name"),
-                                nprops.get("country"),
-                                nprops.get("location_name"),
-                            ]
-                            if x
-                        ),
-                    }
-
-                    devices_fc["features"].append(
-                        {
-                            "type": "Feature",
-                            "geometry": {"type": "Point", "coordinates": [float(lon), float(lat)]},
-                            "properties": props,
-                        }
-                    )
-
-                # ---- Edges (include peers even if they don't match the node filters) ----
-                edge_qp = {}
-                edge_conds = self._build_edge_filter(params_in, edge_qp)
-
-                base = (
-                    "MATCH (a:VPNNode)-[r:TUNNEL]->(b:VPNNode) "
-                    "WHERE a.lat IS NOT NULL AND a.lon IS NOT NULL AND b.lat IS NOT NULL AND b.lon IS NOT NULL "
-                )
-                if node_ids:
-                    base += "AND (a.id IN $node_ids OR b.id IN $node_ids) "
-                    edge_qp["node_ids"] = list(node_ids)
-                if edge_conds:
-                    base += "AND " + " AND ".join(edge_conds) + " "
-                edge_query = base + "RETURN a AS a, b AS b, r AS r"
-
-                logger.debug("Edge query: %s params=%s", edge_query, edge_qp)
-                nodes_map = {f["properties"]["id"]: f for f in devices_fc["features"]}
-                for rec in session.run(edge_query, edge_qp):
-                    aprops = dict(rec["a"])  # node a properties
-                    bprops = dict(rec["b"])  # node b properties
-                    rprops = dict(rec["r"])  # relationship properties
-
-                    # Ensure endpoints exist in devices_fc
-                    for np in (aprops, bprops):
-                        nid = np.get("id")
-                        if not nid or nid in nodes_map:
-                            continue
-                        lat = np.get("lat")
-                        if lat is None:
-                            lat = np.get("latitude")
-                        lon = np.get("lon")
-                        if lon is None:
-                            lon = np.get("longitude")
-                        if lat is None or lon is None:
-                            continue
-                        props = {
-                            "id": nid,
-                            "name": np.get("name") or np.get("label") or "",
-                            "status": np.get("status") or "unknown",
-                            "role": np.get("role"),
-                            "platform": np.get("platform_name"),
-                            "country": np.get("country"),
-                            "location": np.get("location_name"),
-                            "is_ha_pair": bool(np.get("is_ha_pair")),
-                            "device_names": np.get("device_names") or [],
-                            "nautobot_device_pks": np.get("nautobot_device_pks") or [],
-                            "search_text": " ".join(
-                                str(x)
-                                for x in [
-                                    np.get("name") or np.get("label"),
-                                    np.get("role"),
-                                    np.get("platform_name"),
-                                    np.get("country"),
-                                    np.get("location_name"),
-                                ]
-                                if x
-                            ),
-                        }
-                        feat = {
-                            "type": "Feature",
-                            "geometry": {
-                                "type": "Point",
-                                "coordinates": [float(lon), float(lat)],
-                            },
-                            "properties": props,
-                        }
-                        devices_fc["features"].append(feat)
-                        nodes_map[nid] = feat
-
-                    # Add tunnel feature
-                    a_lon = aprops.get("lon") if aprops.get("lon") is not None else aprops.get("longitude")
-                    a_lat = aprops.get("lat") if aprops.get("lat") is not None else aprops.get("latitude")
-                    b_lon = bprops.get("lon") if bprops.get("lon") is not None else bprops.get("longitude")
-                    b_lat = bprops.get("lat") if bprops.get("lat") is not None else bprops.get("latitude")
-                    if a_lon is None or a_lat is None or b_lon is None or b_lat is None:
-                        continue
-                    tunnels_fc["features"].append(
-                        {
-                            "type": "Feature",
-                            "geometry": {
-                                "type": "LineString",
-                                "coordinates": [
-                                    [float(a_lon), float(a_lat)],
-                                    [float(b_lon), float(b_lat)],
-                                ],
-                            },
-                            "properties": {
-                                "name": rprops.get("label") or rprops.get("id") or "",
-                                "status": rprops.get("status") or "unknown",
-                                "role": rprops.get("role") or "",
-                                "ike_version": rprops.get("ike_version") or "",
-                                "scope": rprops.get("scope") or "",
-                                "local_ip": rprops.get("local_ip") or "",
-                                "peer_ip": rprops.get("peer_ip") or "",
-                                "firewall_hostnames": rprops.get("firewall_hostnames") or "",
-                                "tooltip": rprops.get("tooltip_details_json") or rprops.get("tooltip") or "",
-                            },
-                        }
-                    )
-
-            # ---- Stats (by device status) ----
-            stats = {}
-            for f in devices_fc["features"]:
-                s = (f["properties"].get("status") or "unknown").lower()
-                stats[s] = stats.get(s, 0) + 1
-
-            # ---- Meta for ribbon ----
-            countries = set()
-            platforms = set()
-            ha_pairs = 0
-            for f in devices_fc["features"]:
-                p = f["properties"] or {}
-                if p.get("country"):
-                    countries.add(p["country"])
-                if p.get("platform"):
-                    platforms.add(p["platform"])
-                if p.get("is_ha_pair"):
-                    ha_pairs += 1
-
-            last_synced_iso = None
-            last_sync_status = None
-            try:
-                dash = VPNDashboard.objects.filter(pk=1).only("last_sync_time", "last_sync_status").first()
-                if dash and dash.last_sync_time:
-                    last_synced_iso = dash.last_sync_time.isoformat()
-                if dash and dash.last_sync_status:
-                    last_sync_status = dash.last_sync_status
-            except DatabaseError as db_error:
-                logger.debug(
-                    "Unable to load VPNDashboard sync metadata due to database error: %s",
-                    db_error,
-                    exc_info=True,
-                )
-
-            meta = {
-                "devices_count": len(devices_fc["features"]),
-                "tunnels_count": len(tunnels_fc["features"]),
-                "countries_count": len(countries),
-                "platforms_count": len(platforms),
-                "ha_pairs": ha_pairs,
-                "last_synced": last_synced_iso,
-                "last_sync_status": last_sync_status,
-                "status_counts": status_counts,
-                "status_labels": status_labels,
-                "status_order": status_order,
-                "role_counts": role_counts,
-                "role_labels": role_labels,
-                "role_order": role_order,
-                "total_tunnels": total_tunnels,
-                "total_primary_tunnels": role_counts.get("primary", 0),
-                "total_secondary_tunnels": role_counts.get("secondary", 0),
-                "total_tertiary_tunnels": role_counts.get("tertiary", 0),
-                "total_unassigned_tunnels": role_counts.get("unassigned", 0),
-            }
-
-            return Response({"devices": devices_fc, "tunnels": tunnels_fc, "stats": stats, "meta": meta})
-
-        except neo4j_exceptions.CypherSyntaxError as e:  # pylint: disable=broad-exception-caught
-            logger.error("Neo4j Cypher Syntax Error in VPNTopologyNeo4jView: %s", e, exc_info=True)
-            return Response({"error": "Error querying graph database (query syntax problem)."}, status=500)
-        except neo4j_exceptions.ServiceUnavailable:
-            logger.error("Neo4j Service Unavailable during VPN topology query.", exc_info=True)
-            return Response({"error": "Graph database service unavailable during query."}, status=503)
+            content = cached_topology_data(topology_cache_key(f"tile-{backend.name}", tile_key, generation), build_tile)
         except Exception as exc:  # pylint: disable=broad-exception-caught
-            logger.error("Error querying or processing data from Neo4j in VPNTopologyNeo4jView: %s", exc, exc_info=True)
-            return Response({"error": "Could not retrieve topology data from graph database."}, status=500)
-        finally:
-            if driver:
-                driver.close()
+            return self._graph_error_response(backend, exc)
+        return set_validator_headers(HttpResponse(content, content_type=MVT_CONTENT_TYPE), etag, last_modified)
 
 
 class VPNTopologyFilterOptionsView(APIView):
@@ -642,83 +519,59 @@ class VPNTopologyFilterOptionsView(APIView):
       "device": [...], "platform": [...]
     }
     (Built from relational data; no change to IKE/IPSec logic.)
+
+    With ``?facets=true`` plus any topology filters, returns per-facet counts instead:
+    {"country": [{"value": "DE", "tunnels": N, "nodes": M}, ...], ...}
     """
 
     serializer_class = DummySerializer
     permission_classes = [IsAuthenticated]
 
-    def _get_device_country_from_name(self, device_name):
-        """Derives country from device name based on 'CODE-...' convention."""
-        if device_name:
-            parts = device_name.split("-")
-            if parts:
-                return parts[0].upper()
-        return None
+    def _facets_response(self, request):
+        """Per-facet tunnel/node counts under the selected filters, from the backend's facet index."""
+        backend = get_topology_backend()
+        try:
+            backend.check_available()
+        except TopologyBackendUnavailable as exc:
+            return Response({"error": str(exc)}, status=503)
+
+        filters = normalize_topology_filters(request.GET)
+        sync_state = get_sync_state()
+        generation = sync_state["generation"]
+        etag, last_modified = topology_validators(request, f"facets:{backend.name}", filters, sync_state)
+        not_modified = not_modified_response(request, etag, last_modified)
+        if not_modified is not None:
+            return not_modified
 
-    def get(self, request):
-        """Return available filter values derived from relational VPN data."""
-        logger.debug("Filter options GET request from user %s", request.user)
-        countries = set()
-        ike_versions = set()
-        statuses = set()
-        tunnel_roles = set()
-        devices = set()
-        locations = set()
-        platforms = set()
-
-        tunnels_qs = IPSECTunnel.objects.select_related(
-            "ike_gateway", "status", "ike_gateway__local_platform", "ike_gateway__peer_platform"
-        ).prefetch_related(
-            "ike_gateway__local_devices__platform",
-            "ike_gateway__local_devices__location",
-            "ike_gateway__local_devices__role",
-            "ike_gateway__peer_devices__platform",
-            "ike_gateway__peer_devices__location",
-            "ike_gateway__peer_devices__role",
-        )
+        try:
+            facets = cached_topology_data(
+                topology_cache_key(f"facets-{backend.name}", filters, generation),
+                lambda: facet_counts(get_facet_index(backend, generation), filters),
+            )
+        except TopologyBackendUnavailable as exc:
+            return Response({"error": str(exc)}, status=503)
+        except (neo4j_exceptions.ServiceUnavailable, neo4j_exceptions.AuthError):
+            logger.error("Neo4j Service Unavailable during topology facet query.", exc_info=True)
+            return Response({"error": "Graph database service unavailable during query."}, status=503)
+        return set_validator_headers(Response(facets), etag, last_modified)
 
-        for tunnel in tunnels_qs:
-            if tunnel.status and tunnel.status.name:
-                statuses.add(tunnel.status.name)
-            if tunnel.role:
-                tunnel_roles.add(str(tunnel.role))
-
-            gw = tunnel.ike_gateway
-            if gw:
-                if gw.ike_version:
-                    ike_versions.add(str(gw.ike_version))
-
-                for dev_group in [gw.local_devices.all(), gw.peer_devices.all()]:
-                    for dev in dev_group:
-                        if dev and dev.name:
-                            devices.add(dev.name)
-                            country = self._get_device_country_from_name(dev.name)
-                            if country:
-                                countries.add(country)
-                        if dev and dev.location and dev.location.name:
-                            locations.add(dev.location.name)
-                        if dev and dev.platform and dev.platform.name:
-                            platforms.add(dev.platform.name)
-
-                # consider local/peer platforms on gateway
-                for plat in [gw.local_platform, gw.peer_platform]:
-                    if plat and plat.name:
-                        platforms.add(plat.name)
-
-        # also include all defined platforms
-        for plat in Platform.objects.all().values("name").distinct():
-            if plat["name"]:
-                platforms.add(plat["name"])
+    def get(self, request):
+        """Return available filter values derived from relational VPN data.
 
+        The options are cached, and validated with an ETag, until tunnels, gateways, devices, locations,
+        platforms or statuses change. Faceted counts follow the topology graph and its sync generation.
+        """
+        logger.debug("Filter options GET request from user %s", request.user)
+        if str(request.GET.get("facets", "")).lower() in ("1", "true", "yes"):
+            return self._facets_response(request)
+        version = get_filter_options_version()
+        # Options change independently of topology syncs, so only the version-based ETag is a valid validator.
+        etag, _ = topology_validators(request, "filters", {"version": version}, {"generation": 0})
+        not_modified = not_modified_response(request, etag, None)
+        if not_modified is not None:
+            return not_modified
+
+        options = cached_topology_data(f"{CACHE_KEY_PREFIX}.filter-options.{version}", build_filter_options)
         # OUTPUT KEYS match frontend expectations
-        return Response(
-            {
-                "country": sorted(filter(None, countries)),
-                "ike_version": sorted(filter(None, ike_versions)),
-                "status": sorted(filter(None, statuses)),
-                "role": sorted(filter(None, tunnel_roles)),
-                "location": sorted(filter(None, locations)),
-                "device": sorted(filter(None, devices)),
-                "platform": sorted(filter(None, platforms)),
-            }
-        )
+        response = Response(options)
+        return set_validator_headers(response, etag, None)
@@ -0,0 +1,50 @@
+"""Job to create the Neo4j constraints and indexes used by the VPN topology."""
+
+import logging
+
+from nautobot.extras.jobs import Job
+
+from nautobot_app_vpn.topology.driver import get_neo4j_database, neo4j_is_configured, verify_neo4j_connectivity
+from nautobot_app_vpn.topology.schema import ensure_topology_schema
+from nautobot_app_vpn.topology.writer import get_sync_settings
+
+logger = logging.getLogger(__name__)
+
+name = "Virtual Private Network (VPN)"  # pylint: disable=invalid-name
+
+
+class BootstrapNeo4jSchemaJob(Job):
+    """Job to bootstrap the VPN topology schema in Neo4j."""
+
+    class Meta:
+        name = "Bootstrap VPN Topology Schema in Neo4j"
+        description = (
+            "Creates the VPNNode/TUNNEL constraints and indexes and backfills lowercase filter properties. "
+            "Idempotent; also run at the start of every topology sync."
+        )
+
+    def run(self, *args, **kwargs):
+        """Apply the schema statements and report what was created or rejected."""
+        if not neo4j_is_configured():
+            msg = "Neo4j connection settings (NEO4J_URI, NEO4J_USER, NEO4J_PASSWORD) are not configured in Nautobot settings."
+            self.logger.error(msg)
+            raise RuntimeError(msg)
+
+        driver = verify_neo4j_connectivity(force=True)
+        with driver.session(database=get_neo4j_database()) as session:
+            result = ensure_topology_schema(
+                session, batch_size=get_sync_settings()["batch_size"], job_logger=self.logger
+            )
+
+        self.logger.info("Ensured Neo4j schema objects: %s", ", ".join(result["applied"]) or "none")
+        self.logger.info(
+            "Backfilled %s node and %s tunnel lowercase properties.",
+            result["backfilled"].get("nodes", 0),
+            result["backfilled"].get("tunnels", 0),
+        )
+        if result["failed"]:
+            raise RuntimeError(f"Neo4j rejected {len(result['failed'])} schema statement(s): {result['failed']}")
+        return f"Neo4j topology schema ready ({len(result['applied'])} constraints/indexes)."
+
+
+jobs = [BootstrapNeo4jSchemaJob]
@@ -0,0 +1,63 @@
+"""Job to generate a synthetic VPN inventory for load tests and benchmarks."""
+
+import logging
+import time
+
+from django.db import transaction
+from nautobot.extras.jobs import IntegerVar, Job, StringVar
+
+from nautobot_app_vpn.synthetic import SyntheticVPNInventory
+from nautobot_app_vpn.topology.backends import get_topology_backend
+from nautobot_app_vpn.topology.cache import bump_filter_options_version, bump_sync_generation
+
+logger = logging.getLogger(__name__)
+
+name = "Virtual Private Network (VPN)"  # pylint: disable=invalid-name
+
+
+class GenerateSyntheticInventoryJob(Job):
+    """Job to bulk-generate a reproducible VPN inventory of a given size."""
+
+    class Meta:
+        name = "Generate Synthetic VPN Inventory"
+        description = (
+            "Bulk-creates locations, HA firewall pairs, crypto profiles, IKE gateways, IPSec tunnels and proxy IDs "
+            "named after a prefix, for load tests and benchmarks. Do not run against production data."
+        )
+
+    prefix = StringVar(default="synthetic", description="Name prefix of every generated object; must be unused.")
+    tunnels = IntegerVar(default=1000, min_value=1, description="Number of tunnels (and gateways, HA pairs).")
+    locations = IntegerVar(default=50, min_value=1, description="Number of locations the firewalls are spread over.")
+    proxy_ids = IntegerVar(default=2, min_value=0, description="Proxy IDs per tunnel.")
+    seed = IntegerVar(default=0, description="Random seed; the same inputs always generate the same inventory.")
+    batch_size = IntegerVar(
+        default=1000, min_value=1, description="Tunnels created per transaction (bounds memory and lock time)."
+    )
+
+    def run(  # pylint: disable=arguments-differ, too-many-arguments
+        self, *args, prefix="synthetic", tunnels=1000, locations=50, proxy_ids=2, seed=0, batch_size=1000, **kwargs
+    ):
+        """Generate the inventory in `batch_size` steps, each committed on its own."""
+        if SyntheticVPNInventory.exists(prefix):
+            msg = f"An inventory with prefix {prefix!r} already exists; choose another prefix."
+            self.logger.error(msg)
+            raise RuntimeError(msg)
+
+        started = time.monotonic()
+        with transaction.atomic():
+            inventory = SyntheticVPNInventory(prefix, locations=locations, proxy_ids=proxy_ids, seed=seed)
+        while inventory.units < tunnels:
+            with transaction.atomic():
+                inventory.create(min(batch_size, tunnels - inventory.units))
+            self.logger.info("Created %s/%s tunnels in %.1fs.", inventory.units, tunnels, time.monotonic() - started)
+
+        # bulk_create sends no signals: invalidate the caches the signal handlers would have.
+        bump_filter_options_version()
+        if get_topology_backend().live:
+            bump_sync_generation()
+        else:
+            self.logger.info("Run the topology sync job to publish the new inventory to the topology view.")
+        return f"Generated {inventory.units} tunnels over {locations} locations in {time.monotonic() - started:.1f}s."
+
+
+jobs = [GenerateSyntheticInventoryJob]
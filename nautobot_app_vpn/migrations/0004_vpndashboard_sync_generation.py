@@ -0,0 +1,19 @@
+# Generated by Django 4.2.30 on 2026-10-17
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("nautobot_app_vpn", "0003_add_tenancy_fields"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="vpndashboard",
+            name="sync_generation",
+            field=models.PositiveBigIntegerField(
+                default=0, help_text="Incremented on every topology sync; invalidates cached topology responses"
+            ),
+        ),
+    ]
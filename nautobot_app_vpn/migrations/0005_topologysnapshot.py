@@ -0,0 +1,51 @@
+# Generated by Django 4.2.30 on 2026-10-17
+
+from django.db import migrations, models
+import uuid
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("nautobot_app_vpn", "0004_vpndashboard_sync_generation"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="TopologySnapshot",
+            fields=[
+                (
+                    "id",
+                    models.UUIDField(
+                        default=uuid.uuid4, editable=False, primary_key=True, serialize=False, unique=True
+                    ),
+                ),
+                (
+                    "generation",
+                    models.PositiveBigIntegerField(help_text="VPNDashboard sync generation the payload was built for"),
+                ),
+                (
+                    "backend",
+                    models.CharField(help_text="Topology backend the payload was read from", max_length=100),
+                ),
+                (
+                    "format",
+                    models.CharField(default="json", help_text="API renderer format of the payload", max_length=20),
+                ),
+                ("created", models.DateTimeField(auto_now_add=True, help_text="When the snapshot was written")),
+                (
+                    "payload",
+                    models.BinaryField(help_text="Gzip-compressed response with a tunnel statistics placeholder"),
+                ),
+                (
+                    "size",
+                    models.PositiveBigIntegerField(default=0, help_text="Uncompressed payload size in bytes"),
+                ),
+            ],
+            options={
+                "verbose_name": "Topology Snapshot",
+                "verbose_name_plural": "Topology Snapshots",
+                "ordering": ["-generation"],
+                "unique_together": {("backend", "generation", "format")},
+            },
+        ),
+    ]
@@ -0,0 +1,20 @@
+# Generated by Django 4.2.30 on 2026-10-17 06:28
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("nautobot_app_vpn", "0005_topologysnapshot"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="ikegateway",
+            index=models.Index(fields=["name", "id"], name="vpn_ikegateway_name_id_idx"),
+        ),
+        migrations.AddIndex(
+            model_name="ipsectunnel",
+            index=models.Index(fields=["name", "id"], name="vpn_ipsectunnel_name_id_idx"),
+        ),
+    ]
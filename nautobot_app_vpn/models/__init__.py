@@ -23,6 +23,7 @@ from .ikecrypto import IKECrypto
 from .ikegateway import IKEGateway
 from .ipseccrypto import IPSecCrypto
 from .ipsectunnel import IPSecProxyID, IPSECTunnel, TunnelRoleChoices
+from .topology_snapshot import TopologySnapshot
 from .tunnelmonitor import TunnelMonitorActionChoices, TunnelMonitorProfile
 from .vpn_dashboard import VPNDashboard
 
@@ -37,6 +38,7 @@ __all__ = [
     "IPSecProxyID",
     "TunnelRoleChoices",
     "VPNDashboard",
+    "TopologySnapshot",
     "TunnelMonitorProfile",
     "EncryptionAlgorithms",
     "AuthenticationAlgorithms",
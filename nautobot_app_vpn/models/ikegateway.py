@@ -244,30 +244,41 @@ class IKEGateway(PrimaryModel, ChangeLoggedModel):
         verbose_name = "IKE Gateway"
         verbose_name_plural = "IKE Gateways"
         ordering = ["name"]
+        # Names are not unique: keyset API pagination orders by (name, id).
+        indexes = [models.Index(fields=["name", "id"], name="vpn_ikegateway_name_id_idx")]
 
     def __str__(self):
         return self.name
 
     # --- Optional Helper Properties ---
+    # Each name list is read from the matching annotation when the queryset carries it
+    # (see models.querysets.annotate_ikegateway_list), so list views render without per-row queries.
+    def _annotated_names(self, annotation, relation):
+        names = getattr(self, annotation, None)
+        if names is None:
+            # Skip unnamed devices, as the STRING_AGG/GROUP_CONCAT annotation does.
+            names = ", ".join([obj.name for obj in getattr(self, relation).all() if obj.name is not None])
+        return names
+
     @property
     def local_device_names(self):
         """Returns comma-separated names of local devices."""
-        return ", ".join([dev.name for dev in self.local_devices.all()])
+        return self._annotated_names("_local_device_names", "local_devices")
 
     @property
     def peer_device_names(self):
         """Returns comma-separated names of peer devices."""
-        return ", ".join([dev.name for dev in self.peer_devices.all()])
+        return self._annotated_names("_peer_device_names", "peer_devices")
 
     @property
     def local_location_names(self):
         """Returns comma-separated names of local locations."""
-        return ", ".join([loc.name for loc in self.local_locations.all()])
+        return self._annotated_names("_local_location_names", "local_locations")
 
     @property
     def peer_location_display(self):
         """Returns combined peer location information."""
-        selected_locs = ", ".join([loc.name for loc in self.peer_locations.all()])
+        selected_locs = self._annotated_names("_peer_location_names", "peer_locations")
         manual_loc = self.peer_location_manual
 
         if selected_locs and manual_loc:
@@ -281,9 +292,9 @@ class IKEGateway(PrimaryModel, ChangeLoggedModel):
     @property
     def peer_device_display(self):
         """Returns combined peer device information with manual fallback."""
-        devices = list(self.peer_devices.all())
-        if devices:
-            return ", ".join(str(dev) for dev in devices)
+        names = self.peer_device_names
+        if names:
+            return names
         if self.peer_device_manual:
             return f"{self.peer_device_manual} (Manual)"
         return "—"
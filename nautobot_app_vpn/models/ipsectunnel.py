@@ -116,6 +116,8 @@ class IPSECTunnel(PrimaryModel):
         verbose_name = "IPSec Tunnel"
         verbose_name_plural = "IPSec Tunnels"
         ordering = ["name", "role"]
+        # Names are not unique: keyset API pagination orders by (name, id).
+        indexes = [models.Index(fields=["name", "id"], name="vpn_ipsectunnel_name_id_idx")]
 
     def __str__(self):
         return self.name
@@ -123,7 +125,19 @@ class IPSECTunnel(PrimaryModel):
     @property
     def device_names(self):
         """Return a comma-separated list of device names associated with this tunnel."""
-        return ", ".join([dev.name for dev in self.devices.all()])
+        # Annotated by models.querysets.annotate_ipsectunnel_list for list views.
+        names = getattr(self, "_device_names", None)
+        if names is None:
+            names = ", ".join([dev.name for dev in self.devices.all() if dev.name is not None])
+        return names
+
+    @property
+    def proxy_id_count(self):
+        """Return the number of Proxy IDs of this tunnel."""
+        count = getattr(self, "_proxy_id_count", None)
+        if count is None:
+            count = len(self.proxy_ids.all())
+        return count
 
     def clean(self):
         super().clean()
@@ -0,0 +1,57 @@
+"""QuerySet annotations backing the computed columns of the VPN list tables."""
+
+from django.db.models import Aggregate, OuterRef, Subquery, TextField, Value
+from django.db.models.functions import Coalesce
+from nautobot.core.models.querysets import count_related
+
+from .ikegateway import IKEGateway
+from .ipsectunnel import IPSecProxyID, IPSECTunnel
+
+
+class GroupConcat(Aggregate):  # pylint: disable=abstract-method
+    """Sorted, comma-separated concatenation of a text column: GROUP_CONCAT on MySQL, STRING_AGG on PostgreSQL."""
+
+    function = "GROUP_CONCAT"
+    template = "%(function)s(%(expressions)s ORDER BY %(expressions)s SEPARATOR ', ')"
+    output_field = TextField()
+
+    def as_postgresql(self, compiler, connection, **extra_context):
+        """Render as STRING_AGG, which takes the separator as its second argument."""
+        return self.as_sql(
+            compiler,
+            connection,
+            function="STRING_AGG",
+            template="%(function)s(%(expressions)s, ', ' ORDER BY %(expressions)s)",
+            **extra_context,
+        )
+
+
+def concat_related(model, field, value_field):
+    """Return a Subquery annotating the sorted, comma-separated `value_field` values of related `model` rows.
+
+    Args:
+        model (Model): The related (or M2M through) model to aggregate
+        field (str): The field on `model` which points back to the OuterRef model
+        value_field (str): The field (or lookup) on `model` to concatenate
+    """
+    qs = model.objects.filter(**{field: OuterRef("pk")}).order_by().values(field)
+    qs = qs.annotate(names=GroupConcat(value_field)).values("names")
+    return Coalesce(Subquery(qs, output_field=TextField()), Value(""), output_field=TextField())
+
+
+def annotate_ikegateway_list(queryset):
+    """Annotate an IKEGateway queryset with the device and location names shown by IKEGatewayTable."""
+    return queryset.annotate(
+        _local_device_names=concat_related(IKEGateway.local_devices.through, "ikegateway", "device__name"),
+        _peer_device_names=concat_related(IKEGateway.peer_devices.through, "ikegateway", "device__name"),
+        _local_location_names=concat_related(IKEGateway.local_locations.through, "ikegateway", "location__name"),
+        _peer_location_names=concat_related(IKEGateway.peer_locations.through, "ikegateway", "location__name"),
+    )
+
+
+def annotate_ipsectunnel_list(queryset):
+    """Annotate an IPSECTunnel queryset with the device names and proxy ID count shown by IPSECTunnelTable."""
+    return queryset.annotate(
+        _device_names=concat_related(IPSECTunnel.devices.through, "ipsectunnel", "device__name"),
+        _proxy_id_count=count_related(IPSecProxyID, "tunnel"),
+    )
@@ -0,0 +1,27 @@
+"""Pre-rendered dashboard topology payloads written by the Neo4j sync job."""
+
+from django.db import models
+from nautobot.core.models import BaseModel
+
+
+class TopologySnapshot(BaseModel):
+    """Compressed unfiltered topology response in one wire format for one sync generation, minus tunnel statistics.
+
+    A placeholder member marks where the statistics go (see `nautobot_app_vpn.topology.snapshot`).
+    """
+
+    generation = models.PositiveBigIntegerField(help_text="VPNDashboard sync generation the payload was built for")
+    backend = models.CharField(max_length=100, help_text="Topology backend the payload was read from")
+    format = models.CharField(max_length=20, default="json", help_text="API renderer format of the payload")
+    created = models.DateTimeField(auto_now_add=True, help_text="When the snapshot was written")
+    payload = models.BinaryField(help_text="Gzip-compressed response with a tunnel statistics placeholder")
+    size = models.PositiveBigIntegerField(default=0, help_text="Uncompressed payload size in bytes")
+
+    class Meta:
+        verbose_name = "Topology Snapshot"
+        verbose_name_plural = "Topology Snapshots"
+        ordering = ["-generation"]
+        unique_together = [("backend", "generation", "format")]
+
+    def __str__(self):
+        return f"{self.backend} topology (generation {self.generation}, {self.format})"
@@ -40,6 +40,11 @@ class VPNDashboard(BaseModel):
     )
     last_push_time = models.DateTimeField(null=True, blank=True, help_text="Timestamp of last successful config push")
 
+    # Bumped whenever the Neo4j topology changes; part of every cached topology API response key.
+    sync_generation = models.PositiveBigIntegerField(
+        default=0, help_text="Incremented on every topology sync; invalidates cached topology responses"
+    )
+
     class Meta:
         verbose_name = "VPN Dashboard"
         verbose_name_plural = "VPN Dashboards"
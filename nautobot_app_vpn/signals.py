@@ -0,0 +1,146 @@
+"""Signal handlers feeding model changes into the near-real-time topology sync queue and API cache invalidation."""
+
+from django.db import transaction
+from django.db.models import Q
+from django.db.models.signals import m2m_changed, post_delete, post_save, pre_delete
+from nautobot.dcim.models import Device, Location, Platform
+from nautobot.extras.models import Status
+
+from nautobot_app_vpn.models import IKEGateway, IPSECTunnel
+from nautobot_app_vpn.topology.backends import get_topology_backend
+from nautobot_app_vpn.topology.cache import bump_filter_options_version, bump_sync_generation
+from nautobot_app_vpn.topology.realtime import get_change_queue, get_realtime_sync_settings
+
+# Only saves touching these fields can change a VPNNode payload; saves with other `update_fields` are ignored.
+DEVICE_TOPOLOGY_FIELDS = frozenset(
+    {"name", "platform", "role", "location", "status", "device_type", "primary_ip4", "_custom_field_data"}
+)
+LOCATION_TOPOLOGY_FIELDS = frozenset({"name", "latitude", "longitude", "_custom_field_data"})
+# Device fields the dashboard filter options are derived from.
+DEVICE_FILTER_OPTION_FIELDS = frozenset({"name", "location", "platform"})
+
+
+def dispatch_topology_change(kind, pks):
+    """Feed committed changes to the realtime sync worker and/or invalidate responses of a live backend."""
+    if get_realtime_sync_settings()["enabled"]:
+        get_change_queue().enqueue(kind, pks)
+    if get_topology_backend().live:
+        bump_sync_generation()
+
+
+def queue_topology_change(kind, pks):
+    """Dispatch changed objects once the surrounding transaction commits (nothing is dispatched on rollback)."""
+    pks = [pk for pk in pks if pk is not None]
+    if pks:
+        transaction.on_commit(lambda: dispatch_topology_change(kind, pks))
+
+
+def _touches(update_fields, relevant_fields):
+    return update_fields is None or not relevant_fields.isdisjoint(update_fields)
+
+
+def tunnel_changed(sender, instance, **kwargs):  # pylint: disable=unused-argument
+    """IPSECTunnel saved or deleted."""
+    queue_topology_change("tunnel", [instance.pk])
+
+
+def gateway_saved(sender, instance, **kwargs):  # pylint: disable=unused-argument
+    """IKEGateway saved: refresh every tunnel using it."""
+    queue_topology_change("gateway", [instance.pk])
+
+
+def gateway_devices_changed(sender, instance, action, reverse, pk_set, **kwargs):  # pylint: disable=unused-argument
+    """IKEGateway.local_devices / peer_devices membership changed, from either side of the relation."""
+    if not reverse:
+        if action.startswith("post_"):
+            queue_topology_change("gateway", [instance.pk])
+    elif action in ("post_add", "post_remove"):
+        queue_topology_change("gateway", pk_set or ())
+    elif action == "pre_clear":
+        # `pk_set` is not provided for clear(); capture the device's gateways before the rows go away.
+        queue_topology_change("gateway", sender.objects.filter(device=instance).values_list("ikegateway_id", flat=True))
+
+
+def device_saved(sender, instance, update_fields=None, **kwargs):  # pylint: disable=unused-argument
+    """Device saved: refresh tunnels whose gateways reference it."""
+    if _touches(update_fields, DEVICE_TOPOLOGY_FIELDS):
+        queue_topology_change("device", [instance.pk])
+
+
+def device_deleted(sender, instance, **kwargs):  # pylint: disable=unused-argument
+    """Device about to be deleted: its gateway memberships vanish with it, so resolve the tunnels right now."""
+    queue_topology_change(
+        "tunnel",
+        IPSECTunnel.objects.filter(Q(ike_gateway__local_devices=instance) | Q(ike_gateway__peer_devices=instance))
+        .values_list("pk", flat=True)
+        .distinct(),
+    )
+
+
+def location_saved(sender, instance, update_fields=None, **kwargs):  # pylint: disable=unused-argument
+    """Location saved: coordinates, name or country of the device groups placed there may have changed."""
+    if _touches(update_fields, LOCATION_TOPOLOGY_FIELDS):
+        queue_topology_change("location", [instance.pk])
+
+
+# (signal, signal name, handler, sender) of the realtime sync handlers.
+REALTIME_SYNC_RECEIVERS = (
+    (post_save, "post_save", tunnel_changed, IPSECTunnel),
+    (post_delete, "post_delete", tunnel_changed, IPSECTunnel),
+    (post_save, "post_save", gateway_saved, IKEGateway),
+    (m2m_changed, "m2m_changed", gateway_devices_changed, IKEGateway.local_devices.through),
+    (m2m_changed, "m2m_changed", gateway_devices_changed, IKEGateway.peer_devices.through),
+    (post_save, "post_save", device_saved, Device),
+    (pre_delete, "pre_delete", device_deleted, Device),
+    (post_save, "post_save", location_saved, Location),
+)
+
+
+def realtime_sync_dispatch_uid(signal_name, sender):
+    """Dispatch UID of a realtime sync handler, so connecting twice is harmless."""
+    return f"nautobot_app_vpn.realtime_sync.{signal_name}.{sender._meta.label_lower}"
+
+
+def connect_realtime_sync_signals():
+    """Connect the change handlers; called from AppConfig.ready() for realtime sync or a live topology backend."""
+    for signal, signal_name, handler, sender in REALTIME_SYNC_RECEIVERS:
+        signal.connect(handler, sender=sender, weak=False, dispatch_uid=realtime_sync_dispatch_uid(signal_name, sender))
+
+
+def disconnect_realtime_sync_signals():
+    """Disconnect the change handlers connected by `connect_realtime_sync_signals`."""
+    for signal, signal_name, _, sender in REALTIME_SYNC_RECEIVERS:
+        signal.disconnect(sender=sender, dispatch_uid=realtime_sync_dispatch_uid(signal_name, sender))
+
+
+def filter_options_changed(sender, update_fields=None, action=None, **kwargs):  # pylint: disable=unused-argument
+    """Data behind the dashboard filter options changed: recompute them after the transaction commits."""
+    if action is not None and not action.startswith("post_"):
+        return
+    if sender is Device and not _touches(update_fields, DEVICE_FILTER_OPTION_FIELDS):
+        return
+    transaction.on_commit(bump_filter_options_version)
+
+
+def connect_filter_options_signals():
+    """Connect the filter-options cache invalidation handlers; always called from AppConfig.ready()."""
+    for signal, signal_name, sender in (
+        (post_save, "post_save", IPSECTunnel),
+        (post_delete, "post_delete", IPSECTunnel),
+        (post_save, "post_save", IKEGateway),
+        (post_delete, "post_delete", IKEGateway),
+        (m2m_changed, "m2m_changed", IKEGateway.local_devices.through),
+        (m2m_changed, "m2m_changed", IKEGateway.peer_devices.through),
+        (post_save, "post_save", Device),
+        (post_delete, "post_delete", Device),
+        (post_save, "post_save", Location),
+        (post_save, "post_save", Platform),
+        (post_delete, "post_delete", Platform),
+        (post_save, "post_save", Status),
+    ):
+        signal.connect(
+            filter_options_changed,
+            sender=sender,
+            weak=False,
+            dispatch_uid=f"nautobot_app_vpn.filter_options.{signal_name}.{sender._meta.label_lower}",
+        )
@@ -42,7 +42,10 @@
 
     highlightTerm: "",
     didAutoCenterForHighlight: false,
-    userInteracting: false
+    userInteracting: false,
+
+    // Devices/tunnels come from the topology-tiles endpoint instead of one GeoJSON payload
+    vectorTiles: !!(els.map && els.map.dataset.vectorTiles === "true")
   };
 
   // ---------- UTIL ----------
@@ -84,6 +87,71 @@
     });
   }
 
+  const TOPOLOGY_URL = "/api/plugins/nautobot_app_vpn/v1/topology-neo4j/";
+  const TOPOLOGY_TILES_URL = "/api/plugins/nautobot_app_vpn/v1/topology-tiles/{z}/{x}/{y}.mvt";
+
+  // Filters the topology endpoints apply server-side (scope and search stay client-side).
+  function serverFilterParams(filters) {
+    const params = {};
+    ["country", "role", "status", "ike_version", "location", "device", "platform"].forEach(key => {
+      if (filters[key]) params[key] = filters[key];
+    });
+    return params;
+  }
+
+  function tileURL(filters) {
+    const qs = new URLSearchParams(serverFilterParams(filters)).toString();
+    return `${window.location.origin}${TOPOLOGY_TILES_URL}${qs ? `?${qs}` : ""}`;
+  }
+
+  // One vector source with a layer per kind in tile mode, one GeoJSON source per kind otherwise.
+  function layerSource(kind) {
+    return state.vectorTiles ? { source: "vpn-topology-tiles", "source-layer": kind } : { source: `vpn-${kind}` };
+  }
+
+  // ---------- COLUMNAR (?format=columnar) ----------
+  function columnValue(col, i) {
+    if (col && !Array.isArray(col) && Array.isArray(col.codes)) return col.dictionary[col.codes[i]];
+    return col ? col[i] : undefined;
+  }
+
+  // Rebuild a FeatureCollection from parallel (optionally dictionary-encoded) columns and flat coordinates.
+  function decodeColumnar(block, derive) {
+    if (!block || !block.count) return emptyFC();
+    const cols = block.columns || {};
+    const keys = Object.keys(cols);
+    const tipKeys = block.tooltip ? Object.keys(block.tooltip) : [];
+    const c = block.coordinates || [];
+    const isPoint = block.geometry === "Point";
+    const features = new Array(block.count);
+    for (let i = 0; i < block.count; i++) {
+      const props = {};
+      keys.forEach(k => { props[k] = columnValue(cols[k], i); });
+      if (block.tooltip) {
+        const tip = {};
+        tipKeys.forEach(k => {
+          const v = columnValue(block.tooltip[k], i);
+          if (v != null) tip[k] = v;
+        });
+        props.tooltip = ("" in tip) ? tip[""] : (tipKeys.length ? JSON.stringify(tip) : "");
+      }
+      if (derive) derive(props);
+      features[i] = {
+        type: "Feature",
+        geometry: isPoint
+          ? { type: "Point", coordinates: [c[2 * i], c[2 * i + 1]] }
+          : { type: "LineString", coordinates: [[c[4 * i], c[4 * i + 1]], [c[4 * i + 2], c[4 * i + 3]]] },
+        properties: props
+      };
+    }
+    return { type: "FeatureCollection", features };
+  }
+
+  // search_text is not sent in columnar form; rebuild it like the server does.
+  function deriveDeviceSearchText(p) {
+    p.search_text = [p.name, p.role, p.platform, p.country, p.location].filter(Boolean).join(" ");
+  }
+
   function coerceFeatureCollection(maybe) {
     if (!maybe) return { type: "FeatureCollection", features: [] };
     if (maybe.type === "FeatureCollection") return maybe;
@@ -220,8 +288,8 @@
       state.mapReady = true;
       addSourcesAndLayers();
       refreshMapSources(); // empty until data arrives
-      loadFilters().finally(() => {
-        fetchFullGraph().then(() => {
+      loadFilters().then(refreshFacetCounts).finally(() => {
+        (state.vectorTiles ? Promise.resolve() : fetchFullGraph()).then(() => {
           applyFiltersAndRender(); // initial render
         });
       });
@@ -255,15 +323,19 @@
   function addSourcesAndLayers() {
     if (!state.mapReady || state.sourcesAdded) return;
 
-    state.map.addSource("vpn-devices", { type: "geojson", data: emptyFC() });
-    state.map.addSource("vpn-tunnels", { type: "geojson", data: emptyFC() });
+    if (state.vectorTiles) {
+      state.map.addSource("vpn-topology-tiles", { type: "vector", tiles: [tileURL(collectFilters())], maxzoom: 14 });
+    } else {
+      state.map.addSource("vpn-devices", { type: "geojson", data: emptyFC() });
+      state.map.addSource("vpn-tunnels", { type: "geojson", data: emptyFC() });
+    }
     state.map.addSource("vpn-ha-links", { type: "geojson", data: emptyFC() });
 
     // Devices (points)
     state.map.addLayer({
       id: "vpn-devices",
       type: "circle",
-      source: "vpn-devices",
+      ...layerSource("devices"),
       paint: {
         "circle-radius": ["interpolate", ["linear"], ["zoom"], 1, 3, 4, 5, 6, 7, 8, 9, 10, 11, 12, 13],
         "circle-color": [
@@ -282,7 +354,7 @@
     state.map.addLayer({
       id: "vpn-devices-highlight",
       type: "circle",
-      source: "vpn-devices",
+      ...layerSource("devices"),
       filter: ["==", ["get", "__highlight"], true],
       paint: {
         "circle-radius": ["interpolate", ["linear"], ["zoom"], 1, 6, 6, 10],
@@ -301,7 +373,7 @@
     state.map.addLayer({
       id: "vpn-tunnels-primary",
       type: "line",
-      source: "vpn-tunnels",
+      ...layerSource("tunnels"),
       filter: ["==", ["downcase", ["coalesce", ["get", "role"], ""]], "primary"],
       layout: commonLayout,
       paint: Object.assign({}, tunnelWidthPaint(), tunnelColorPaint(), { "line-dasharray": [1, 0] })
@@ -310,7 +382,7 @@
     state.map.addLayer({
       id: "vpn-tunnels-secondary",
       type: "line",
-      source: "vpn-tunnels",
+      ...layerSource("tunnels"),
       filter: ["==", ["downcase", ["coalesce", ["get", "role"], ""]], "secondary"],
       layout: commonLayout,
       paint: Object.assign({}, tunnelWidthPaint(), tunnelColorPaint(), { "line-dasharray": [2, 2] })
@@ -319,7 +391,7 @@
     state.map.addLayer({
       id: "vpn-tunnels-tertiary",
       type: "line",
-      source: "vpn-tunnels",
+      ...layerSource("tunnels"),
       filter: ["all",
         ["!=", ["downcase", ["coalesce", ["get", "role"], ""]], "primary"],
         ["!=", ["downcase", ["coalesce", ["get", "role"], ""]], "secondary"]
@@ -333,7 +405,7 @@
     state.map.addLayer({
       id: "vpn-tunnel-labels",
       type: "symbol",
-      source: "vpn-tunnels",
+      ...layerSource("tunnels"),
       layout: {
         "symbol-placement": "line-center",
         "text-field": ["coalesce", ["get", "name"], ""],
@@ -611,6 +683,37 @@
     }).catch(() => { /* non-fatal */ });
   }
 
+  function facetSelects() {
+    return [
+      ["country", els.fCountry],
+      ["role", els.fRole],
+      ["status", els.fStatus],
+      ["ike_version", els.fIke],
+      ["location", els.fLocation],
+      ["device", els.fDevice],
+      ["platform", els.fPlatform]
+    ];
+  }
+
+  // Label options with the tunnel count they would leave given the other selections; disable dead ends.
+  function refreshFacetCounts() {
+    const params = { facets: "true", ...serverFilterParams(collectFilters()) };
+    return getJSON("/api/plugins/nautobot_app_vpn/v1/topology-filters/", params).then(data => {
+      facetSelects().forEach(([key, sel]) => {
+        if (!sel || !Array.isArray(data?.[key])) return;
+        const counts = new Map(data[key].map(e => [String(e.value).toLowerCase(), e.tunnels]));
+        Array.from(sel.options).forEach(o => {
+          if (!o.value) return;
+          if (!o.dataset.label) o.dataset.label = o.textContent;
+          const count = counts.get(o.value.toLowerCase());
+          o.textContent = count == null ? o.dataset.label : `${o.dataset.label} (${count})`;
+          o.disabled = count == null && o.value !== sel.value;
+        });
+        if (window.jQuery && window.$ && $(sel).data("select2")) $(sel).trigger("change.select2");
+      });
+    }).catch(() => { /* non-fatal: plain option labels stay */ });
+  }
+
   function collectFilters() {
     return {
       country: val(els.fCountry),
@@ -628,10 +731,11 @@
   // Fetch unfiltered once; we’ll filter client-side so peer endpoints remain visible.
   function fetchFullGraph() {
     show(els.loading);
-    return getJSON("/api/plugins/nautobot_app_vpn/v1/topology-neo4j/", null)
+    return getJSON(TOPOLOGY_URL, { format: "columnar" })
       .then((payload) => {
-        let devFC = coerceFeatureCollection(payload?.devices);
-        let tunFC = coerceFeatureCollection(payload?.tunnels);
+        const columnar = payload?.format === "columnar";
+        let devFC = columnar ? decodeColumnar(payload.devices, deriveDeviceSearchText) : coerceFeatureCollection(payload?.devices);
+        let tunFC = columnar ? decodeColumnar(payload.tunnels) : coerceFeatureCollection(payload?.tunnels);
 
         // Accept flat arrays too (lon/lat on each device object)
         if (devFC.features.length === 0 && Array.isArray(payload?.devices)) {
@@ -660,8 +764,27 @@
       .finally(() => hide(els.loading));
   }
 
+  // Vector tile mode: the map streams tiles, so only the counts are fetched (as a fully clustered world view).
+  function fetchTileMeta() {
+    return getJSON(TOPOLOGY_URL, { zoom: "0", ...serverFilterParams(collectFilters()) })
+      .then((payload) => {
+        state.stats = payload?.stats || null;
+        state.meta = payload?.meta || null;
+        state.lastSyncedUTC = payload?.meta?.last_synced || "";
+        renderStatsLine();
+      })
+      .catch((err) => console.error("Failed to load topology counts:", err));
+  }
+
   // Apply UI filters, keeping tunnels that match edge filters AND touch matched devices.
   function applyFiltersAndRender() {
+    if (state.vectorTiles) {
+      // Filters are applied server-side by requesting tiles with them.
+      const src = state.map && state.map.getSource("vpn-topology-tiles");
+      if (src && src.setTiles) src.setTiles([tileURL(collectFilters())]);
+      fetchTileMeta();
+      return;
+    }
     if (!state.fullGraph) {
       state.lastGraph = { devices: emptyFC(), tunnels: emptyFC(), ha: emptyFC() };
       refreshMapSources();
@@ -968,6 +1091,7 @@
       els.btnApply.addEventListener("click", () => {
         state.userInteracting = false; // allow fit after new filters
         applyFiltersAndRender();
+        refreshFacetCounts();
       });
     }
     if (els.btnReset) {
@@ -986,6 +1110,7 @@
         state.userInteracting = false;
         state.highlightTerm = "";
         applyFiltersAndRender();
+        refreshFacetCounts();
       });
     }
     if (els.search) {
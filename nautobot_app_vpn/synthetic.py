@@ -0,0 +1,250 @@
+"""Seeded generator of synthetic VPN inventories, for load tests, benchmarks and the test suite."""
+
+import random
+
+from django.contrib.contenttypes.models import ContentType
+from nautobot.dcim.models import Device, DeviceType, Interface, Location, LocationType, Manufacturer, Platform
+from nautobot.extras.models import Role, Status
+from nautobot.tenancy.models import Tenant, TenantGroup
+
+from nautobot_app_vpn.models import (
+    AuthenticationAlgorithm,
+    DiffieHellmanGroup,
+    EncryptionAlgorithm,
+    IKECrypto,
+    IKEGateway,
+    IPSecCrypto,
+    IPSecProxyID,
+    IPSECTunnel,
+    TunnelMonitorProfile,
+)
+from nautobot_app_vpn.models.ipsectunnel import TunnelRoleChoices
+
+# (name, latitude, longitude) of the metro areas locations are scattered around.
+METROS = (
+    ("New York", 40.71, -74.01),
+    ("Chicago", 41.88, -87.63),
+    ("Dallas", 32.78, -96.80),
+    ("San Jose", 37.34, -121.89),
+    ("Sao Paulo", -23.55, -46.63),
+    ("London", 51.51, -0.13),
+    ("Frankfurt", 50.11, 8.68),
+    ("Paris", 48.86, 2.35),
+    ("Stockholm", 59.33, 18.07),
+    ("Johannesburg", -26.20, 28.05),
+    ("Dubai", 25.20, 55.27),
+    ("Mumbai", 19.08, 72.88),
+    ("Singapore", 1.35, 103.82),
+    ("Tokyo", 35.68, 139.69),
+    ("Sydney", -33.87, 151.21),
+)
+
+
+class SyntheticVPNInventory:
+    """Create a VPN inventory in steps, bulk-inserting every per-tunnel row.
+
+    Each `create(count)` call adds `count` units, a unit being the HA pair of firewalls at one location, one IKE
+    gateway with both firewalls as local devices, one IPSec tunnel over it and `proxy_ids` proxy IDs. Every
+    `manual_peer_every`-th gateway has a manual (non-Nautobot) peer; the others peer with the pair of a random
+    earlier unit of the same or the previous step. Tunnels alternate between the primary and secondary role.
+    Every `profile_units` units share a new pair of IKE / IPSec crypto profiles; locations, tenants, platforms and
+    tunnel monitor profiles are created up front and shared. The same `seed` always produces the same inventory.
+
+    Objects are named after `prefix`, so several inventories can live side by side in one database.
+    """
+
+    def __init__(  # pylint: disable=too-many-arguments
+        self,
+        prefix="synthetic",
+        *,
+        locations=50,
+        proxy_ids=2,
+        manual_peer_every=3,
+        profile_units=5,
+        shared=2,
+        seed=0,
+    ):
+        """Create the shared objects (location type, locations, device type, role, platforms, tenants)."""
+        self.prefix = prefix
+        self.proxy_ids = proxy_ids
+        self.manual_peer_every = manual_peer_every
+        self.profile_units = profile_units
+        self.shared = shared
+        self.random = random.Random(seed)
+        self.units = 0
+        self.status = Status.objects.get(name="Active")
+        device_ct = ContentType.objects.get_for_model(Device)
+
+        location_type = LocationType.objects.create(name=f"{prefix} site")
+        location_type.content_types.add(device_ct)
+        self.locations = [self._create_location(index, location_type) for index in range(locations)]
+        manufacturer = Manufacturer.objects.create(name=f"{prefix} vendor")
+        self.device_type = DeviceType.objects.create(manufacturer=manufacturer, model=f"{prefix} firewall")
+        self.role = Role.objects.create(name=f"{prefix} firewall")
+        self.role.content_types.add(device_ct)
+        self.platforms = [
+            Platform.objects.create(name=f"{prefix}-os-{index}", manufacturer=manufacturer) for index in range(shared)
+        ]
+        tenant_group = TenantGroup.objects.create(name=f"{prefix} tenants")
+        self.tenants = [
+            Tenant.objects.create(name=f"{prefix} tenant {index}", tenant_group=tenant_group) for index in range(shared)
+        ]
+        self.monitor_profiles = [
+            TunnelMonitorProfile.objects.create(name=f"{prefix}-monitor-{index}", tenant=self.tenants[index])
+            for index in range(shared)
+        ]
+
+        self.algorithms = {
+            "encryption": list(EncryptionAlgorithm.objects.all()),
+            "authentication": list(AuthenticationAlgorithm.objects.all()),
+            "dh_group": list(DiffieHellmanGroup.objects.all()),
+        }
+        self.ike_cryptos = []
+        self.ipsec_cryptos = []
+        self.previous_pairs = []
+
+    @classmethod
+    def exists(cls, prefix):
+        """Return True if an inventory named after `prefix` was already generated in this database."""
+        return LocationType.objects.filter(name=f"{prefix} site").exists()
+
+    def _create_location(self, index, location_type):
+        metro, latitude, longitude = METROS[index % len(METROS)]
+        return Location.objects.create(
+            name=f"{self.prefix} {metro} {index:04d}",
+            location_type=location_type,
+            status=self.status,
+            latitude=round(latitude + self.random.uniform(-1.5, 1.5), 6),
+            longitude=round(longitude + self.random.uniform(-1.5, 1.5), 6),
+        )
+
+    def create(self, count):
+        """Add `count` units (see the class docstring) and return the new tunnels."""
+        first = self.units
+        self.units += count
+        indexes = range(first, self.units)
+        self._create_crypto_profiles(-(-self.units // self.profile_units))
+
+        devices = Device.objects.bulk_create(
+            Device(
+                name=f"{self.prefix}-fw-{index:06d}-{side}",
+                device_type=self.device_type,
+                role=self.role,
+                location=self.locations[index % len(self.locations)],
+                platform=self.platforms[index % self.shared],
+                status=self.status,
+            )
+            for index in indexes
+            for side in "ab"
+        )
+        pairs = [devices[offset : offset + 2] for offset in range(0, len(devices), 2)]
+        interfaces = Interface.objects.bulk_create(
+            Interface(device=pair[0], name="tunnel.1", type="tunnel", status=self.status) for pair in pairs
+        )
+
+        gateways = []
+        peers = []
+        previous = self.previous_pairs
+        for position, index in enumerate(indexes):
+            manual = index % self.manual_peer_every == 0 or not (previous or position)
+            peer_pair = None
+            if not manual:
+                choice = self.random.randrange(len(previous) + position)
+                peer_pair = previous[choice] if choice < len(previous) else pairs[choice - len(previous)]
+            gateways.append(
+                IKEGateway(
+                    name=f"{self.prefix}-gw-{index:06d}",
+                    local_ip=f"192.0.2.{index % 250 + 1}",
+                    peer_ip=f"198.51.100.{self.random.randint(1, 254)}",
+                    peer_device_manual=f"{self.prefix}-peer-{index:06d}" if manual else "",
+                    peer_location_manual=f"{self.prefix} peer site {index % 97}" if manual else "",
+                    authentication_type=self.random.choice(("psk", "cert")),
+                    ike_crypto_profile=self.ike_cryptos[index // self.profile_units],
+                    tenant=self.tenants[index % self.shared],
+                    local_platform=self.platforms[index % self.shared],
+                    peer_platform=self.platforms[(index + 1) % self.shared],
+                    status=self.status,
+                )
+            )
+            peers.append(peer_pair)
+        gateways = IKEGateway.objects.bulk_create(gateways)
+        self.previous_pairs = pairs
+
+        through = IKEGateway.local_devices.through
+        through.objects.bulk_create(
+            through(ikegateway=gateway, device=device) for gateway, pair in zip(gateways, pairs) for device in pair
+        )
+        through = IKEGateway.local_locations.through
+        through.objects.bulk_create(
+            through(ikegateway=gateway, location=pair[0].location) for gateway, pair in zip(gateways, pairs)
+        )
+        through = IKEGateway.peer_devices.through
+        through.objects.bulk_create(
+            through(ikegateway=gateway, device=device)
+            for gateway, peer_pair in zip(gateways, peers)
+            if peer_pair
+            for device in peer_pair
+        )
+        through = IKEGateway.peer_locations.through
+        through.objects.bulk_create(
+            through(ikegateway=gateway, location=peer_pair[0].location)
+            for gateway, peer_pair in zip(gateways, peers)
+            if peer_pair
+        )
+
+        tunnels = IPSECTunnel.objects.bulk_create(
+            IPSECTunnel(
+                name=f"{self.prefix}-tun-{index:06d}",
+                ike_gateway=gateway,
+                ipsec_crypto_profile=self.ipsec_cryptos[index // self.profile_units],
+                tunnel_interface=interface,
+                enable_tunnel_monitor=bool(index % 2),
+                monitor_destination_ip=f"10.255.{index % 250}.1" if index % 2 else "",
+                monitor_profile=self.monitor_profiles[index % self.shared] if index % 2 else None,
+                role=TunnelRoleChoices.SECONDARY if index % 2 else TunnelRoleChoices.PRIMARY,
+                tenant=self.tenants[index % self.shared],
+                status=self.status,
+            )
+            for index, gateway, interface in zip(indexes, gateways, interfaces)
+        )
+        through = IPSECTunnel.devices.through
+        through.objects.bulk_create(
+            through(ipsectunnel=tunnel, device=device) for tunnel, pair in zip(tunnels, pairs) for device in pair
+        )
+        IPSecProxyID.objects.bulk_create(
+            IPSecProxyID(
+                tunnel=tunnel,
+                local_subnet=f"10.{index % 250}.{side}.0/24",
+                remote_subnet=f"172.{16 + side % 16}.{self.random.randint(0, 255)}.0/24",
+            )
+            for index, tunnel in zip(indexes, tunnels)
+            for side in range(self.proxy_ids)
+        )
+        return tunnels
+
+    def _create_crypto_profiles(self, total):
+        """Bulk-create IKE and IPSec crypto profiles (with their algorithms) until there are `total` of each."""
+        new = range(len(self.ike_cryptos), total)
+        for model, kind, profiles in (
+            (IKECrypto, "ike", self.ike_cryptos),
+            (IPSecCrypto, "ipsec", self.ipsec_cryptos),
+        ):
+            created = model.objects.bulk_create(
+                model(
+                    name=f"{self.prefix}-{kind}-{index:05d}",
+                    lifetime=8,
+                    tenant=self.tenants[index % self.shared],
+                    tenant_group=self.tenants[index % self.shared].tenant_group,
+                    status=self.status,
+                )
+                for index in new
+            )
+            for field, algorithms in self.algorithms.items():
+                m2m = getattr(model, field).field
+                source, target = m2m.m2m_field_name(), m2m.m2m_reverse_field_name()
+                m2m.remote_field.through.objects.bulk_create(
+                    m2m.remote_field.through(**{source: profile, target: algorithm})
+                    for profile in created
+                    for algorithm in self.random.sample(algorithms, min(2, len(algorithms)))
+                )
+            profiles.extend(created)
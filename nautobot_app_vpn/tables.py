@@ -258,7 +258,7 @@ class IPSECTunnelTable(StatusTableMixin, BaseTable):
     tunnel_interface = tables.Column(linkify=True)
     enable_tunnel_monitor = BooleanColumn(verbose_name="Monitor")
     monitor_profile = tables.Column(linkify=True)
-    proxy_id_count = tables.Column(accessor=tables.A("proxy_ids.count"), verbose_name="Proxy IDs")
+    proxy_id_count = tables.Column(accessor="proxy_id_count", verbose_name="Proxy IDs")
     actions = ButtonsColumn(model=IPSECTunnel)
 
     class Meta(BaseTable.Meta):
@@ -0,0 +1 @@
+"""Unit tests for nautobot_app_vpn."""
@@ -0,0 +1,68 @@
+"""Tests for the page-number and keyset pagination of the REST API."""
+
+import base64
+import json
+
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from nautobot.core.testing import TestCase
+from rest_framework.settings import api_settings
+
+from nautobot_app_vpn.models import IPSecProxyID, IPSECTunnel
+from nautobot_app_vpn.tests.factory import VPNFixtureFactory
+
+UNITS = 30
+
+
+class KeysetPaginationTestCase(TestCase):
+    """`?pagination=cursor` walks a collection in (name, id) order with constant-cost pages and no count."""
+
+    def setUp(self):
+        super().setUp()
+        self.user.is_superuser = True
+        self.user.save()
+        VPNFixtureFactory(seed=0).create(UNITS)
+
+    def walk(self, viewname, page_size):
+        """Follow `next` from the first keyset page; return the result ids and the query count of every page."""
+        url, params = reverse(viewname), {"pagination": "cursor", "page_size": page_size}
+        self.client.get(url, params)  # warm per-process caches (content types, user config)
+        ids, queries = [], []
+        while url:
+            with CaptureQueriesContext(connection) as captured:
+                response = self.client.get(url, params)
+            self.assertHttpStatus(response, 200)
+            self.assertNotIn("count", response.data)
+            ids.extend(row["id"] for row in response.data["results"])
+            queries.append(len(captured))
+            url, params = response.data["next"], None
+        return ids, queries
+
+    def test_tunnels(self):
+        ids, queries = self.walk("plugins-api:nautobot_app_vpn-api:ipsectunnel-list", 7)
+        expected = [str(pk) for pk in IPSECTunnel.objects.order_by("name", "id").values_list("id", flat=True)]
+        self.assertEqual(ids, expected)
+        self.assertEqual(len(queries), -(-UNITS // 7))
+        self.assertEqual(len(set(queries)), 1, f"query count differs between pages: {queries}")
+
+    def test_proxy_ids(self):
+        ids, _ = self.walk("plugins-api:nautobot_app_vpn-api:ipsecproxyid-list", 11)
+        self.assertEqual(ids, [str(pk) for pk in IPSecProxyID.objects.order_by("id").values_list("id", flat=True)])
+
+    def test_invalid_cursor(self):
+        url = reverse("plugins-api:nautobot_app_vpn-api:ipsectunnel-list")
+        self.assertHttpStatus(self.client.get(url, {"cursor": "not-a-cursor"}), 404)
+        # Well-formed, but "x" is not a UUID.
+        cursor = base64.urlsafe_b64encode(json.dumps(["a", "x"]).encode()).decode()
+        self.assertHttpStatus(self.client.get(url, {"cursor": cursor}), 404)
+        self.assertHttpStatus(self.client.get(url, {"pagination": "cursor", api_settings.ORDERING_PARAM: "name"}), 400)
+
+    def test_page_number_parameters(self):
+        """Pagination, ordering and search parameters are not rejected as unknown filters."""
+        url = reverse("plugins-api:nautobot_app_vpn-api:ikegateway-list")
+        params = {"page": 2, "page_size": 10, api_settings.ORDERING_PARAM: "-name", api_settings.SEARCH_PARAM: "gw"}
+        response = self.client.get(url, params)
+        self.assertHttpStatus(response, 200)
+        self.assertEqual(response.data["count"], UNITS)
+        self.assertEqual(response.data["results"][0]["name"], f"fixture-gw-{UNITS - 11:06d}")
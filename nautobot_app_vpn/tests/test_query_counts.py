@@ -0,0 +1,90 @@
+"""Query-count regression tests: no UI or API view may issue more queries as the inventory grows."""
+
+import difflib
+import re
+
+from django.db import connection
+from django.test import tag
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from nautobot.core.testing import TestCase
+
+from nautobot_app_vpn import urls as ui_urls
+from nautobot_app_vpn.api import urls as api_urls
+from nautobot_app_vpn.api.pagination import StandardResultsSetPagination
+from nautobot_app_vpn.tests.factory import VPNFixtureFactory
+
+SMALL = 10
+LARGE = 1000
+
+# Literals vary between requests (primary keys, timestamps, page offsets); compare the statements without them.
+_SQL_LITERALS = re.compile(r"'(?:[^']|'')*'|\b\d+(?:\.\d+)?\b|\"_django_curs_\w+\"")
+
+
+def normalize_sql(sql):
+    """Return `sql` with its quoted and numeric literals replaced by ``?``."""
+    return _SQL_LITERALS.sub("?", sql)
+
+
+@tag("performance")
+class QueryCountTestCase(TestCase):
+    """Every list and detail view of the UI and the REST API is requested at SMALL and at LARGE units.
+
+    The endpoints are read from the URL routers, so new viewsets are covered automatically. Detail views are
+    requested for the same object at both sizes. On failure the message lists, per endpoint, a diff of the
+    (literal-free) SQL issued at each size.
+    """
+
+    def setUp(self):
+        super().setUp()
+        self.user.is_superuser = True
+        self.user.save()
+        self.factory = VPNFixtureFactory(seed=0)
+        self.factory.create(SMALL)
+
+    def endpoints(self, router, namespace, list_name, detail_name):
+        """Return ``[(label, url)]`` for the list and (when an object is visible) detail view of each viewset."""
+        result = []
+        for prefix, viewset, basename in router.registry:
+            result.append((f"{prefix} list", reverse(f"{namespace}:{list_name.format(basename)}")))
+            instance = viewset.queryset.first()
+            if instance is not None:
+                url = reverse(f"{namespace}:{detail_name.format(basename)}", kwargs={"pk": instance.pk})
+                result.append((f"{prefix} detail", url))
+        return result
+
+    def capture(self, endpoints, params):
+        """Request every endpoint (once to warm caches, then measured) and return ``{label: [sql, ...]}``."""
+        captured = {}
+        for label, url in endpoints:
+            self.client.get(url, params)
+            with CaptureQueriesContext(connection) as queries:
+                response = self.client.get(url, params)
+            self.assertHttpStatus(response, 200, msg=f"{label} ({url})")
+            captured[label] = [normalize_sql(query["sql"]) for query in queries.captured_queries]
+        return captured
+
+    def assertQueryCountsConstant(self, endpoints, params):  # pylint: disable=invalid-name
+        """Fail with a SQL diff for every endpoint whose query count differs between SMALL and LARGE."""
+        small = self.capture(endpoints, params)
+        self.factory.create(LARGE - SMALL)
+        large = self.capture(endpoints, params)
+
+        failures = []
+        for label, _ in endpoints:
+            if len(small[label]) == len(large[label]):
+                continue
+            diff = difflib.unified_diff(
+                small[label], large[label], f"{label} @ {SMALL}", f"{label} @ {LARGE}", lineterm="", n=1
+            )
+            failures.append(f"{label}: {len(small[label])} -> {len(large[label])} queries\n" + "\n".join(diff))
+        if failures:
+            self.fail("Query count grows with the inventory size:\n\n" + "\n\n".join(failures))
+
+    def test_ui_views(self):
+        endpoints = self.endpoints(ui_urls.router, "plugins:nautobot_app_vpn", "{}_list", "{}")
+        self.assertQueryCountsConstant(endpoints, {"per_page": LARGE})
+
+    def test_api_views(self):
+        endpoints = self.endpoints(api_urls.router, "plugins-api:nautobot_app_vpn-api", "{}-list", "{}-detail")
+        self.assertQueryCountsConstant(endpoints, {"page_size": StandardResultsSetPagination.max_page_size})
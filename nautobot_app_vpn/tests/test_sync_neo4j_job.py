@@ -0,0 +1,293 @@
+"""Tests for the incremental Neo4j topology sync, run against an in-memory stand-in for the graph."""
+
+from datetime import UTC, datetime, timedelta
+from unittest import mock
+
+from django.conf import settings
+from django.contrib.contenttypes.models import ContentType
+from django.test import SimpleTestCase, override_settings
+from nautobot.core.testing import TestCase
+from nautobot.dcim.models import Device, DeviceType, Interface, Location, LocationType, Manufacturer, Platform
+from nautobot.extras.models import Role, Status
+
+from nautobot_app_vpn.jobs.sync_neo4j_job import SyncNeo4jJob
+from nautobot_app_vpn.models import IKECrypto, IKEGateway, IPSecCrypto, IPSECTunnel
+from nautobot_app_vpn.topology.payloads import (
+    HASH_EXCLUDED_PROPERTIES,
+    TopologyPayloadBuilder,
+    payload_hash,
+    tunnel_queryset,
+)
+
+UNITS = 6
+
+
+def create_inventory(units):
+    """`units` HA firewall pairs, each with a gateway and tunnel to the previous pair (every third to a manual peer).
+
+    Platforms, tunnel roles and IKE versions alternate; the second location has no coordinates and the fifth tunnel
+    is planned.
+    """
+    status = Status.objects.get(name="Active")
+    planned = Status.objects.get(name="Planned")
+    device_ct = ContentType.objects.get_for_model(Device)
+    location_type = LocationType.objects.create(name="Sync Test Site")
+    location_type.content_types.add(device_ct)
+    locations = [
+        Location.objects.create(
+            name=f"Sync Test Location {index}",
+            location_type=location_type,
+            status=status,
+            latitude=None if index else 10,
+            longitude=None if index else 20,
+        )
+        for index in range(2)
+    ]
+    manufacturer = Manufacturer.objects.create(name="Sync Test Vendor")
+    device_type = DeviceType.objects.create(manufacturer=manufacturer, model="Sync Test Firewall")
+    role = Role.objects.create(name="Sync Test Firewall")
+    role.content_types.add(device_ct)
+    platforms = [Platform.objects.create(name=f"Sync Test OS {index}", manufacturer=manufacturer) for index in range(2)]
+    ike_crypto = IKECrypto.objects.create(name="ike-sync-test", lifetime=8, status=status)
+    ipsec_crypto = IPSecCrypto.objects.create(name="ipsec-sync-test", lifetime=8, status=status)
+
+    previous = None
+    for index in range(units):
+        pair = [
+            Device.objects.create(
+                name=f"sync-fw-{index:02d}-{side}",
+                device_type=device_type,
+                role=role,
+                location=locations[index % 2],
+                platform=platforms[index % 2],
+                status=status,
+            )
+            for side in "ab"
+        ]
+        manual = index % 3 == 0
+        gateway = IKEGateway.objects.create(
+            name=f"sync-gw-{index:02d}",
+            local_ip=f"192.0.2.{index + 1}",
+            peer_ip=f"198.51.100.{index + 1}",
+            peer_device_manual=f"sync-peer-{index:02d}" if manual else "",
+            peer_location_manual=f"Peer Site {index}" if manual else "",
+            ike_version=("ikev1", "ikev2")[index % 2],
+            authentication_type="psk",
+            ike_crypto_profile=ike_crypto,
+            status=status,
+        )
+        gateway.local_devices.set(pair)
+        if not manual:
+            gateway.peer_devices.set(previous)
+        IPSECTunnel.objects.create(
+            name=f"sync-tun-{index:02d}",
+            ike_gateway=gateway,
+            ipsec_crypto_profile=ipsec_crypto,
+            tunnel_interface=Interface.objects.create(device=pair[0], name="tunnel.1", type="tunnel", status=status),
+            role=("primary", "secondary")[index % 2],
+            status=planned if index == 4 else status,
+        )
+        previous = pair
+
+
+class FakeResult(list):
+    """Records of a fake Neo4j query."""
+
+    def consume(self):
+        """Return the (empty) summary."""
+        return self
+
+
+class FakeGraph:
+    """VPNNodes and TUNNELs kept in dicts, with the writes of the last sync recorded per kind."""
+
+    def __init__(self):
+        """Start with an empty graph."""
+        self.nodes = {}
+        self.edges = {}
+        self.reset()
+
+    def reset(self):
+        """Forget the recorded writes."""
+        self.upserted_nodes, self.upserted_edges, self.deleted_nodes, self.deleted_edges = [], [], [], []
+
+    def session(self, **kwargs):  # pylint: disable=unused-argument
+        """Return a session on this graph."""
+        return FakeSession(self)
+
+
+class FakeSession:
+    """Neo4j session answering the sync job's queries from a FakeGraph; other queries return no records."""
+
+    def __init__(self, graph):
+        """Work on `graph`."""
+        self.graph = graph
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        return False
+
+    def run(self, query, parameters=None, **kwargs):
+        """Apply a write query to the graph, or answer a read query from it (recognised by their parameters)."""
+        graph, parameters = self.graph, {**(parameters or {}), **kwargs}
+        if "$nodes_batch" in query:
+            for props in parameters["nodes_batch"]:
+                graph.nodes[props["id"]] = props
+                graph.upserted_nodes.append(props["id"])
+        elif "$edges_batch" in query and "MERGE" in query:
+            for data in parameters["edges_batch"]:
+                graph.edges[data["properties"]["nautobot_tunnel_pk"]] = data
+                graph.upserted_edges.append(data["properties"]["nautobot_tunnel_pk"])
+        elif "$edge_pks" in query and "AS source_id" in query:
+            return FakeResult(
+                {"source_id": graph.edges[pk]["source_id"], "target_id": graph.edges[pk]["target_id"]}
+                for pk in parameters["edge_pks"]
+                if pk in graph.edges
+            )
+        elif "$edge_pks" in query:
+            for edge_pk in parameters["edge_pks"]:
+                del graph.edges[edge_pk]
+                graph.deleted_edges.append(edge_pk)
+        elif "$node_ids" in query and "NOT (n)-[:TUNNEL]-()" in query:
+            connected = {data[end] for data in graph.edges.values() for end in ("source_id", "target_id")}
+            for node_id in parameters["node_ids"]:
+                if node_id in graph.nodes and node_id not in connected:
+                    del graph.nodes[node_id]
+                    graph.deleted_nodes.append(node_id)
+        elif "$node_ids" in query:
+            for node_id in parameters["node_ids"]:
+                del graph.nodes[node_id]
+                graph.deleted_nodes.append(node_id)
+        elif "n.payload_hash AS hash" in query:
+            return FakeResult({"id": node_id, "hash": props["payload_hash"]} for node_id, props in graph.nodes.items())
+        elif "r.payload_hash AS hash" in query:
+            return FakeResult(
+                {"pk": pk, "hash": data["properties"]["payload_hash"]} for pk, data in graph.edges.items()
+            )
+        return FakeResult()
+
+    def execute_write(self, work, *args, **kwargs):
+        """Run `work` with this session standing in for the transaction."""
+        return work(self, *args, **kwargs)
+
+
+def expected_graph():
+    """Node ids and tunnel pks the sync should leave in the graph, derived from the database rows."""
+    nodes, edges = set(), set()
+    for tunnel in IPSECTunnel.objects.select_related("ike_gateway"):
+        gateway = tunnel.ike_gateway
+        nodes.add(f"group:{'|'.join(sorted(str(pk) for pk in gateway.local_devices.values_list('pk', flat=True)))}")
+        peer_pks = sorted(str(pk) for pk in gateway.peer_devices.values_list("pk", flat=True))
+        nodes.add(f"group:{'|'.join(peer_pks)}" if peer_pks else f"manual_peer:{gateway.peer_device_manual}")
+        edges.add(str(tunnel.pk))
+    return nodes, edges
+
+
+class PayloadHashTestCase(SimpleTestCase):
+    """`payload_hash` only changes with the properties the dashboard shows."""
+
+    def test_stable(self):
+        payload = {"id": "n1", "label": "fw", "device_names": ["a", "b"], "lat": 1.5}
+        self.assertEqual(payload_hash(payload), payload_hash(dict(reversed(payload.items()))))
+        self.assertEqual(len(payload_hash(payload)), 64)
+        self.assertNotEqual(payload_hash(payload), payload_hash({**payload, "label": "fw2"}))
+
+    def test_excluded_properties(self):
+        self.assertEqual(HASH_EXCLUDED_PROPERTIES, {"payload_hash", "synced_at_utc"})
+        payload = {"id": "n1", "label": "fw"}
+        volatile = {"payload_hash": "x", "synced_at_utc": "2026-10-17T06:00:00"}
+        self.assertEqual(payload_hash(payload), payload_hash({**payload, **volatile}))
+        self.assertNotEqual(payload_hash(payload), payload_hash({**payload, "tooltip_details_json": "{}"}))
+
+
+@override_settings(
+    PLUGINS_CONFIG={
+        **settings.PLUGINS_CONFIG,
+        "nautobot_app_vpn": {
+            **settings.PLUGINS_CONFIG.get("nautobot_app_vpn", {}),
+            "sync": {"bootstrap_schema": False, "write_snapshot": False},
+        },
+    },
+    NEO4J_URI="bolt://neo4j.invalid:7687",
+    NEO4J_USER="neo4j",
+    NEO4J_PASSWORD="neo4j",
+)
+class IncrementalSyncTestCase(TestCase):
+    """Incremental syncs write only changed payloads and delete what is no longer in Nautobot."""
+
+    def setUp(self):
+        super().setUp()
+        create_inventory(UNITS)
+        self.graph = FakeGraph()
+        for target, value in (
+            ("neo4j_is_configured", True),
+            ("verify_neo4j_connectivity", self.graph),
+            ("get_facet_index", {"nodes": {}, "tunnels": []}),
+        ):
+            patcher = mock.patch(f"nautobot_app_vpn.jobs.sync_neo4j_job.{target}", return_value=value)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    def sync(self):
+        self.graph.reset()
+        SyncNeo4jJob().run(incremental=True)
+
+    def test_payload_hashes_ignore_sync_time(self):
+        def build(now_utc):
+            return {
+                payload.get("id") or payload["properties"]["nautobot_tunnel_pk"]: payload
+                for _, payload in TopologyPayloadBuilder(now_utc=now_utc).iter_payloads(tunnel_queryset())
+            }
+
+        now = datetime(2026, 10, 17, tzinfo=UTC)
+        first, second = build(now), build(now + timedelta(hours=1))
+        self.assertEqual(set(first), set(second))
+        self.assertNotEqual(first, second)  # the sync time is stored...
+        for key, payload in first.items():
+            props, later = payload.get("properties", payload), second[key].get("properties", second[key])
+            self.assertEqual(props["payload_hash"], later["payload_hash"])  # ...but not hashed
+            self.assertEqual(props.get("tooltip_details_json"), later.get("tooltip_details_json"))
+            # An edge's hash also covers its endpoints, so re-pointing a tunnel rewrites it.
+            endpoints = (
+                {"source_id": payload["source_id"], "target_id": payload["target_id"]}
+                if "properties" in payload
+                else {}
+            )
+            self.assertEqual(props["payload_hash"], payload_hash({**endpoints, **props}))
+
+    def test_incremental_sync(self):
+        self.sync()
+        nodes, edges = expected_graph()
+        self.assertEqual(len(edges), UNITS)
+        self.assertEqual((set(self.graph.nodes), set(self.graph.edges)), (nodes, edges))
+        self.assertEqual(sorted(self.graph.upserted_nodes), sorted(nodes))
+
+        # Nothing changed: a later sync (with a later sync time) writes nothing.
+        self.sync()
+        self.assertEqual((self.graph.upserted_nodes, self.graph.upserted_edges), ([], []))
+        self.assertEqual((self.graph.deleted_nodes, self.graph.deleted_edges), ([], []))
+
+        # One changed tunnel: only its TUNNEL is written.
+        changed = IPSECTunnel.objects.order_by("name").first()
+        IPSECTunnel.objects.filter(pk=changed.pk).update(description="moved to the backup circuit")
+        self.sync()
+        self.assertEqual((self.graph.upserted_nodes, self.graph.upserted_edges), ([], [str(changed.pk)]))
+        self.assertEqual(self.graph.edges[str(changed.pk)]["properties"]["description"], "moved to the backup circuit")
+
+    def test_orphans_deleted(self):
+        self.sync()
+        before = set(self.graph.nodes)
+        # The tunnel of a gateway with a manual peer: deleting it orphans the manual peer node.
+        removed = IPSECTunnel.objects.exclude(ike_gateway__peer_device_manual="").order_by("name").first()
+        removed_pk = str(removed.pk)
+        removed.delete()
+
+        self.sync()
+        nodes, edges = expected_graph()
+        self.assertEqual(self.graph.deleted_edges, [removed_pk])
+        self.assertTrue(before - nodes)
+        self.assertEqual(set(self.graph.deleted_nodes), before - nodes)
+        self.assertEqual((set(self.graph.nodes), set(self.graph.edges)), (nodes, edges))
+        self.assertEqual((self.graph.upserted_nodes, self.graph.upserted_edges), ([], []))
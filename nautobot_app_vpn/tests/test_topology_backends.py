@@ -0,0 +1,173 @@
+"""Tests that the relational backend returns the same topology as the Neo4j graph written by the sync job."""
+
+import json
+import re
+from datetime import UTC, datetime
+from unittest import mock
+
+from nautobot.core.testing import TestCase
+
+from nautobot_app_vpn.tests.test_sync_neo4j_job import create_inventory
+from nautobot_app_vpn.topology.backends import Neo4jTopologyBackend, RelationalTopologyBackend, _is_uuid
+from nautobot_app_vpn.topology.payloads import TopologyPayloadBuilder, load_interface_ip_index, tunnel_queryset
+
+NOW = datetime(2026, 10, 17, 6, 0, tzinfo=UTC)
+NODE_KEYS = re.findall(r"\.(\w+)", Neo4jTopologyBackend.NODE_PROJECTION)
+TUNNEL_KEYS = re.findall(r"\.(\w+)", Neo4jTopologyBackend.TUNNEL_PROJECTION)
+
+
+def node_where(props, params):
+    """`Neo4jTopologyBackend.build_node_where` evaluated on a synced VPNNode (a null property never matches)."""
+    if "country" in params and props.get("country_lc") != params["country"]:
+        return False
+    if "platform" in params and params["platform"] not in (props.get("platform_lc") or ()):
+        return False
+    if "location" in params and params["location"] not in (props.get("location_lc") or ()):
+        return False
+    if "device_name" in params:
+        device = params["device_name"]
+        if not (
+            device in (props.get("label_lc") or "")
+            or (_is_uuid(device) and device in (props.get("nautobot_device_pks") or []))
+        ):
+            return False
+    if "node_role" in params and props.get("role_lc") != params["node_role"]:
+        return False
+    return True
+
+
+def edge_filter(props, params):
+    """`Neo4jTopologyBackend.build_edge_filter` evaluated on a synced TUNNEL."""
+    return all(
+        props.get(prop) == params[param]
+        for param, prop in (
+            ("tunnel_status", "status_lc"),
+            ("ike_version", "ike_version_lc"),
+            ("tunnel_role", "role_lc"),
+        )
+        if param in params
+    )
+
+
+def coalesce(*values):
+    """Cypher `coalesce()`: the first non-null value."""
+    return next((value for value in values if value is not None), None)
+
+
+def project(props, keys):
+    """A Cypher map projection: missing properties come back as null."""
+    return {key: props.get(key) for key in keys}
+
+
+class FakeSession:
+    """Answers `Neo4jTopologyBackend.build_query` from the synced payloads, for the parameters it was sent."""
+
+    def __init__(self, nodes, edges):
+        """Serve `nodes` (VPNNode properties by id) and `edges` (edge payloads)."""
+        self.nodes, self.edges = nodes, edges
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        return False
+
+    def session(self, **kwargs):  # pylint: disable=unused-argument
+        """The driver hands out the session itself."""
+        return self
+
+    def run(self, query, parameters):
+        """Return the single row of the query: matching nodes, their tunnels and (with node filters) endpoints."""
+        has_node_where = "AS endpoints" in query
+        nodes = [props for props in self.nodes.values() if node_where(props, parameters)]
+        drawable = sum(
+            1
+            for props in nodes
+            if props.get("id") is not None
+            and coalesce(props.get("lat"), props.get("latitude")) is not None
+            and coalesce(props.get("lon"), props.get("longitude")) is not None
+        )
+        tunnels, endpoints = [], {}
+        for data in self.edges:
+            a, b = self.nodes[data["source_id"]], self.nodes[data["target_id"]]
+            if any(props.get(key) is None for props in (a, b) for key in ("lat", "lon")):
+                continue
+            if has_node_where and drawable and not (node_where(a, parameters) or node_where(b, parameters)):
+                continue
+            if not edge_filter(data["properties"], parameters):
+                continue
+            tunnels.append({**project(data["properties"], TUNNEL_KEYS), "source_id": a["id"], "target_id": b["id"]})
+            endpoints.setdefault(a["id"], a)
+            endpoints.setdefault(b["id"], b)
+        record = {"nodes": [project(props, NODE_KEYS) for props in nodes], "tunnels": tunnels}
+        if has_node_where:
+            record["endpoints"] = [project(props, NODE_KEYS) for props in endpoints.values()]
+        return mock.Mock(single=mock.Mock(return_value=record))
+
+
+def comparable(graph):
+    """The graph with features in a stable order (the backends emit them in different orders)."""
+    return {
+        **graph,
+        "devices": sorted(graph["devices"]["features"], key=lambda f: f["properties"]["id"]),
+        "tunnels": sorted(graph["tunnels"]["features"], key=lambda f: json.dumps(f, sort_keys=True)),
+    }
+
+
+class BackendParityTestCase(TestCase):
+    """`RelationalTopologyBackend` filters and builds the graph exactly like the Cypher queries on the synced graph."""
+
+    def setUp(self):
+        super().setUp()
+        create_inventory(12)
+        nodes, edges = {}, []
+        builder = TopologyPayloadBuilder(ip_index=load_interface_ip_index(), now_utc=NOW)
+        for kind, payload in builder.iter_payloads(tunnel_queryset()):
+            if kind == "node":
+                nodes[payload["id"]] = payload
+            else:
+                edges.append(payload)
+        self.graph = FakeSession(nodes, edges)
+
+    def filter_sets(self):
+        """Filters as normalized by the API (stripped and lowercased)."""
+        nodes = sorted(self.graph.nodes.values(), key=lambda props: props["id"])
+        device_node = next(props for props in nodes if props["nautobot_device_pks"])
+        manual_node = next(props for props in nodes if not props["nautobot_device_pks"])
+        return [
+            {},
+            {"country": device_node["country"].lower()},
+            {"country": "zz"},  # no node matches: every tunnel is returned
+            {"platform": "os 1"},
+            {"location": device_node["location_name"].lower()[-4:]},
+            {"device": device_node["device_names"][0].lower()},
+            {"device": device_node["nautobot_device_pks"][0]},
+            {"device": manual_node["label"].lower()},
+            {"status": "active"},
+            {"status": "planned"},
+            {"role": "primary"},
+            {"ike_version": "ikev2"},
+            {"platform": "os 0", "role": "secondary"},
+            {"country": device_node["country"].lower(), "status": "active", "ike_version": "ikev1"},
+        ]
+
+    def test_parity(self):
+        for filters in self.filter_sets():
+            with self.subTest(filters=filters):
+                with mock.patch(
+                    "nautobot_app_vpn.topology.backends.verify_neo4j_connectivity", return_value=self.graph
+                ):
+                    expected = Neo4jTopologyBackend().build_graph(filters)
+                relational = RelationalTopologyBackend().build_graph(filters)
+                self.assertEqual(comparable(relational), comparable(expected))
+
+    def test_filters_select(self):
+        """The filter sets above do narrow the graph, so the parity is not only that of the full graph."""
+        full = RelationalTopologyBackend().build_graph({})
+        self.assertTrue(full["tunnels"]["features"])
+        sizes = {
+            len(RelationalTopologyBackend().build_graph(filters)["tunnels"]["features"])
+            for filters in self.filter_sets()
+        }
+        self.assertGreater(len(sizes), 2)
+        self.assertIn(len(full["tunnels"]["features"]), sizes)
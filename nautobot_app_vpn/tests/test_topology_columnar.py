@@ -0,0 +1,151 @@
+"""Tests for the columnar wire format of the topology API."""
+
+import json
+
+from django.test import SimpleTestCase
+
+from nautobot_app_vpn.api.renderers import TopologyColumnarRenderer
+from nautobot_app_vpn.topology.backends import node_feature, tunnel_feature
+from nautobot_app_vpn.topology.columnar import encode_column
+
+
+def column_value(column, index):
+    """`columnValue` of dashboard_maplibre.js."""
+    if isinstance(column, dict):
+        return column["dictionary"][column["codes"][index]]
+    return column[index]
+
+
+def derive_device_search_text(props):
+    """`deriveDeviceSearchText` of dashboard_maplibre.js."""
+    props["search_text"] = " ".join(
+        str(props[key]) for key in ("name", "role", "platform", "country", "location") if props.get(key)
+    )
+
+
+def decode_columnar(block, derive=None):
+    """`decodeColumnar` of dashboard_maplibre.js: rebuild a FeatureCollection from its columnar form."""
+    coordinates, features = block["coordinates"], []
+    for index in range(block["count"]):
+        props = {key: column_value(column, index) for key, column in block["columns"].items()}
+        if "tooltip" in block:
+            tip = {key: column_value(column, index) for key, column in block["tooltip"].items()}
+            tip = {key: value for key, value in tip.items() if value is not None}
+            props["tooltip"] = tip[""] if "" in tip else (json.dumps(tip) if block["tooltip"] else "")
+        if derive:
+            derive(props)
+        if block["geometry"] == "Point":
+            geometry = {"type": "Point", "coordinates": coordinates[2 * index : 2 * index + 2]}
+        else:
+            points = coordinates[4 * index : 4 * index + 4]
+            geometry = {"type": "LineString", "coordinates": [points[:2], points[2:]]}
+        features.append({"type": "Feature", "geometry": geometry, "properties": props})
+    return {"type": "FeatureCollection", "features": features}
+
+
+def tooltip_value(text):
+    """What a tooltip shows: the JSON object it encodes (empty for no tooltip), or plain text."""
+    try:
+        value = json.loads(text) if text else {}
+    except ValueError:
+        return text
+    return value if isinstance(value, dict) else text
+
+
+def build_graph():
+    """Ten devices on two platforms and nine tunnels with JSON, plain-text and missing tooltips."""
+    nodes = [
+        {
+            "id": f"node-{index}",
+            # Some nodes only have a label, and some lack a role or a location.
+            **({"name": f"fw-{index:02d}"} if index % 4 else {"label": f"label-{index:02d}"}),
+            "role": "Firewall" if index % 3 else None,
+            "platform_name": ("PAN-OS", "FortiOS")[index % 2],
+            "country": "US" if index < 6 else "DE",
+            "location_name": f"Site {index}" if index % 5 else "",
+            "is_ha_pair": index % 2 == 0,
+            "device_names": [f"fw-{index:02d}-a", f"fw-{index:02d}-b"],
+            "nautobot_device_pks": [f"pk-{index}"],
+            "lat": 40.0 + index,
+            "lon": -70.0 - index,
+        }
+        for index in range(10)
+    ]
+    tooltips = [json.dumps({"Local IP": f"10.0.0.{index}", "Proxy IDs": str(index)}) for index in range(6)]
+    tooltips += [json.dumps({"Local IP": "10.0.1.1", "Monitor": "ping"}), "Tunnel down since Monday", ""]
+    tunnels = [
+        {
+            "id": f"tun-{index}",
+            "label": f"tun-{index}",
+            "status": ("active", "down")[index % 2],
+            "role": "primary",
+            "ike_version": "ikev2",
+            "local_ip": f"10.0.0.{index}",
+            "peer_ip": f"10.1.0.{index}",
+            "tooltip_details_json": tooltip,
+        }
+        for index, tooltip in enumerate(tooltips)
+    ]
+    return {
+        "devices": {"type": "FeatureCollection", "features": [node_feature(props) for props in nodes]},
+        "tunnels": {
+            "type": "FeatureCollection",
+            "features": [tunnel_feature(nodes[index], nodes[index + 1], props) for index, props in enumerate(tunnels)],
+        },
+        "stats": {"active": 5, "down": 4},
+        "meta": {"devices_count": 10},
+    }
+
+
+class TopologyColumnarRendererTestCase(SimpleTestCase):
+    """The columnar payload decodes, as the dashboard does it, back to the GeoJSON FeatureCollections."""
+
+    def setUp(self):
+        self.graph = build_graph()
+        self.payload = json.loads(TopologyColumnarRenderer().render(self.graph))
+
+    def test_encode_column(self):
+        self.assertEqual(encode_column(["a", "b", "a", "b"]), {"dictionary": ["a", "b"], "codes": [0, 1, 0, 1]})
+        self.assertEqual(encode_column(["a", "b", "c", "c"]), ["a", "b", "c", "c"])  # 3 distinct > 0.5 * 4
+        self.assertEqual(encode_column([["x"], ["x"]]), [["x"], ["x"]])
+        self.assertEqual(encode_column([]), [])
+
+    def test_layout(self):
+        self.assertEqual(self.payload["format"], "columnar")
+        self.assertEqual(self.payload["stats"], self.graph["stats"])
+        self.assertEqual(self.payload["meta"], self.graph["meta"])
+
+        devices = self.payload["devices"]
+        self.assertEqual((devices["count"], devices["geometry"]), (10, "Point"))
+        self.assertEqual(len(devices["coordinates"]), 20)
+        self.assertNotIn("search_text", devices["columns"])
+        self.assertEqual(devices["columns"]["platform"], {"dictionary": ["PAN-OS", "FortiOS"], "codes": [0, 1] * 5})
+        self.assertIsInstance(devices["columns"]["name"], list)
+
+        tunnels = self.payload["tunnels"]
+        self.assertEqual((tunnels["count"], tunnels["geometry"]), (9, "LineString"))
+        self.assertEqual(len(tunnels["coordinates"]), 36)
+        self.assertNotIn("tooltip", tunnels["columns"])
+        self.assertEqual(list(tunnels["tooltip"]), ["Local IP", "Proxy IDs", "Monitor", ""])
+        text = [column_value(tunnels["tooltip"][""], index) for index in range(9)]
+        self.assertEqual(text, [None] * 7 + ["Tunnel down since Monday", None])
+
+    def test_round_trip(self):
+        devices = decode_columnar(self.payload["devices"], derive_device_search_text)
+        self.assertEqual(devices, self.graph["devices"])
+
+        tunnels = decode_columnar(self.payload["tunnels"])
+        for decoded, original in zip(tunnels["features"], self.graph["tunnels"]["features"], strict=True):
+            self.assertEqual(decoded["geometry"], original["geometry"])
+            decoded_props, original_props = dict(decoded["properties"]), dict(original["properties"])
+            self.assertEqual(tooltip_value(decoded_props.pop("tooltip")), tooltip_value(original_props.pop("tooltip")))
+            self.assertEqual(decoded_props, original_props)
+
+    def test_search_text_rule(self):
+        """`search_text` is dropped from the wire; the client rebuilds it from name, role, platform, country, location."""
+        for feature in self.graph["devices"]["features"]:
+            props = {key: value for key, value in feature["properties"].items() if key != "search_text"}
+            derive_device_search_text(props)
+            self.assertEqual(props["search_text"], feature["properties"]["search_text"])
+        label_only = node_feature({"id": "n", "label": "hub", "country": "FR", "lat": 1, "lon": 2})["properties"]
+        self.assertEqual(label_only["search_text"], "hub FR")
@@ -0,0 +1,51 @@
+"""Tests for the conditional GET validators of the topology API."""
+
+import json
+
+from django.conf import settings
+from django.test import override_settings
+from django.urls import reverse
+from nautobot.core.testing import TestCase
+from nautobot.extras.models import Status
+
+from nautobot_app_vpn.models import IPSECTunnel
+from nautobot_app_vpn.tests.factory import VPNFixtureFactory
+
+RELATIONAL = {
+    **settings.PLUGINS_CONFIG,
+    "nautobot_app_vpn": {
+        **settings.PLUGINS_CONFIG.get("nautobot_app_vpn", {}),
+        "topology": {"backend": "relational"},
+    },
+}
+
+
+@override_settings(PLUGINS_CONFIG=RELATIONAL)
+class TopologyConditionalGetTestCase(TestCase):
+    """The live tunnel counts invalidate the topology validators between syncs."""
+
+    def setUp(self):
+        super().setUp()
+        self.user.is_superuser = True
+        self.user.save()
+        VPNFixtureFactory(seed=0).create(10)
+        self.url = reverse("plugins-api:nautobot_app_vpn-api:vpn-topology-neo4j")
+
+    def test_tunnel_change_revalidates(self):
+        response = self.client.get(self.url)
+        self.assertHttpStatus(response, 200)
+        self.assertNotIn("Last-Modified", response)
+        etag = response["ETag"]
+        planned = json.loads(response.content)["meta"]["status_counts"].get("planned", 0)
+        self.assertHttpStatus(self.client.get(self.url, HTTP_IF_NONE_MATCH=etag), 304)
+
+        tunnel = IPSECTunnel.objects.exclude(status__name="Planned").first()
+        tunnel.status = Status.objects.get(name="Planned")
+        with self.captureOnCommitCallbacks(execute=True):
+            tunnel.save()
+
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertHttpStatus(response, 200)
+        self.assertNotEqual(response["ETag"], etag)
+        self.assertEqual(json.loads(response.content)["meta"]["status_counts"]["planned"], planned + 1)
+        self.assertHttpStatus(self.client.get(self.url, HTTP_IF_NONE_MATCH=response["ETag"]), 304)
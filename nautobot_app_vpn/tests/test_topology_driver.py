@@ -0,0 +1,85 @@
+"""Tests for the shared, health-checked Neo4j driver."""
+
+from unittest import mock
+
+from django.conf import settings
+from django.test import SimpleTestCase, override_settings
+
+from nautobot_app_vpn.topology import driver as driver_module
+from nautobot_app_vpn.topology.driver import close_neo4j_driver, get_neo4j_driver, verify_neo4j_connectivity
+
+
+@override_settings(
+    PLUGINS_CONFIG={
+        **settings.PLUGINS_CONFIG,
+        "nautobot_app_vpn": {
+            **settings.PLUGINS_CONFIG.get("nautobot_app_vpn", {}),
+            "neo4j": {"health_check_ttl": 30},
+        },
+    },
+    NEO4J_URI="bolt://neo4j.invalid:7687",
+    NEO4J_USER="neo4j",
+    NEO4J_PASSWORD="neo4j",
+)
+class SharedDriverTestCase(SimpleTestCase):
+    """One driver per process, probed at most once per `health_check_ttl`."""
+
+    def setUp(self):
+        super().setUp()
+        close_neo4j_driver()
+        self.addCleanup(close_neo4j_driver)
+        self.now = 1000.0
+        patcher = mock.patch.object(driver_module, "time", mock.Mock(monotonic=lambda: self.now))
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        patcher = mock.patch.object(driver_module.GraphDatabase, "driver", side_effect=lambda *a, **kw: mock.Mock())
+        self.mock_driver = patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_reuse_within_ttl(self):
+        driver = verify_neo4j_connectivity()
+        self.now += 29
+        self.assertIs(verify_neo4j_connectivity(), driver)
+        self.assertIs(get_neo4j_driver(), driver)
+        self.mock_driver.assert_called_once()
+        self.assertEqual(self.mock_driver.call_args.args, ("bolt://neo4j.invalid:7687",))
+        self.assertEqual(self.mock_driver.call_args.kwargs["auth"], ("neo4j", "neo4j"))
+        driver.verify_connectivity.assert_called_once_with()
+
+    def test_probe_after_ttl(self):
+        driver = verify_neo4j_connectivity()
+        self.now += 31
+        self.assertIs(verify_neo4j_connectivity(), driver)
+        self.assertEqual(driver.verify_connectivity.call_count, 2)
+        verify_neo4j_connectivity(force=True)
+        self.assertEqual(driver.verify_connectivity.call_count, 3)
+
+        # A failed probe is not cached: the next call probes again.
+        driver.verify_connectivity.side_effect = OSError("unreachable")
+        with self.assertRaises(OSError):
+            verify_neo4j_connectivity(force=True)
+        driver.verify_connectivity.side_effect = None
+        verify_neo4j_connectivity()
+        self.assertEqual(driver.verify_connectivity.call_count, 5)
+        self.mock_driver.assert_called_once()
+
+    def test_new_driver_after_fork(self):
+        parent = verify_neo4j_connectivity()
+        # What os.register_at_fork runs in the child: the parent's driver is forgotten, not closed.
+        driver_module._forget_driver_after_fork()  # pylint: disable=protected-access
+        child = verify_neo4j_connectivity()
+        self.assertIsNot(child, parent)
+        self.assertEqual(self.mock_driver.call_count, 2)
+        child.verify_connectivity.assert_called_once_with()
+        parent.close.assert_not_called()
+
+        # A driver created under another pid is replaced as well.
+        with mock.patch.object(driver_module.os, "getpid", return_value=-1):
+            self.assertIsNot(get_neo4j_driver(), child)
+        self.assertEqual(self.mock_driver.call_count, 3)
+
+    def test_close(self):
+        driver = get_neo4j_driver()
+        close_neo4j_driver()
+        driver.close.assert_called_once_with()
+        self.assertIsNot(get_neo4j_driver(), driver)
@@ -0,0 +1,112 @@
+"""Tests for the faceted filter counts of the topology dashboard."""
+
+from unittest import mock
+
+from django.test import SimpleTestCase
+
+from nautobot_app_vpn.topology.backends import RelationalTopologyBackend
+from nautobot_app_vpn.topology.facets import facet_counts
+
+
+def node(country, platform, location, *devices):
+    # Every node has a role, which the role filter is matched against as well as the tunnel role.
+    return {
+        "country": country,
+        "platform_name": platform,
+        "location_name": location,
+        "label": " <-> ".join(devices),
+        "device_names": list(devices),
+        "role": "firewall",
+    }
+
+
+def edge(status, role, ike_version):
+    return {"status": status, "role": role, "ike_version": ike_version}
+
+
+INDEX = {
+    "nodes": {
+        "A": node("us", "PAN-OS", "NYC", "a1", "a2"),
+        "B": node("us", "FortiOS", "Dallas", "b1"),
+        "C": node("de", "PAN-OS", "Berlin", "c1"),
+        "D": node("fr", "PAN-OS", "Paris", "d1"),
+    },
+    "tunnels": [
+        ["A", "B", edge("active", "primary", "ikev2")],
+        ["A", "C", edge("active", "secondary", "ikev2")],
+        ["B", "C", edge("down", "primary", "ikev1")],
+        ["C", "D", edge("active", "primary", "ikev2")],
+    ],
+}
+
+
+def counts(result, facet):
+    """``{value: (tunnels, nodes)}`` of one facet."""
+    return {entry["value"]: (entry["tunnels"], entry["nodes"]) for entry in result[facet]}
+
+
+class FacetCountsTestCase(SimpleTestCase):
+    """Each facet is counted under every selection but its own."""
+
+    def test_no_selection(self):
+        result = facet_counts(INDEX, {})
+        self.assertEqual(list(result), ["country", "platform", "location", "device", "status", "role", "ike_version"])
+        self.assertEqual(counts(result, "country"), {"de": (3, 4), "fr": (1, 2), "us": (3, 3)})
+        self.assertEqual(counts(result, "device")["a2"], (2, 3))
+        # Without node filters every node is returned for a tunnel value.
+        self.assertEqual(counts(result, "status"), {"active": (3, 4), "down": (1, 4)})
+        # No node has a tunnel role, so a role selection returns its tunnels and their endpoints only.
+        self.assertEqual(counts(result, "role"), {"primary": (3, 4), "secondary": (1, 2)})
+        self.assertEqual(counts(result, "ike_version"), {"ikev1": (1, 4), "ikev2": (3, 4)})
+
+    def test_one_selection(self):
+        result = facet_counts(INDEX, {"country": "us"})
+        # The country facet ignores the country selection...
+        self.assertEqual(counts(result, "country"), counts(facet_counts(INDEX, {}), "country"))
+        # ...while the others are narrowed to tunnels with a US endpoint (A-B, A-C, B-C).
+        self.assertEqual(counts(result, "platform"), {"FortiOS": (2, 3), "PAN-OS": (2, 3)})
+        self.assertEqual(counts(result, "status"), {"active": (2, 3), "down": (1, 3)})
+        # Platforms narrow US nodes; a location outside the US matches no node and the view returns every tunnel.
+        self.assertEqual(counts(result, "location")["Paris"], (4, 4))
+
+    def test_two_selections(self):
+        result = facet_counts(INDEX, {"country": "us", "status": "active"})
+        # Country under status=active only (A-B, A-C, C-D).
+        self.assertEqual(counts(result, "country"), {"de": (2, 3), "fr": (1, 2), "us": (2, 3)})
+        # Status under country=us only: unchanged by its own selection.
+        self.assertEqual(counts(result, "status"), counts(facet_counts(INDEX, {"country": "us"}), "status"))
+        # Everything else under both (A-B, A-C).
+        self.assertEqual(counts(result, "platform"), {"FortiOS": (1, 2), "PAN-OS": (2, 3)})
+        self.assertEqual(counts(result, "ike_version"), {"ikev2": (2, 3)})
+
+    def test_role_matches_nodes(self):
+        """A role selection is matched against the nodes' role as well as the tunnels', as the view does."""
+        result = facet_counts(INDEX, {"role": "primary"})
+        # No node has the role "primary": every country falls back to the primary tunnels.
+        self.assertEqual(counts(result, "country"), {"de": (3, 4), "fr": (3, 4), "us": (3, 4)})
+        result = facet_counts(INDEX, {"role": "firewall"})
+        # Every node has the role "firewall" but no tunnel does: nodes only.
+        self.assertEqual(counts(result, "country"), {"de": (0, 1), "fr": (0, 1), "us": (0, 2)})
+        self.assertEqual(counts(result, "status"), {})
+
+    def test_view_counts(self):
+        """Every count is what `RelationalTopologyBackend.build_graph` returns with the value selected."""
+        nodes = {node_id: {**props, "id": node_id, "lat": 1.0, "lon": 2.0} for node_id, props in INDEX["nodes"].items()}
+        edges = [(source, target, {**props, "id": f"{source}-{target}"}) for source, target, props in INDEX["tunnels"]]
+        backend = RelationalTopologyBackend()
+        values = {facet: {entry["value"] for entry in entries} for facet, entries in facet_counts(INDEX, {}).items()}
+        selections = [{}, {"country": "us"}, {"country": "fr", "platform": "forti"}, {"device": "a"}]
+        selections += [{"country": "us", "status": "active", "role": "primary"}, {"location": "ber", "role": "x"}]
+        with mock.patch.object(RelationalTopologyBackend, "load_graph", return_value=(nodes, edges)):
+            for filters in selections:
+                result = facet_counts(INDEX, filters)
+                for facet, facet_values in values.items():
+                    listed = counts(result, facet)
+                    for value in facet_values:
+                        with self.subTest(filters=filters, facet=facet, value=value):
+                            graph = backend.build_graph({**filters, facet: value.lower()})
+                            view = (len(graph["tunnels"]["features"]), len(graph["devices"]["features"]))
+                            if value in listed:
+                                self.assertEqual(listed[value], view)
+                            else:
+                                self.assertEqual(view[0], 0)
@@ -0,0 +1,91 @@
+"""Tests for the dashboard filter options computed by one UNION query."""
+
+from django.contrib.contenttypes.models import ContentType
+from nautobot.core.testing import TestCase
+from nautobot.dcim.models import Device, DeviceType, Interface, Location, LocationType, Manufacturer, Platform
+from nautobot.extras.models import Role, Status
+
+from nautobot_app_vpn.models import IKECrypto, IKEGateway, IPSecCrypto, IPSECTunnel
+from nautobot_app_vpn.topology.filter_options import FILTER_OPTION_KEYS, build_filter_options
+
+
+class FilterOptionsTestCase(TestCase):
+    """Each option list holds the distinct non-empty values of tunnels with a gateway, sorted case-sensitively."""
+
+    def setUp(self):
+        super().setUp()
+        active = Status.objects.get(name="Active")
+        planned = Status.objects.get(name="Planned")
+        device_ct = ContentType.objects.get_for_model(Device)
+        location_type = LocationType.objects.create(name="Filter Test Site")
+        location_type.content_types.add(device_ct)
+        locations = {
+            name: Location.objects.create(name=name, location_type=location_type, status=active)
+            for name in ("Berlin", "amsterdam", "Idle Site")
+        }
+        manufacturer = Manufacturer.objects.create(name="Filter Test Vendor")
+        Platform.objects.create(name="alpha OS", manufacturer=manufacturer)
+        Platform.objects.create(name="Zeta OS", manufacturer=manufacturer)
+        device_type = DeviceType.objects.create(manufacturer=manufacturer, model="Filter Test Firewall")
+        role = Role.objects.create(name="Filter Test Firewall")
+        role.content_types.add(device_ct)
+
+        def device(name, location):
+            return Device.objects.create(
+                name=name, device_type=device_type, role=role, location=locations[location], status=active
+            )
+
+        ike_crypto = IKECrypto.objects.create(name="ike-filter-test", lifetime=8, status=active)
+        ipsec_crypto = IPSecCrypto.objects.create(name="ipsec-filter-test", lifetime=8, status=active)
+
+        def gateway(name, ike_version, local, peer=(), peer_manual=""):
+            obj = IKEGateway.objects.create(
+                name=name,
+                local_ip="192.0.2.1",
+                peer_ip="198.51.100.1",
+                peer_device_manual=peer_manual,
+                ike_version=ike_version,
+                authentication_type="psk",
+                ike_crypto_profile=ike_crypto,
+                status=active,
+            )
+            obj.local_devices.set(local)
+            obj.peer_devices.set(peer)
+            return obj
+
+        berlin = device("DE-ber-fw1", "Berlin")
+        new_york = device("US-nyc-fw1", "Berlin")
+        meshed = gateway("gw-meshed", "ikev2", [berlin], [device("nl-ams-fw1", "amsterdam"), device(None, "amsterdam")])
+        manual = gateway("gw-manual", "ikev1", [new_york], peer_manual="partner-fw")
+        # No tunnel uses this gateway: its devices, location and IKE version are not offered.
+        gateway("gw-idle", "ikev2", [device("XX-idle-fw1", "Idle Site")])
+
+        interface = Interface.objects.create(device=berlin, name="tunnel.1", type="tunnel", status=active)
+        for name, ike_gateway, tunnel_role, status in (
+            ("tun-1", meshed, "primary", active),
+            ("tun-2", manual, "", planned),
+            ("tun-3", manual, None, active),
+        ):
+            IPSECTunnel.objects.create(
+                name=name,
+                ike_gateway=ike_gateway,
+                ipsec_crypto_profile=ipsec_crypto,
+                tunnel_interface=interface,
+                role=tunnel_role,
+                status=status,
+            )
+
+    def test_options(self):
+        options = build_filter_options()
+        self.assertEqual(tuple(options), FILTER_OPTION_KEYS)
+        # The unnamed peer device and the device of the unused gateway are left out; capitals sort first.
+        self.assertEqual(options["device"], ["DE-ber-fw1", "US-nyc-fw1", "nl-ams-fw1"])
+        self.assertEqual(options["location"], ["Berlin", "amsterdam"])
+        self.assertEqual(options["country"], ["DE", "NL", "US"])
+        self.assertEqual(options["status"], ["Active", "Planned"])
+        # Empty and null roles are not options.
+        self.assertEqual(options["role"], ["primary"])
+        self.assertEqual(options["ike_version"], ["ikev1", "ikev2"])
+        # Every platform is offered, used or not.
+        self.assertEqual(options["platform"], sorted(Platform.objects.values_list("name", flat=True)))
+        self.assertLess(options["platform"].index("Zeta OS"), options["platform"].index("alpha OS"))
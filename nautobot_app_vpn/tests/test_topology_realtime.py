@@ -0,0 +1,120 @@
+"""Tests for the near-real-time topology sync, with the queue flushed synchronously into an in-memory graph."""
+
+from unittest import mock
+
+from django.conf import settings
+from django.test import override_settings
+from nautobot.core.testing import TestCase
+from nautobot.dcim.models import Device
+
+from nautobot_app_vpn.models import IKEGateway, IPSECTunnel
+from nautobot_app_vpn.signals import connect_realtime_sync_signals, disconnect_realtime_sync_signals
+from nautobot_app_vpn.tests.test_sync_neo4j_job import FakeGraph, create_inventory, expected_graph
+from nautobot_app_vpn.topology.realtime import TopologyChangeQueue, apply_topology_changes, apply_tunnel_changes
+
+UNITS = 6
+
+
+@override_settings(
+    PLUGINS_CONFIG={
+        **settings.PLUGINS_CONFIG,
+        "nautobot_app_vpn": {
+            **settings.PLUGINS_CONFIG.get("nautobot_app_vpn", {}),
+            "realtime_sync": {"enabled": True},
+        },
+    },
+)
+class RealtimeSyncTestCase(TestCase):
+    """Committed model changes reach the graph through the signals, the queue and `apply_tunnel_changes`."""
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        connect_realtime_sync_signals()
+
+    @classmethod
+    def tearDownClass(cls):
+        disconnect_realtime_sync_signals()
+        super().tearDownClass()
+
+    def setUp(self):
+        super().setUp()
+        create_inventory(UNITS)
+        self.graph = FakeGraph()
+        apply_tunnel_changes(self.graph.session(), [str(pk) for pk in IPSECTunnel.objects.values_list("pk", flat=True)])
+        self.assertEqual((set(self.graph.nodes), set(self.graph.edges)), expected_graph())
+
+        # The worker thread only wakes up after an hour; the tests flush the queue themselves.
+        self.queue = TopologyChangeQueue(apply_topology_changes, debounce_seconds=3600, max_delay_seconds=3600)
+        for target, value in (
+            ("nautobot_app_vpn.signals.get_change_queue", self.queue),
+            ("nautobot_app_vpn.topology.realtime.get_neo4j_driver", self.graph),
+            ("nautobot_app_vpn.topology.realtime.neo4j_is_configured", True),
+            # The worker drops its connection after a batch, which would end the test's transaction.
+            ("nautobot_app_vpn.topology.realtime.close_old_connections", None),
+        ):
+            patcher = mock.patch(target, return_value=value)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    def commit(self, change):
+        """Run `change`, fire its on-commit handlers and apply the queued batch."""
+        self.graph.reset()
+        with self.captureOnCommitCallbacks(execute=True):
+            change()
+        self.queue.flush()
+
+    def assertGraphCurrent(self):  # pylint: disable=invalid-name
+        self.assertEqual((set(self.graph.nodes), set(self.graph.edges)), expected_graph())
+
+    def test_tunnel_save(self):
+        tunnel = IPSECTunnel.objects.order_by("name").first()
+        tunnel.description = "moved to the backup circuit"
+        self.commit(tunnel.save)
+        self.assertEqual(self.graph.upserted_edges, [str(tunnel.pk)])
+        self.assertEqual(self.graph.edges[str(tunnel.pk)]["properties"]["description"], "moved to the backup circuit")
+        self.assertEqual((self.graph.deleted_nodes, self.graph.deleted_edges), ([], []))
+        self.assertGraphCurrent()
+
+    def test_tunnel_delete_orphans_endpoint(self):
+        tunnel = IPSECTunnel.objects.exclude(ike_gateway__peer_device_manual="").order_by("name").first()
+        tunnel_pk = str(tunnel.pk)
+        manual_peer = f"manual_peer:{tunnel.ike_gateway.peer_device_manual}"
+        self.assertIn(manual_peer, self.graph.nodes)
+        self.commit(tunnel.delete)
+        self.assertEqual(self.graph.deleted_edges, [tunnel_pk])
+        # The manual peer had no other tunnel; the local firewall pair is still the peer of the next gateway.
+        self.assertEqual(self.graph.deleted_nodes, [manual_peer])
+        self.assertGraphCurrent()
+
+    def test_device_rename(self):
+        device = Device.objects.get(name="sync-fw-01-a")
+        node_id = next(node_id for node_id, props in self.graph.nodes.items() if device.name in props["device_names"])
+
+        device.serial = "SN-1"
+        self.commit(lambda: device.save(update_fields=["serial"]))
+        self.assertEqual((self.graph.upserted_nodes, self.graph.upserted_edges), ([], []))
+
+        device.name = "sync-fw-01-renamed"
+        self.commit(lambda: device.save(update_fields=["name"]))
+        self.assertIn(node_id, self.graph.upserted_nodes)
+        self.assertIn("sync-fw-01-renamed", self.graph.nodes[node_id]["device_names"])
+        # Its own tunnel and the tunnel of the next gateway, which peers with it.
+        self.assertEqual(len(self.graph.upserted_edges), 2)
+        self.assertGraphCurrent()
+
+    def test_gateway_devices_change(self):
+        gateway = IKEGateway.objects.exclude(peer_device_manual="").order_by("name").last()
+        manual_peer = f"manual_peer:{gateway.peer_device_manual}"
+        tunnel_pk = str(IPSECTunnel.objects.get(ike_gateway=gateway).pk)
+
+        # Peer devices take precedence over the manual peer: the tunnel is re-pointed and the manual node dropped.
+        self.commit(lambda: gateway.peer_devices.set(Device.objects.filter(name__startswith="sync-fw-00-")))
+        self.assertEqual(self.graph.upserted_edges, [tunnel_pk])
+        self.assertEqual(self.graph.deleted_nodes, [manual_peer])
+        self.assertGraphCurrent()
+
+        # A local firewall leaving the pair: the tunnel moves to a new single-device node.
+        self.commit(lambda: gateway.local_devices.remove(gateway.local_devices.order_by("name").last()))
+        self.assertEqual(self.graph.upserted_edges, [tunnel_pk])
+        self.assertGraphCurrent()
@@ -0,0 +1,107 @@
+"""Tests for the pre-compressed topology snapshot and the API responses served from it."""
+
+import gzip
+import json
+import zlib
+
+from django.conf import settings
+from django.test import override_settings
+from django.urls import reverse
+from nautobot.core.testing import TestCase
+from nautobot.extras.models import Status
+from rest_framework.renderers import JSONRenderer
+
+from nautobot_app_vpn.api.renderers import TopologyColumnarRenderer
+from nautobot_app_vpn.models import IPSECTunnel, TopologySnapshot
+from nautobot_app_vpn.tests.factory import VPNFixtureFactory
+from nautobot_app_vpn.topology.backends import RelationalTopologyBackend
+from nautobot_app_vpn.topology.cache import get_sync_state
+from nautobot_app_vpn.topology.snapshot import (
+    SNAPSHOT_FORMATS,
+    TUNNEL_STATS_MARKER,
+    render_snapshot_payload,
+    snapshot_body,
+    write_topology_snapshot,
+)
+from nautobot_app_vpn.topology.stats import topology_response_payload, tunnel_statistics
+
+UNITS = 20
+
+RELATIONAL_UNCACHED = {
+    **settings.PLUGINS_CONFIG,
+    "nautobot_app_vpn": {
+        **settings.PLUGINS_CONFIG.get("nautobot_app_vpn", {}),
+        "topology": {"backend": "relational"},
+        "cache": {"enabled": False},
+    },
+}
+
+
+@override_settings(PLUGINS_CONFIG=RELATIONAL_UNCACHED)
+class TopologySnapshotTestCase(TestCase):
+    """The snapshot holds the graph only; tunnel statistics are spliced in per request."""
+
+    def setUp(self):
+        super().setUp()
+        self.user.is_superuser = True
+        self.user.save()
+        VPNFixtureFactory(seed=0).create(UNITS)
+        self.backend = RelationalTopologyBackend()
+        self.url = reverse("plugins-api:nautobot_app_vpn-api:vpn-topology-neo4j")
+
+    def test_snapshot_body(self):
+        snapshots = {snapshot.format: snapshot for snapshot in write_topology_snapshot(self.backend)}
+        self.assertEqual(set(snapshots), set(SNAPSHOT_FORMATS))
+        stats = tunnel_statistics(IPSECTunnel.objects.all(), {})
+        expected = topology_response_payload(self.backend.build_graph({}), get_sync_state(), stats)
+
+        for fmt, renderer in (("json", JSONRenderer()), ("columnar", TopologyColumnarRenderer())):
+            with self.subTest(fmt):
+                plain = snapshot_body(snapshots[fmt], stats, compress=False)
+                self.assertEqual(gzip.decompress(snapshot_body(snapshots[fmt], stats)), plain)
+                self.assertEqual(json.loads(plain), json.loads(renderer.render(expected)))
+
+    def test_body_is_one_gzip_member(self):
+        payload = {"devices": [], "meta": {"devices_count": 0, TUNNEL_STATS_MARKER: None}}
+        snapshot = TopologySnapshot(payload=gzip.compress(render_snapshot_payload(payload)))
+        for stats in ({}, {"total_tunnels": 1}, {"status_labels": {f"s{index}": "x" * 64 for index in range(5000)}}):
+            with self.subTest(size=len(stats)):
+                body = snapshot_body(snapshot, stats)
+                decompressor = zlib.decompressobj(16 + zlib.MAX_WBITS)
+                plain = decompressor.decompress(body)
+                self.assertTrue(decompressor.eof)
+                self.assertEqual(decompressor.unused_data, b"")
+                self.assertEqual(plain, snapshot_body(snapshot, stats, compress=False))
+                self.assertEqual(json.loads(plain)["meta"], {"devices_count": 0, **stats})
+        with self.assertRaises(ValueError):
+            render_snapshot_payload({"meta": {}})
+
+    def test_columnar_pass_through(self):
+        write_topology_snapshot(self.backend)
+        json_response = self.client.get(self.url, HTTP_ACCEPT_ENCODING="gzip")
+        response = self.client.get(self.url, {"format": "columnar"}, HTTP_ACCEPT_ENCODING="gzip")
+        self.assertHttpStatus(response, 200)
+        self.assertEqual(response["Content-Encoding"], "gzip")
+        self.assertIn("Accept-Encoding", response["Vary"])
+        self.assertNotEqual(response["ETag"], json_response["ETag"])
+        self.assertEqual(json.loads(gzip.decompress(response.content))["format"], "columnar")
+
+    def test_statistics_are_current(self):
+        write_topology_snapshot(self.backend)
+        # A queryset update sends no signals, so the snapshot stays current while the counts change.
+        IPSECTunnel.objects.filter(pk__in=IPSECTunnel.objects.all()[:5]).update(
+            status=Status.objects.get(name="Planned")
+        )
+
+        response = self.client.get(self.url, HTTP_ACCEPT_ENCODING="gzip")
+        self.assertHttpStatus(response, 200)
+        self.assertEqual(response["Content-Encoding"], "gzip")
+        self.assertIn("Accept-Encoding", response["Vary"])
+        meta = json.loads(gzip.decompress(response.content))["meta"]
+        self.assertEqual(meta["total_tunnels"], IPSECTunnel.objects.count())
+        self.assertEqual(meta["status_counts"]["planned"], 5)
+        self.assertEqual(meta["status_counts"]["active"], IPSECTunnel.objects.count() - 5)
+
+        response = self.client.get(self.url)
+        self.assertNotIn("Content-Encoding", response)
+        self.assertEqual(json.loads(response.content)["meta"], meta)
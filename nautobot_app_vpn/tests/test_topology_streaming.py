@@ -0,0 +1,88 @@
+"""Tests for the streamed JSON encoding of the topology response."""
+
+import json
+
+from django.test import SimpleTestCase
+
+from nautobot_app_vpn.topology.backends import GraphSummary
+from nautobot_app_vpn.topology.stats import topology_response_payload
+from nautobot_app_vpn.topology.streaming import STREAM_CHUNK_FEATURES, stream_topology_json
+
+SYNC_STATE = {"generation": 3, "last_synced": "2026-10-17T06:00:00+00:00", "last_sync_status": "Success"}
+TUNNEL_STATS = {"total_tunnels": 2, "status_counts": {"active": 2}}
+
+
+def device(index):
+    return {
+        "type": "Feature",
+        "geometry": {"type": "Point", "coordinates": [float(index % 360 - 180), 10.0]},
+        "properties": {"id": f"node-{index}", "name": f"fw-{index}", "status": "active", "country": "Ünited"},
+    }
+
+
+def tunnel(index):
+    return {
+        "type": "Feature",
+        "geometry": {"type": "LineString", "coordinates": [[0.0, 0.0], [1.0, float(index % 90)]]},
+        "properties": {"name": f"tun-{index}", "status": "down"},
+    }
+
+
+def items(devices, tunnels):
+    yield from (("devices", device(index)) for index in range(devices))
+    yield from (("tunnels", tunnel(index)) for index in range(tunnels))
+
+
+def failing(devices):
+    yield from items(devices, 0)
+    raise ConnectionError("connection lost")
+
+
+def expected_payload(devices, tunnels):
+    """The non-streamed response for the same features."""
+    summary = GraphSummary()
+    graph = {
+        "devices": {"type": "FeatureCollection", "features": [device(index) for index in range(devices)]},
+        "tunnels": {"type": "FeatureCollection", "features": [tunnel(index) for index in range(tunnels)]},
+    }
+    for feature in graph["devices"]["features"]:
+        summary.add_device(feature)
+    for feature in graph["tunnels"]["features"]:
+        summary.add_tunnel(feature)
+    graph["stats"], graph["meta"] = summary.result()
+    return topology_response_payload(graph, SYNC_STATE, TUNNEL_STATS)
+
+
+class StreamTopologyJSONTestCase(SimpleTestCase):
+    """Whatever the feature counts, the chunks join into one valid JSON document."""
+
+    def stream(self, features):
+        chunks = list(stream_topology_json(features, SYNC_STATE, TUNNEL_STATS))
+        return json.loads(b"".join(chunks)), chunks
+
+    def test_feature_counts(self):
+        for devices, tunnels in (
+            (0, 0),
+            (3, 0),
+            (0, 3),
+            (STREAM_CHUNK_FEATURES, 2 * STREAM_CHUNK_FEATURES),
+            (STREAM_CHUNK_FEATURES + 1, STREAM_CHUNK_FEATURES - 1),
+        ):
+            with self.subTest(devices=devices, tunnels=tunnels):
+                body, _ = self.stream(items(devices, tunnels))
+                self.assertEqual(body, expected_payload(devices, tunnels))
+
+    def test_chunk_size(self):
+        _, chunks = self.stream(items(2 * STREAM_CHUNK_FEATURES, 0))
+        # Opening, two full device batches, the tunnels opening, the trailer.
+        self.assertEqual(len(chunks), 5)
+
+    def test_backend_error(self):
+        for devices in (0, 10, STREAM_CHUNK_FEATURES):
+            with self.subTest(devices=devices):
+                with self.assertLogs("nautobot_app_vpn.topology.streaming", "ERROR"):
+                    body, _ = self.stream(failing(devices))
+                self.assertEqual(len(body["devices"]["features"]), devices)
+                self.assertEqual(body["tunnels"]["features"], [])
+                self.assertEqual(body["error"], "Could not retrieve topology data.")
+                self.assertNotIn("meta", body)
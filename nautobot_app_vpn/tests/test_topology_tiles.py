@@ -0,0 +1,122 @@
+"""Tests for the Mapbox Vector Tile encoding and the topology tile endpoint."""
+
+import unittest
+from unittest import mock
+
+from django.conf import settings
+from django.test import SimpleTestCase, override_settings
+from django.urls import reverse
+from nautobot.core.testing import TestCase
+
+from nautobot_app_vpn.tests.factory import VPNFixtureFactory
+from nautobot_app_vpn.topology.tiles import MVT_CONTENT_TYPE, TILE_EXTENT, encode_tile, tiles_available, valid_tile
+from nautobot_app_vpn.topology.viewport import MAX_ZOOM
+
+try:
+    import mapbox_vector_tile
+except ImportError:  # pragma: no cover - optional dependency
+    mapbox_vector_tile = None
+
+needs_tiles = unittest.skipUnless(tiles_available(), "mapbox-vector-tile is not installed")
+
+
+def point(lon, lat, **props):
+    return {"type": "Feature", "geometry": {"type": "Point", "coordinates": [lon, lat]}, "properties": props}
+
+
+GRAPH = {
+    "devices": {
+        "type": "FeatureCollection",
+        "features": [
+            point(13.4, 52.5, id="berlin", device_names=["fw-a", "fw-b"], country=None),
+            point(-74.0, 40.7, id="new-york", tooltip={"Site": "NYC"}),
+        ],
+    },
+    "tunnels": {
+        "type": "FeatureCollection",
+        "features": [
+            {
+                "type": "Feature",
+                "geometry": {"type": "LineString", "coordinates": [[13.4, 52.5], [-74.0, 40.7]]},
+                "properties": {"name": "tun-1", "status": "active"},
+            }
+        ],
+    },
+    "stats": {},
+    "meta": {},
+}
+
+
+def decode(content):
+    return mapbox_vector_tile.decode(content, default_options={"y_coord_down": True})
+
+
+class TileEncodingTestCase(SimpleTestCase):
+    """Tile addressing and the encoded layers."""
+
+    def test_valid_tile(self):
+        for z, x, y in ((0, 0, 0), (1, 1, 1), (MAX_ZOOM, 2**MAX_ZOOM - 1, 0)):
+            self.assertTrue(valid_tile(z, x, y), (z, x, y))
+        for z, x, y in ((-1, 0, 0), (MAX_ZOOM + 1, 0, 0), (1, 2, 0), (1, 0, 2), (2, -1, 0)):
+            self.assertFalse(valid_tile(z, x, y), (z, x, y))
+
+    @needs_tiles
+    def test_round_trip(self):
+        layers = decode(encode_tile(GRAPH, 0, 0, 0))
+        devices = {feature["properties"]["id"]: feature for feature in layers["devices"]["features"]}
+        self.assertEqual(set(devices), {"berlin", "new-york"})
+        # Lists are joined, mappings JSON-encoded and nulls dropped.
+        self.assertEqual(devices["berlin"]["properties"], {"id": "berlin", "device_names": "fw-a, fw-b"})
+        self.assertEqual(devices["new-york"]["properties"]["tooltip"], '{"Site": "NYC"}')
+        x, y = devices["berlin"]["geometry"]["coordinates"]
+        self.assertAlmostEqual(x, (13.4 + 180) / 360 * TILE_EXTENT, delta=1)
+        self.assertLess(y, TILE_EXTENT / 2)  # northern hemisphere, y down
+        (tunnel,) = layers["tunnels"]["features"]
+        self.assertEqual(tunnel["properties"], {"name": "tun-1", "status": "active"})
+        self.assertEqual(tunnel["geometry"]["type"], "LineString")
+
+        # Zoomed in on Europe: New York and most of the tunnel fall outside the tile.
+        layers = decode(encode_tile(GRAPH, 2, 2, 1))
+        self.assertEqual([feature["properties"]["id"] for feature in layers["devices"]["features"]], ["berlin"])
+        self.assertEqual(len(layers["tunnels"]["features"]), 1)
+        # Nothing in the South Pacific.
+        layers = decode(encode_tile(GRAPH, 2, 0, 3))
+        self.assertEqual((layers["devices"]["features"], layers["tunnels"]["features"]), ([], []))
+
+
+@override_settings(
+    PLUGINS_CONFIG={
+        **settings.PLUGINS_CONFIG,
+        "nautobot_app_vpn": {
+            **settings.PLUGINS_CONFIG.get("nautobot_app_vpn", {}),
+            "topology": {"backend": "relational"},
+        },
+    },
+)
+class TileViewTestCase(TestCase):
+    """The tile endpoint answers 404 outside the tile pyramid and 501 without the optional package."""
+
+    def setUp(self):
+        super().setUp()
+        self.user.is_superuser = True
+        self.user.save()
+        VPNFixtureFactory(seed=0).create(5)
+
+    def url(self, z, x, y):
+        return reverse("plugins-api:nautobot_app_vpn-api:vpn-topology-tiles", kwargs={"z": z, "x": x, "y": y})
+
+    def test_missing_package(self):
+        with mock.patch("nautobot_app_vpn.api.viewsets.tiles_available", return_value=False):
+            response = self.client.get(self.url(0, 0, 0))
+        self.assertHttpStatus(response, 501)
+
+    @needs_tiles
+    def test_tiles(self):
+        self.assertHttpStatus(self.client.get(self.url(1, 2, 0)), 404)
+        self.assertHttpStatus(self.client.get(self.url(MAX_ZOOM + 1, 0, 0)), 404)
+
+        response = self.client.get(self.url(0, 0, 0), HTTP_ACCEPT="application/x-protobuf")
+        self.assertHttpStatus(response, 200)
+        self.assertEqual(response["Content-Type"], MVT_CONTENT_TYPE)
+        self.assertTrue(decode(response.content)["devices"]["features"])
+        self.assertHttpStatus(self.client.get(self.url(0, 0, 0), HTTP_IF_NONE_MATCH=response["ETag"]), 304)
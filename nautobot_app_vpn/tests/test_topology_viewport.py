@@ -0,0 +1,171 @@
+"""Tests for viewport cropping and server-side clustering of the topology GeoJSON."""
+
+from django.conf import settings
+from django.test import SimpleTestCase, override_settings
+from django.urls import reverse
+from nautobot.core.testing import TestCase
+
+from nautobot_app_vpn.topology.viewport import ViewportError, cluster_graph, crop_graph, parse_viewport
+
+
+def device(name, lon, lat, status="active"):
+    return {
+        "type": "Feature",
+        "geometry": {"type": "Point", "coordinates": [lon, lat]},
+        "properties": {"id": name, "name": name, "status": status},
+    }
+
+
+def tunnel(name, source, target, status="active"):
+    return {
+        "type": "Feature",
+        "geometry": {"type": "LineString", "coordinates": [source, target]},
+        "properties": {"name": name, "status": status},
+    }
+
+
+def graph(devices, tunnels):
+    return {
+        "devices": {"type": "FeatureCollection", "features": devices},
+        "tunnels": {"type": "FeatureCollection", "features": tunnels},
+        "stats": {"active": len(devices)},
+        "meta": {"devices_count": len(devices)},
+    }
+
+
+class ParseViewportTestCase(SimpleTestCase):
+    """`zoom` / `bbox` query parameters."""
+
+    def test_valid(self):
+        self.assertEqual(parse_viewport({}), {})
+        self.assertEqual(
+            parse_viewport({"zoom": "3.7", "bbox": "170,-10.123456,-170,10"}),
+            {"zoom": 3, "bbox": [170.0, -10.1235, -170.0, 10.0]},
+        )
+
+    def test_invalid(self):
+        for params in (
+            {"zoom": "near"},
+            {"zoom": "nan"},
+            {"zoom": "inf"},
+            {"zoom": "1e400"},
+            {"zoom": "-1"},
+            {"zoom": "25"},
+            {"bbox": "1,2,3"},
+            {"bbox": "1,2,3,4,5"},
+            {"bbox": "a,b,c,d"},
+            {"bbox": "0,10,10,-10"},
+            {"bbox": "0,0,nan,10"},
+            {"bbox": "0,0,inf,10"},
+        ):
+            with self.subTest(params=params), self.assertRaises(ViewportError):
+                parse_viewport(params)
+
+
+@override_settings(
+    PLUGINS_CONFIG={
+        **settings.PLUGINS_CONFIG,
+        "nautobot_app_vpn": {
+            **settings.PLUGINS_CONFIG.get("nautobot_app_vpn", {}),
+            "topology": {"backend": "relational"},
+        },
+    }
+)
+class ViewportAPITestCase(TestCase):
+    """Malformed viewport parameters are a client error."""
+
+    def test_bad_request(self):
+        url = reverse("plugins-api:nautobot_app_vpn-api:vpn-topology-neo4j")
+        self.add_permissions("nautobot_app_vpn.view_ipsectunnel")
+        for params in ({"zoom": "near"}, {"zoom": "inf"}, {"bbox": "1,2,3"}):
+            with self.subTest(params=params):
+                response = self.client.get(url, params)
+                self.assertHttpStatus(response, 400)
+                self.assertIn("error", response.json())
+
+
+class CropGraphTestCase(SimpleTestCase):
+    """Cropping to a bbox, including one that crosses the antimeridian."""
+
+    def test_antimeridian(self):
+        cropped = crop_graph(
+            graph(
+                [device("east", 175.0, 0.0), device("west", -175.0, 0.0), device("greenwich", 0.0, 0.0)],
+                [
+                    tunnel("pacific", [160.0, 0.0], [175.0, 5.0]),
+                    tunnel("atlantic", [-30.0, 0.0], [0.0, 5.0]),
+                    tunnel("north", [175.0, 40.0], [-175.0, 50.0]),
+                ],
+            ),
+            [170.0, -10.0, -170.0, 10.0],
+        )
+        self.assertEqual([f["properties"]["name"] for f in cropped["devices"]["features"]], ["east", "west"])
+        self.assertEqual([f["properties"]["name"] for f in cropped["tunnels"]["features"]], ["pacific"])
+
+    def test_regular(self):
+        cropped = crop_graph(graph([device("in", 5.0, 5.0), device("out", 50.0, 5.0)], []), [0.0, 0.0, 10.0, 10.0])
+        self.assertEqual([f["properties"]["name"] for f in cropped["devices"]["features"]], ["in"])
+
+
+class ClusterGraphTestCase(SimpleTestCase):
+    """At zoom 2 with 64px cells the grid has 16 columns of 22.5 degrees."""
+
+    def setUp(self):
+        self.clustered = cluster_graph(
+            graph(
+                [
+                    device("eu-1", 1.0, 1.0),
+                    device("eu-2", 2.0, 1.0),
+                    device("eu-3", 3.0, 1.0, status="down"),
+                    device("asia-1", 100.0, 1.0),
+                    device("asia-2", 101.0, 1.0, status="Planned"),
+                    device("america", -100.0, 40.0),
+                    device("pacific", -150.0, -40.0),
+                ],
+                [
+                    tunnel("internal", [1.0, 1.0], [2.0, 1.0]),
+                    tunnel("eu-asia-1", [1.0, 1.0], [100.0, 1.0]),
+                    tunnel("eu-asia-2", [101.0, 1.0], [3.0, 1.0], status="down"),
+                    tunnel("america-pacific", [-100.0, 40.0], [-150.0, -40.0]),
+                    tunnel("america-asia", [-100.0, 40.0], [100.0, 1.0], status="down"),
+                ],
+            ),
+            zoom=2,
+            grid_size=64,
+        )
+        self.devices = {f["properties"]["name"]: f for f in self.clustered["devices"]["features"]}
+        self.tunnels = {f["properties"]["name"]: f for f in self.clustered["tunnels"]["features"]}
+
+    def test_clusters(self):
+        self.assertEqual(set(self.devices), {"3 sites", "2 sites", "america", "pacific"})
+        self.assertEqual(self.clustered["meta"], {"devices_count": 7, "clusters_count": 2})
+
+        europe = self.devices["3 sites"]
+        self.assertEqual(europe["geometry"]["coordinates"], [2.0, 1.0])
+        self.assertTrue(europe["properties"]["cluster"])
+        self.assertEqual(europe["properties"]["point_count"], 3)
+        self.assertEqual(europe["properties"]["status_counts"], {"active": 2, "down": 1})
+        self.assertEqual(europe["properties"]["status"], "active")
+        self.assertEqual(europe["properties"]["internal_tunnels"], 1)
+
+        asia = self.devices["2 sites"]
+        self.assertEqual(asia["properties"]["status_counts"], {"active": 1, "planned": 1})
+        self.assertEqual(asia["properties"]["internal_tunnels"], 0)
+        self.assertNotIn("cluster", self.devices["america"]["properties"])
+
+    def test_bundles(self):
+        self.assertEqual(set(self.tunnels), {"2 tunnels", "1 tunnels", "america-pacific"})
+        self.assertNotIn("bundle", self.tunnels["america-pacific"]["properties"])
+
+        pair = self.tunnels["2 tunnels"]
+        self.assertTrue(pair["properties"]["bundle"])
+        self.assertEqual(pair["properties"]["tunnel_count"], 2)
+        self.assertEqual(pair["properties"]["status_counts"], {"active": 1, "down": 1})
+        # Bundles between clusters run between the cluster points.
+        self.assertEqual(pair["geometry"]["coordinates"], [[2.0, 1.0], [100.5, 1.0]])
+
+        # A single tunnel to a cluster is bundled too, so it ends at the cluster point.
+        single = self.tunnels["1 tunnels"]
+        self.assertEqual(single["properties"]["tunnel_count"], 1)
+        self.assertEqual(single["properties"]["status"], "down")
+        self.assertEqual(single["geometry"]["coordinates"], [[-100.0, 40.0], [100.5, 1.0]])
@@ -0,0 +1,169 @@
+"""Query-count tests for the IPSec Tunnel and IKE Gateway list views."""
+
+from django.contrib.contenttypes.models import ContentType
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from nautobot.core.testing import TestCase
+from nautobot.dcim.models import Device, DeviceType, Interface, Location, LocationType, Manufacturer
+from nautobot.extras.models import Role, Status
+
+from nautobot_app_vpn.models import IKECrypto, IKEGateway, IPSecCrypto, IPSecProxyID, IPSECTunnel
+from nautobot_app_vpn.models.querysets import annotate_ikegateway_list, annotate_ipsectunnel_list
+
+ROWS = 500
+
+
+class ListViewQueryCountTestCase(TestCase):
+    """The list views must issue the same number of queries for a page of 25 and of 500 rows."""
+
+    user_permissions = ["nautobot_app_vpn.view_ipsectunnel", "nautobot_app_vpn.view_ikegateway"]
+
+    @classmethod
+    def setUpTestData(cls):
+        status = Status.objects.get(name="Active")
+        location_type = LocationType.objects.create(name="VPN Test Site")
+        location_type.content_types.add(ContentType.objects.get_for_model(Device))
+        location = Location.objects.create(name="VPN Test Location", location_type=location_type, status=status)
+        manufacturer = Manufacturer.objects.create(name="VPN Test Vendor")
+        device_type = DeviceType.objects.create(manufacturer=manufacturer, model="VPN Test Firewall")
+        role = Role.objects.create(name="VPN Test Firewall")
+        role.content_types.add(ContentType.objects.get_for_model(Device))
+        devices = [
+            Device.objects.create(
+                name=f"fw-{index}", device_type=device_type, role=role, location=location, status=status
+            )
+            for index in range(2)
+        ]
+        interface = Interface.objects.create(device=devices[0], name="tunnel.1", type="tunnel", status=status)
+        ike_crypto = IKECrypto.objects.create(name="ike-test", lifetime=8)
+        ipsec_crypto = IPSecCrypto.objects.create(name="ipsec-test", lifetime=1)
+
+        gateways = IKEGateway.objects.bulk_create(
+            IKEGateway(
+                name=f"gw-{index:04d}",
+                authentication_type="psk",
+                ike_crypto_profile=ike_crypto,
+                peer_device_manual=f"peer-{index}",
+                peer_location_manual=f"Peer {index}",
+                status=status,
+            )
+            for index in range(ROWS)
+        )
+        IKEGateway.local_devices.through.objects.bulk_create(
+            IKEGateway.local_devices.through(ikegateway=gateway, device=device)
+            for gateway in gateways
+            for device in devices
+        )
+        IKEGateway.local_locations.through.objects.bulk_create(
+            IKEGateway.local_locations.through(ikegateway=gateway, location=location) for gateway in gateways
+        )
+        IKEGateway.peer_devices.through.objects.bulk_create(
+            IKEGateway.peer_devices.through(ikegateway=gateway, device=devices[1]) for gateway in gateways[::2]
+        )
+
+        tunnels = IPSECTunnel.objects.bulk_create(
+            IPSECTunnel(
+                name=f"tun-{index:04d}",
+                ike_gateway=gateway,
+                ipsec_crypto_profile=ipsec_crypto,
+                tunnel_interface=interface,
+                role="primary",
+                status=status,
+            )
+            for index, gateway in enumerate(gateways)
+        )
+        IPSECTunnel.devices.through.objects.bulk_create(
+            IPSECTunnel.devices.through(ipsectunnel=tunnel, device=device) for tunnel in tunnels for device in devices
+        )
+        IPSecProxyID.objects.bulk_create(
+            IPSecProxyID(tunnel=tunnel, local_subnet=f"10.{index % 250}.0.0/24", remote_subnet="10.255.0.0/24")
+            for tunnel in tunnels
+            for index in range(3)
+        )
+
+    def assertConstantListQueries(self, viewname, columns=None):  # pylint: disable=invalid-name
+        """Render the list with 25 and with 500 rows per page and compare the number of queries."""
+        if columns:
+            self.user.set_config(f"tables.{columns[0]}.columns", columns[1], commit=True)
+        url = reverse(viewname)
+        self.client.get(url, {"per_page": 25})  # warm per-process caches (content types, user config)
+
+        counts = {}
+        for per_page in (25, ROWS):
+            with CaptureQueriesContext(connection) as queries:
+                response = self.client.get(url, {"per_page": per_page})
+            self.assertHttpStatus(response, 200)
+            counts[per_page] = len(queries)
+        self.assertEqual(counts[25], counts[ROWS], f"{viewname}: query count grows with the page size: {counts}")
+        return response
+
+    def test_ipsectunnel_list(self):
+        response = self.assertConstantListQueries("plugins:nautobot_app_vpn:ipsectunnel_list")
+        self.assertContains(response, "fw-0, fw-1")
+
+    def test_ipsectunnel_list_all_columns(self):
+        response = self.assertConstantListQueries(
+            "plugins:nautobot_app_vpn:ipsectunnel_list",
+            ("IPSECTunnelTable", ["name", "devices_display", "devices", "proxy_id_count", "monitor_profile"]),
+        )
+        self.assertContains(response, "fw-0, fw-1")
+
+    def test_ikegateway_list(self):
+        response = self.assertConstantListQueries("plugins:nautobot_app_vpn:ikegateway_list")
+        self.assertContains(response, "fw-0, fw-1")
+        self.assertContains(response, "peer-1 (Manual)")
+
+    def test_ikegateway_list_all_columns(self):
+        response = self.assertConstantListQueries(
+            "plugins:nautobot_app_vpn:ikegateway_list",
+            (
+                "IKEGatewayTable",
+                [
+                    "name",
+                    "local_devices_display",
+                    "local_locations_display",
+                    "peer_identifier",
+                    "peer_location_display",
+                    "local_devices",
+                    "peer_devices",
+                    "local_locations",
+                    "peer_locations",
+                ],
+            ),
+        )
+        self.assertContains(response, "VPN Test Location")
+
+    def test_annotations_match_properties(self):
+        attributes = ("local_device_names", "peer_device_names", "local_location_names", "peer_location_display")
+        for gateway in annotate_ikegateway_list(IKEGateway.objects.all())[:4]:
+            plain = IKEGateway.objects.get(pk=gateway.pk)
+            for attribute in attributes:
+                self.assertEqual(getattr(gateway, attribute), getattr(plain, attribute), attribute)
+            self.assertEqual(gateway.peer_device_display, plain.peer_device_display)
+        for tunnel in annotate_ipsectunnel_list(IPSECTunnel.objects.all())[:4]:
+            plain = IPSECTunnel.objects.get(pk=tunnel.pk)
+            self.assertEqual(tunnel.device_names, plain.device_names)
+            self.assertEqual(tunnel.proxy_id_count, plain.proxy_id_count)
+            self.assertEqual(tunnel.proxy_id_count, 3)
+
+    def test_unnamed_device(self):
+        """Unnamed devices are left out of the name lists, on the annotated and the plain instance alike."""
+        named = Device.objects.get(name="fw-1")
+        unnamed = Device.objects.create(
+            name=None, device_type=named.device_type, role=named.role, location=named.location, status=named.status
+        )
+        gateway = IKEGateway.objects.get(name="gw-0001")
+        gateway.peer_devices.set([unnamed])
+        tunnel = IPSECTunnel.objects.get(name="tun-0000")
+        tunnel.devices.add(unnamed)
+
+        annotated = annotate_ikegateway_list(IKEGateway.objects.filter(pk=gateway.pk)).get()
+        plain = IKEGateway.objects.get(pk=gateway.pk)
+        for instance in (annotated, plain):
+            self.assertEqual(instance.peer_device_names, "")
+            self.assertEqual(instance.peer_device_display, "peer-1 (Manual)")
+        annotated = annotate_ipsectunnel_list(IPSECTunnel.objects.filter(pk=tunnel.pk)).get()
+        plain = IPSECTunnel.objects.get(pk=tunnel.pk)
+        for instance in (annotated, plain):
+            self.assertEqual(instance.device_names, "fw-0, fw-1")
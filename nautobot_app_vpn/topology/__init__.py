@@ -0,0 +1 @@
+"""VPN topology graph building and Neo4j synchronization helpers."""
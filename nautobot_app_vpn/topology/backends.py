@@ -0,0 +1,750 @@
+"""Pluggable topology backends producing the dashboard GeoJSON from Neo4j or straight from the database."""
+
+import json
+import logging
+import uuid
+from collections import defaultdict
+
+from django.db.models import Q
+from django.utils.module_loading import import_string
+from nautobot.dcim.models import Device
+
+from nautobot_app_vpn.models import IKEGateway, IPSECTunnel
+from nautobot_app_vpn.topology.driver import get_neo4j_database, neo4j_is_configured, verify_neo4j_connectivity
+from nautobot_app_vpn.topology.payloads import (
+    TopologyPayloadBuilder,
+    device_country_code,
+    get_fallback_coords_by_country,
+    group_node_id,
+    load_interface_ip_index,
+    manual_peer_node_id,
+)
+from nautobot_app_vpn.utils import get_app_settings
+
+logger = logging.getLogger(__name__)
+
+# Defaults for PLUGINS_CONFIG["nautobot_app_vpn"]["topology"].
+DEFAULT_TOPOLOGY_SETTINGS = {
+    "backend": "neo4j",  # "neo4j", "relational" or the dotted path of a TopologyBackend subclass
+    # Requests with ?zoom=<= this get devices clustered per grid cell and tunnels bundled per cell pair.
+    "cluster_max_zoom": 6,
+    # Clustering grid cell size in pixels of a 256px map tile.
+    "cluster_grid_size": 64,
+}
+
+# Node / tunnel properties kept in a facet index: the ones the topology filters look at.
+FACET_NODE_PROPERTIES = (
+    "country",
+    "platform_name",
+    "location_name",
+    "label",
+    "device_names",
+    "nautobot_device_pks",
+    "role",
+)
+FACET_TUNNEL_PROPERTIES = ("status", "role", "ike_version")
+
+
+class TopologyBackendUnavailable(Exception):
+    """The configured backend cannot serve topology data right now (not configured or unreachable)."""
+
+
+def _is_uuid(value):
+    try:
+        uuid.UUID(value)
+    except ValueError:
+        return False
+    return True
+
+
+def _coords(props):
+    """Return ``(lon, lat)`` from node properties (``lat``/``lon`` or ``latitude``/``longitude``), or None."""
+    lat = props.get("lat")
+    if lat is None:
+        lat = props.get("latitude")
+    lon = props.get("lon")
+    if lon is None:
+        lon = props.get("longitude")
+    if lat is None or lon is None:
+        return None
+    return float(lon), float(lat)
+
+
+def node_feature(props):
+    """GeoJSON Point feature for VPNNode properties, or None for nodes without an id or coordinates."""
+    coords = _coords(props)
+    if not props.get("id") or coords is None:
+        return None
+    return {
+        "type": "Feature",
+        "geometry": {"type": "Point", "coordinates": list(coords)},
+        "properties": {
+            "id": props["id"],
+            "name": props.get("name") or props.get("label") or "",
+            "status": props.get("status") or "unknown",
+            "role": props.get("role"),
+            "platform": props.get("platform_name"),
+            "country": props.get("country"),
+            "location": props.get("location_name"),
+            "is_ha_pair": bool(props.get("is_ha_pair")),
+            # Include backing device info to make device filter work with HA groups
+            "device_names": props.get("device_names") or [],
+            "nautobot_device_pks": props.get("nautobot_device_pks") or [],
+            "search_text": " ".join(
+                str(x)
+                for x in [
+                    props.get("name") or props.get("label"),
+                    props.get("role"),
+                    props.get("platform_name"),
+                    props.get("country"),
+                    props.get("location_name"),
+                ]
+                if x
+            ),
+        },
+    }
+
+
+def tunnel_feature(source_props, target_props, rel_props):
+    """GeoJSON LineString feature for a TUNNEL between two VPNNodes, or None if an endpoint lacks coordinates."""
+    source = _coords(source_props)
+    target = _coords(target_props)
+    if source is None or target is None:
+        return None
+    return {
+        "type": "Feature",
+        "geometry": {"type": "LineString", "coordinates": [list(source), list(target)]},
+        "properties": {
+            "name": rel_props.get("label") or rel_props.get("id") or "",
+            "status": rel_props.get("status") or "unknown",
+            "role": rel_props.get("role") or "",
+            "ike_version": rel_props.get("ike_version") or "",
+            "scope": rel_props.get("scope") or "",
+            "local_ip": rel_props.get("local_ip") or "",
+            "peer_ip": rel_props.get("peer_ip") or "",
+            "firewall_hostnames": rel_props.get("firewall_hostnames") or "",
+            "tooltip": rel_props.get("tooltip_details_json") or rel_props.get("tooltip") or "",
+        },
+    }
+
+
+class TopologyBackend:
+    """Base class of topology backends.
+
+    A backend turns normalised filters (see `topology.cache.normalize_topology_filters`) into the dashboard's
+    ``{"devices", "tunnels", "stats", "meta"}`` payload, where `meta` only holds the graph-derived counts.
+    """
+
+    name = None
+    # True when the backend reads live database rows, so cached responses must be invalidated on every change
+    # instead of only when the graph is synced.
+    live = False
+
+    def check_available(self):
+        """Raise TopologyBackendUnavailable when the backend cannot be used at all."""
+
+    def build_graph(self, filters):
+        """Return the topology payload for the given filters."""
+        raise NotImplementedError
+
+    def build_facet_index(self):
+        """Return the drawable graph reduced to its filterable properties (see `topology.facets`)."""
+        raise NotImplementedError
+
+    def iter_graph(self, filters):
+        """Yield ``("devices", feature)`` pairs, then ``("tunnels", feature)`` pairs, for the given filters.
+
+        Used for streamed responses. The default implementation builds the whole graph first.
+        """
+        graph = self.build_graph(filters)
+        for feature in graph["devices"]["features"]:
+            yield "devices", feature
+        for feature in graph["tunnels"]["features"]:
+            yield "tunnels", feature
+
+    @staticmethod
+    def summarize(devices_fc, tunnels_fc):
+        """Assemble the payload from the two FeatureCollections, adding device-status stats and ribbon meta."""
+        summary = GraphSummary()
+        for f in devices_fc["features"]:
+            summary.add_device(f)
+        for f in tunnels_fc["features"]:
+            summary.add_tunnel(f)
+        stats, meta = summary.result()
+        return {"devices": devices_fc, "tunnels": tunnels_fc, "stats": stats, "meta": meta}
+
+
+class GraphSummary:
+    """Incrementally computed device-status stats and ribbon meta of a topology payload."""
+
+    def __init__(self):
+        """Start with empty counts."""
+        self.stats = {}
+        self.countries = set()
+        self.platforms = set()
+        self.ha_pairs = 0
+        self.devices_count = 0
+        self.tunnels_count = 0
+
+    def add_device(self, feature):
+        """Count a device feature."""
+        p = feature["properties"] or {}
+        # ---- Stats (by device status) ----
+        s = (p.get("status") or "unknown").lower()
+        self.stats[s] = self.stats.get(s, 0) + 1
+        # ---- Meta for ribbon ----
+        if p.get("country"):
+            self.countries.add(p["country"])
+        if p.get("platform"):
+            self.platforms.add(p["platform"])
+        if p.get("is_ha_pair"):
+            self.ha_pairs += 1
+        self.devices_count += 1
+
+    def add_tunnel(self, feature):  # pylint: disable=unused-argument
+        """Count a tunnel feature."""
+        self.tunnels_count += 1
+
+    def result(self):
+        """Return ``(stats, meta)``."""
+        meta = {
+            "devices_count": self.devices_count,
+            "tunnels_count": self.tunnels_count,
+            "countries_count": len(self.countries),
+            "platforms_count": len(self.platforms),
+            "ha_pairs": self.ha_pairs,
+        }
+        return self.stats, meta
+
+
+class Neo4jTopologyBackend(TopologyBackend):
+    """Read the topology written by SyncNeo4jJob from Neo4j."""
+
+    name = "neo4j"
+
+    def check_available(self):
+        """Neo4j must be configured in the Nautobot settings."""
+        if not neo4j_is_configured():
+            raise TopologyBackendUnavailable("Graph database service is not configured.")
+
+    # Only the properties node_feature() / tunnel_feature() read are sent back by Neo4j.
+    NODE_PROJECTION = (
+        "{.id, .name, .label, .status, .role, .platform_name, .country, .location_name, .is_ha_pair, "
+        ".device_names, .nautobot_device_pks, .lat, .lon, .latitude, .longitude}"
+    )
+    TUNNEL_PROJECTION = (
+        "{.id, .label, .status, .role, .ike_version, .scope, .local_ip, .peer_ip, .firewall_hostnames, "
+        ".tooltip_details_json, .tooltip, source_id: a.id, target_id: b.id}"
+    )
+
+    @staticmethod
+    def build_node_where(params_in, qp_out, var="n"):
+        """Cypher predicates on VPNNode `var` for the node filters; parameters are added to `qp_out`.
+
+        All filters compare the lowercase copies written by the sync job: exact matches use range indexes,
+        substring matches (`CONTAINS`) text indexes (see topology.schema).
+        """
+        where = []
+        if params_in.get("country"):
+            where.append(f"{var}.country_lc = $country")
+            qp_out["country"] = str(params_in["country"]).lower()
+
+        if params_in.get("platform"):
+            where.append(f"{var}.platform_lc CONTAINS $platform")
+            qp_out["platform"] = str(params_in["platform"]).lower()
+
+        if params_in.get("location"):
+            where.append(f"{var}.location_lc CONTAINS $location")
+            qp_out["location"] = str(params_in["location"]).lower()
+
+        if params_in.get("device"):
+            val = str(params_in["device"]).strip().lower()
+            # The label joins every device name of the group, so it also covers exact device-name matches.
+            device_where = f"{var}.label_lc CONTAINS $device_name"
+            if _is_uuid(val):
+                device_where = f"({device_where} OR $device_name IN coalesce({var}.nautobot_device_pks, []))"
+            where.append(device_where)
+            qp_out["device_name"] = val
+
+        if params_in.get("role"):
+            where.append(f"{var}.role_lc = $node_role")
+            qp_out["node_role"] = str(params_in["role"]).lower()
+
+        return where
+
+    @staticmethod
+    def build_edge_filter(params_in, qp_out):
+        """Cypher predicates on TUNNEL `r` for the tunnel filters; parameters are added to `qp_out`."""
+        conds = []
+        if params_in.get("status"):
+            conds.append("r.status_lc = $tunnel_status")
+            qp_out["tunnel_status"] = str(params_in["status"]).lower()
+
+        if params_in.get("ike_version"):
+            conds.append("r.ike_version_lc = $ike_version")
+            qp_out["ike_version"] = str(params_in["ike_version"]).lower()
+
+        if params_in.get("role"):
+            conds.append("r.role_lc = $tunnel_role")
+            qp_out["tunnel_role"] = str(params_in["role"]).lower()
+
+        return conds
+
+    def build_query(self, filters):
+        """Return ``(query, params)`` fetching matched nodes and their tunnels in a single round trip.
+
+        The query yields one row: ``nodes`` (projected matching VPNNodes), ``tunnels`` (projected TUNNELs with
+        ``source_id`` / ``target_id``) and, when node filters are given, ``endpoints`` (both ends of those tunnels,
+        which may lie outside the node filter). Tunnels are restricted to ones touching a matching node by
+        re-applying the node predicates to their endpoints, so no id list is sent back and forth.
+        """
+        params = {}
+        node_where = self.build_node_where(filters, params)
+        edge_where = ["a.lat IS NOT NULL", "a.lon IS NOT NULL", "b.lat IS NOT NULL", "b.lon IS NOT NULL"]
+        tunnel_returns = [f"collect(r {self.TUNNEL_PROJECTION}) AS tunnels"]
+
+        lines = ["MATCH (n:VPNNode)"]
+        if node_where:
+            lines.append("WHERE " + " AND ".join(node_where))
+        lines.append(f"WITH collect(n {self.NODE_PROJECTION}) AS nodes")
+        if node_where:
+            # Peers of matching nodes are included; when no drawable node matches, every tunnel is.
+            lines.append(
+                "WITH nodes, size([x IN nodes WHERE x.id IS NOT NULL "
+                "AND coalesce(x.lat, x.latitude) IS NOT NULL "
+                "AND coalesce(x.lon, x.longitude) IS NOT NULL]) AS drawable"
+            )
+            touches = " OR ".join(
+                "(" + " AND ".join(self.build_node_where(filters, {}, var=var)) + ")" for var in ("a", "b")
+            )
+            edge_where.append(f"(drawable = 0 OR {touches})")
+            tunnel_returns.append(
+                f"[x IN collect(DISTINCT a) + collect(DISTINCT b) | x {self.NODE_PROJECTION}] AS endpoints"
+            )
+        edge_where.extend(self.build_edge_filter(filters, params))
+
+        # Aggregating inside a subquery keeps the (large) node list out of the grouping key.
+        lines.append("CALL {")
+        if node_where:
+            lines.append("  WITH drawable")
+        lines.append("  MATCH (a:VPNNode)-[r:TUNNEL]->(b:VPNNode)")
+        lines.append("  WHERE " + " AND ".join(edge_where))
+        lines.append("  RETURN " + ", ".join(tunnel_returns))
+        lines.append("}")
+        lines.append("RETURN nodes, tunnels, endpoints" if node_where else "RETURN nodes, tunnels")
+        return "\n".join(lines), params
+
+    @staticmethod
+    def get_driver():
+        """Shared pooled driver; connectivity is only re-probed once the cached health check expires."""
+        try:
+            return verify_neo4j_connectivity()
+        except Exception as exc:  # pylint: disable=broad-exception-caught
+            logger.error("Failed to connect to Neo4j for topology view: %s", exc, exc_info=True)
+            raise TopologyBackendUnavailable("Could not connect to graph database.") from exc
+
+    def build_graph(self, filters):
+        """Query matching nodes and the tunnels touching them in one pass and convert both to GeoJSON."""
+        driver = self.get_driver()
+        query, params = self.build_query(filters)
+        logger.debug("Topology query: %s params=%s", query, params)
+        with driver.session(database=get_neo4j_database()) as session:
+            record = session.run(query, params).single()
+
+        devices_fc = {"type": "FeatureCollection", "features": []}
+        tunnels_fc = {"type": "FeatureCollection", "features": []}
+        if record is None:
+            return self.summarize(devices_fc, tunnels_fc)
+
+        nodes_map = {}
+        for props in record["nodes"]:
+            feat = node_feature(props)
+            if feat is None:
+                # skip nodes without geo
+                continue
+            devices_fc["features"].append(feat)
+            nodes_map[props["id"]] = props
+
+        # Endpoints outside the node filter (peers of matched nodes)
+        for props in record.get("endpoints") or ():
+            if props.get("id") in nodes_map:
+                continue
+            feat = node_feature(props)
+            if feat is not None:
+                devices_fc["features"].append(feat)
+                nodes_map[props["id"]] = props
+
+        for rel_props in record["tunnels"]:
+            source = nodes_map.get(rel_props["source_id"])
+            target = nodes_map.get(rel_props["target_id"])
+            if source is None or target is None:
+                continue
+            feat = tunnel_feature(source, target, rel_props)
+            if feat is not None:
+                tunnels_fc["features"].append(feat)
+
+        return self.summarize(devices_fc, tunnels_fc)
+
+    COORD_PROJECTION = "{.lat, .lon, .latitude, .longitude}"
+
+    def iter_graph(self, filters):
+        """Stream matching nodes, their out-of-filter tunnel endpoints and then the tunnels, record by record.
+
+        Runs up to three queries in one session (nodes, endpoints when node filters are given, tunnels) and never
+        holds more than the emitted node ids in memory. The session stays open until the generator is exhausted.
+        """
+        driver = self.get_driver()
+        params = {}
+        node_where = self.build_node_where(filters, params)
+        edge_where = ["a.lat IS NOT NULL", "a.lon IS NOT NULL", "b.lat IS NOT NULL", "b.lon IS NOT NULL"]
+
+        with driver.session(database=get_neo4j_database()) as session:
+            emitted = set()
+            node_query = "MATCH (n:VPNNode)"
+            if node_where:
+                node_query += " WHERE " + " AND ".join(node_where)
+            for record in session.run(f"{node_query} RETURN n {self.NODE_PROJECTION} AS n", params):
+                feat = node_feature(record["n"])
+                if feat is not None:
+                    emitted.add(feat["properties"]["id"])
+                    yield "devices", feat
+
+            # Same semantics as build_query(): tunnels touching a matched node, or all when none matched.
+            if node_where and emitted:
+                touches = " OR ".join(
+                    "(" + " AND ".join(self.build_node_where(filters, {}, var=var)) + ")" for var in ("a", "b")
+                )
+                edge_where.append(f"({touches})")
+            edge_where.extend(self.build_edge_filter(filters, params))
+            match = "MATCH (a:VPNNode)-[r:TUNNEL]->(b:VPNNode) WHERE " + " AND ".join(edge_where)
+
+            # Without node filters every drawable node, hence every endpoint, has been emitted already.
+            if node_where:
+                endpoint_query = f"{match} UNWIND [a, b] AS x WITH DISTINCT x RETURN x {self.NODE_PROJECTION} AS n"
+                for record in session.run(endpoint_query, params):
+                    props = record["n"]
+                    if props.get("id") in emitted:
+                        continue
+                    feat = node_feature(props)
+                    if feat is not None:
+                        emitted.add(props["id"])
+                        yield "devices", feat
+
+            tunnel_query = (
+                f"{match} RETURN a {self.COORD_PROJECTION} AS a, b {self.COORD_PROJECTION} AS b, "
+                f"r {self.TUNNEL_PROJECTION} AS r"
+            )
+            for record in session.run(tunnel_query, params):
+                rel_props = record["r"]
+                if rel_props["source_id"] not in emitted or rel_props["target_id"] not in emitted:
+                    continue
+                feat = tunnel_feature(record["a"], record["b"], rel_props)
+                if feat is not None:
+                    yield "tunnels", feat
+
+    FACET_INDEX_QUERY = (
+        "MATCH (n:VPNNode) WHERE n.id IS NOT NULL "
+        "AND coalesce(n.lat, n.latitude) IS NOT NULL AND coalesce(n.lon, n.longitude) IS NOT NULL "
+        "WITH collect(n {.id, .country, .platform_name, .location_name, .label, .device_names, "
+        ".nautobot_device_pks, .role}) AS nodes "
+        "CALL { "
+        "  MATCH (a:VPNNode)-[r:TUNNEL]->(b:VPNNode) "
+        "  WHERE coalesce(a.lat, a.latitude) IS NOT NULL AND coalesce(a.lon, a.longitude) IS NOT NULL "
+        "  AND coalesce(b.lat, b.latitude) IS NOT NULL AND coalesce(b.lon, b.longitude) IS NOT NULL "
+        "  RETURN collect([a.id, b.id, r {.status, .role, .ike_version}]) AS tunnels "
+        "} "
+        "RETURN nodes, tunnels"
+    )
+
+    def build_facet_index(self):
+        """Fetch every drawable node and tunnel's filterable properties in one round trip."""
+        driver = self.get_driver()
+        with driver.session(database=get_neo4j_database()) as session:
+            record = session.run(self.FACET_INDEX_QUERY).single()
+        if record is None:
+            return {"nodes": {}, "tunnels": []}
+        nodes = {props.pop("id"): props for props in record["nodes"]}
+        tunnels = [[source, target, props] for source, target, props in record["tunnels"]]
+        return {"nodes": nodes, "tunnels": tunnels}
+
+
+class RelationalTopologyBackend(TopologyBackend):
+    """Build the topology straight from IPSECTunnel / IKEGateway / Device rows, without a graph database.
+
+    A handful of `values()` queries fetch flat rows; HA device groups are formed in Python with the same node ids,
+    coordinates and filter semantics as the Neo4j graph written by SyncNeo4jJob.
+    """
+
+    name = "relational"
+    live = True
+
+    TUNNEL_FIELDS = (
+        "pk",
+        "name",
+        "role",
+        "description",
+        "status__name",
+        "ipsec_crypto_profile__name",
+        "tunnel_interface__name",
+        "ike_gateway_id",
+        "ike_gateway__name",
+        "ike_gateway__ike_version",
+        "ike_gateway__local_ip",
+        "ike_gateway__peer_ip",
+        "ike_gateway__peer_device_manual",
+        "ike_gateway__peer_location_manual",
+        "ike_gateway__local_platform__name",
+        "ike_gateway__peer_platform__name",
+    )
+    DEVICE_FIELDS = (
+        "pk",
+        "name",
+        "platform__name",
+        "role__name",
+        "status__name",
+        "location__name",
+        "location__latitude",
+        "location__longitude",
+        "location___custom_field_data",
+    )
+
+    def load_rows(self):
+        """Return ``(tunnel_rows, local_groups, peer_groups, ip_index)``; groups map gateway pk -> device rows."""
+        tunnel_rows = list(IPSECTunnel.objects.filter(ike_gateway__isnull=False).values(*self.TUNNEL_FIELDS))
+        used_gateways = IPSECTunnel.objects.filter(ike_gateway__isnull=False).values("ike_gateway_id")
+        local_through = IKEGateway.local_devices.through.objects.filter(ikegateway_id__in=used_gateways)
+        peer_through = IKEGateway.peer_devices.through.objects.filter(ikegateway_id__in=used_gateways)
+
+        # Device default ordering decides which member represents an HA group, exactly like the sync job.
+        devices = {
+            row["pk"]: row
+            for row in Device.objects.filter(
+                Q(pk__in=local_through.values("device_id")) | Q(pk__in=peer_through.values("device_id"))
+            ).values(*self.DEVICE_FIELDS)
+        }
+        device_order = {pk: index for index, pk in enumerate(devices)}
+
+        def groups(through_qs):
+            members = defaultdict(list)
+            for gateway_pk, device_pk in through_qs.values_list("ikegateway_id", "device_id"):
+                if device_pk in devices:
+                    members[gateway_pk].append(device_pk)
+            return {
+                gateway_pk: [devices[pk] for pk in sorted(device_pks, key=device_order.get)]
+                for gateway_pk, device_pks in members.items()
+            }
+
+        return tunnel_rows, groups(local_through), groups(peer_through), load_interface_ip_index()
+
+    @staticmethod
+    def group_node(device_rows, platform_name=None):
+        """VPNNode-style properties for an HA device group (see TopologyPayloadBuilder.device_group_node)."""
+        dev = device_rows[0]
+        node_id = group_node_id(d["pk"] for d in device_rows)
+        country_code = device_country_code(dev["location___custom_field_data"], dev["name"]) or "UN"
+        if dev["location__latitude"] and dev["location__longitude"]:
+            lat, lon = float(dev["location__latitude"]), float(dev["location__longitude"])
+        else:
+            lat, lon = get_fallback_coords_by_country(country_code, node_id)
+        return {
+            "id": node_id,
+            "label": " <-> ".join(sorted(d["name"] for d in device_rows)),
+            "country": country_code,
+            "location_name": dev["location__name"] or "Unknown",
+            "lat": lat,
+            "lon": lon,
+            "platform_name": platform_name or dev["platform__name"] or "Unknown",
+            "status": dev["status__name"] or "Unknown",
+            "role": dev["role__name"] or "Unknown",
+            "is_ha_pair": len(device_rows) > 1,
+            "nautobot_device_pks": [str(d["pk"]) for d in device_rows],
+            "device_names": [d["name"] for d in device_rows],
+        }
+
+    @staticmethod
+    def manual_peer_node(row):
+        """VPNNode-style properties for a peer only described by the gateway's manual fields."""
+        label = (row["ike_gateway__peer_device_manual"] or row["ike_gateway__peer_location_manual"]).strip()
+        node_id = manual_peer_node_id(row["ike_gateway__peer_device_manual"], row["ike_gateway__peer_location_manual"])
+        lat, lon = get_fallback_coords_by_country("UN", node_id)
+        return {
+            "id": node_id,
+            "label": label,
+            "country": "UN",
+            "location_name": row["ike_gateway__peer_location_manual"] or "",
+            "lat": lat,
+            "lon": lon,
+            "platform_name": row["ike_gateway__peer_platform__name"] or "Unknown",
+            "status": "Manual",
+            "role": "External",
+            "nautobot_device_pks": [],
+            "device_names": [label],
+        }
+
+    @staticmethod
+    def tunnel_properties(row, local_rows, peer_rows, scope_val):
+        """TUNNEL-style properties for a tunnel row (see TopologyPayloadBuilder.tunnel_edge)."""
+        local_ip_str = str(row["ike_gateway__local_ip"] or "")
+        peer_ip_str = str(row["ike_gateway__peer_ip"] or "")
+        status_name = row["status__name"] or "Unknown"
+        role_name = str(row["role"] or "") or "Unknown"
+        ike_version = str(row["ike_gateway__ike_version"] or "") or "Unknown"
+        firewall_hostnames = ", ".join(d["name"] for d in local_rows + peer_rows if d["name"])
+        tooltip_details = {
+            "Tunnel Name": row["name"] or "N/A",
+            "Status": status_name,
+            "Role": role_name,
+            "IKE Gateway": row["ike_gateway__name"] or "N/A",
+            "IKE Version": ike_version,
+            "IPsec Profile": row["ipsec_crypto_profile__name"] or "N/A",
+            "Tunnel Interface": row["tunnel_interface__name"] or "N/A",
+            "Description": row["description"] or "",
+            "Local IP": local_ip_str or "N/A",
+            "Peer IP": peer_ip_str or "N/A",
+            "Scope": scope_val,
+            "Firewalls": firewall_hostnames,
+        }
+        return {
+            "id": f"tunnel_{row['pk']}",
+            "label": row["name"] or f"Tunnel {row['pk']}",
+            "status": status_name,
+            "role": role_name,
+            "ike_version": ike_version,
+            "scope": scope_val,
+            "local_ip": local_ip_str or "N/A",
+            "peer_ip": peer_ip_str or "N/A",
+            "firewall_hostnames": firewall_hostnames,
+            "tooltip_details_json": json.dumps(tooltip_details, ensure_ascii=False),
+        }
+
+    @staticmethod
+    def node_matches(props, filters):
+        """Python equivalent of Neo4jTopologyBackend.build_node_where (filters are already lowercased)."""
+        if "country" in filters and (props.get("country") or "").lower() != filters["country"]:
+            return False
+        if "platform" in filters and filters["platform"] not in (props.get("platform_name") or "").lower():
+            return False
+        if "location" in filters and filters["location"] not in (props.get("location_name") or "").lower():
+            return False
+        if "device" in filters:
+            device = filters["device"]
+            if not (
+                device in [name.lower() for name in props.get("device_names") or [] if name]
+                or device in (props.get("nautobot_device_pks") or [])
+                or device in (props.get("label") or "").lower()
+            ):
+                return False
+        if "role" in filters and (props.get("role") or "").lower() != filters["role"]:
+            return False
+        return True
+
+    @staticmethod
+    def edge_matches(props, filters):
+        """Python equivalent of Neo4jTopologyBackend.build_edge_filter (filters are already lowercased)."""
+        for key, prop in (("status", "status"), ("ike_version", "ike_version"), ("role", "role")):
+            if key in filters and (props.get(prop) or "").lower() != filters[key]:
+                return False
+        return True
+
+    def load_graph(self):
+        """Group devices into nodes and derive tunnels between them.
+
+        Returns ``(nodes, edges)``: VPNNode-style properties by node id and ``(source_id, target_id, props)``
+        TUNNEL triples.
+        """
+        tunnel_rows, local_groups, peer_groups, ip_index = self.load_rows()
+        scope_classifier = TopologyPayloadBuilder(ip_index=ip_index)
+        nodes = {}
+        edges = []
+        for row in tunnel_rows:
+            local_rows = local_groups.get(row["ike_gateway_id"], [])
+            if not local_rows:
+                continue
+            local_node = self.group_node(local_rows, row["ike_gateway__local_platform__name"])
+            nodes.setdefault(local_node["id"], local_node)
+
+            peer_rows = peer_groups.get(row["ike_gateway_id"], [])
+            if peer_rows:
+                peer_node = self.group_node(peer_rows, row["ike_gateway__peer_platform__name"])
+            elif (row["ike_gateway__peer_device_manual"] or "").strip() or (
+                row["ike_gateway__peer_location_manual"] or ""
+            ).strip():
+                peer_node = self.manual_peer_node(row)
+            else:
+                continue
+            nodes.setdefault(peer_node["id"], peer_node)
+
+            scope_val = scope_classifier.classify_scope(
+                str(row["ike_gateway__local_ip"] or ""),
+                str(row["ike_gateway__peer_ip"] or ""),
+                bool(local_rows),
+                bool(peer_rows),
+            )
+            edges.append(
+                (
+                    local_node["id"],
+                    peer_node["id"],
+                    self.tunnel_properties(row, local_rows, peer_rows, scope_val),
+                )
+            )
+        return nodes, edges
+
+    def build_graph(self, filters):
+        """Build the graph from the database rows and apply the filters in memory."""
+        nodes, edges = self.load_graph()
+        devices_fc = {"type": "FeatureCollection", "features": []}
+        tunnels_fc = {"type": "FeatureCollection", "features": []}
+        matched_ids = set()
+        for node_id, props in nodes.items():
+            if self.node_matches(props, filters):
+                matched_ids.add(node_id)
+                devices_fc["features"].append(node_feature(props))
+
+        # Edges touching a matched node (any edge when no node matched), plus their unmatched endpoints.
+        emitted_ids = set(matched_ids)
+        for source_id, target_id, rel_props in edges:
+            if matched_ids and source_id not in matched_ids and target_id not in matched_ids:
+                continue
+            if not self.edge_matches(rel_props, filters):
+                continue
+            for node_id in (source_id, target_id):
+                if node_id not in emitted_ids:
+                    emitted_ids.add(node_id)
+                    devices_fc["features"].append(node_feature(nodes[node_id]))
+            tunnels_fc["features"].append(tunnel_feature(nodes[source_id], nodes[target_id], rel_props))
+
+        return self.summarize(devices_fc, tunnels_fc)
+
+    def build_facet_index(self):
+        """Reduce the graph built from the database rows to its filterable properties."""
+        nodes, edges = self.load_graph()
+        return {
+            "nodes": {
+                node_id: {key: props.get(key) for key in FACET_NODE_PROPERTIES} for node_id, props in nodes.items()
+            },
+            "tunnels": [
+                [source_id, target_id, {key: props.get(key) for key in FACET_TUNNEL_PROPERTIES}]
+                for source_id, target_id, props in edges
+            ],
+        }
+
+
+TOPOLOGY_BACKENDS = {
+    Neo4jTopologyBackend.name: Neo4jTopologyBackend,
+    RelationalTopologyBackend.name: RelationalTopologyBackend,
+}
+
+
+def get_topology_settings():
+    """Topology settings from PLUGINS_CONFIG["nautobot_app_vpn"]["topology"] merged over the defaults."""
+    config = {**DEFAULT_TOPOLOGY_SETTINGS, **get_app_settings("topology")}
+    config["cluster_max_zoom"] = int(config["cluster_max_zoom"])
+    config["cluster_grid_size"] = max(1, int(config["cluster_grid_size"]))
+    return config
+
+
+def get_topology_backend():
+    """Instantiate the backend selected by PLUGINS_CONFIG["nautobot_app_vpn"]["topology"]["backend"]."""
+    backend = get_topology_settings()["backend"]
+    backend_class = TOPOLOGY_BACKENDS.get(backend) or import_string(backend)
+    return backend_class()
@@ -0,0 +1,121 @@
+"""Sync-generation keyed caching of topology API responses."""
+
+import hashlib
+import json
+import logging
+import uuid
+
+from django.core.cache import cache
+from django.db import DatabaseError
+from django.db.models import F
+from django.utils import timezone
+
+from nautobot_app_vpn.models import VPNDashboard
+from nautobot_app_vpn.utils import get_app_settings
+
+logger = logging.getLogger(__name__)
+
+# Defaults for PLUGINS_CONFIG["nautobot_app_vpn"]["cache"].
+DEFAULT_CACHE_SETTINGS = {
+    "enabled": True,
+    # Upper bound on staleness of the relational tunnel counts, which can change between syncs.
+    "topology_timeout": 900,
+}
+
+# Query parameters that change the topology response. All of them are matched case-insensitively.
+TOPOLOGY_FILTER_KEYS = ("country", "platform", "location", "device", "role", "status", "ike_version")
+
+CACHE_KEY_PREFIX = "nautobot_app_vpn.topology"
+
+# Opaque token replaced whenever data behind the filter options changes (see signals.py).
+FILTER_OPTIONS_VERSION_KEY = f"{CACHE_KEY_PREFIX}.filter-options.version"
+
+# The dashboard row shared by the sync job and the topology API.
+DASHBOARD_PK = 1
+
+
+def get_cache_settings():
+    """Cache settings from PLUGINS_CONFIG["nautobot_app_vpn"]["cache"] merged over the defaults."""
+    return {**DEFAULT_CACHE_SETTINGS, **get_app_settings("cache")}
+
+
+def normalize_topology_filters(params):
+    """Return the recognised, non-empty topology filters from request params, stripped and lowercased."""
+    filters = {}
+    for key in TOPOLOGY_FILTER_KEYS:
+        value = str(params.get(key) or "").strip().lower()
+        if value:
+            filters[key] = value
+    return filters
+
+
+def get_sync_state():
+    """Return ``{"generation", "last_synced", "last_sync_status", "last_updated"}`` from the VPNDashboard row.
+
+    `last_updated` (a datetime) moves together with `generation`, so it is usable as Last-Modified.
+    """
+    state = {"generation": 0, "last_synced": None, "last_sync_status": None, "last_updated": None}
+    try:
+        row = (
+            VPNDashboard.objects.filter(pk=DASHBOARD_PK)
+            .values("sync_generation", "last_sync_time", "last_sync_status", "last_updated")
+            .first()
+        )
+    except DatabaseError as db_error:
+        logger.debug("Unable to load VPNDashboard sync metadata due to database error: %s", db_error, exc_info=True)
+        return state
+    if row:
+        state["generation"] = row["sync_generation"]
+        state["last_synced"] = row["last_sync_time"].isoformat() if row["last_sync_time"] else None
+        state["last_sync_status"] = row["last_sync_status"] or None
+        state["last_updated"] = row["last_updated"]
+    return state
+
+
+def bump_sync_generation():
+    """Mark the topology as changed so every cached response keyed on the previous generation is bypassed."""
+    updated = VPNDashboard.objects.filter(pk=DASHBOARD_PK).update(
+        sync_generation=F("sync_generation") + 1, last_updated=timezone.now()
+    )
+    if not updated:
+        VPNDashboard.objects.get_or_create(pk=DASHBOARD_PK, defaults={"sync_generation": 1})
+
+
+def get_cache_scope(user):
+    """Cache partition for permission-restricted data: shared by superusers, per user otherwise."""
+    if getattr(user, "is_superuser", False):
+        return "all"
+    return f"user:{getattr(user, 'pk', None) or 'anonymous'}"
+
+
+def topology_cache_key(kind, filters, generation, scope="all"):
+    """Build a cache key from the response kind, normalised filters, sync generation and permission scope."""
+    digest = hashlib.sha256(json.dumps(filters, sort_keys=True).encode("utf-8")).hexdigest()[:32]
+    return f"{CACHE_KEY_PREFIX}.{kind}.g{generation}.{scope}.{digest}"
+
+
+def cached_topology_data(key, builder):
+    """Return the cached value for `key`, calling `builder()` and caching its result on a miss."""
+    config = get_cache_settings()
+    if not config["enabled"]:
+        return builder()
+    value = cache.get(key)
+    if value is None:
+        value = builder()
+        cache.set(key, value, timeout=int(config["topology_timeout"]))
+    return value
+
+
+def get_filter_options_version():
+    """Return the token identifying the current filter-option data, creating one if the cache has none."""
+    version = cache.get(FILTER_OPTIONS_VERSION_KEY)
+    if version is None:
+        cache.add(FILTER_OPTIONS_VERSION_KEY, uuid.uuid4().hex, timeout=None)
+        version = cache.get(FILTER_OPTIONS_VERSION_KEY)
+    # A non-persistent cache backend never keeps the token; fall back to a fresh one (no cache hits, no 304s).
+    return version or uuid.uuid4().hex
+
+
+def bump_filter_options_version():
+    """Invalidate cached filter options (and their ETag) after tunnels, gateways, devices or platforms changed."""
+    cache.set(FILTER_OPTIONS_VERSION_KEY, uuid.uuid4().hex, timeout=None)
@@ -0,0 +1,79 @@
+"""Columnar wire format of the topology API: parallel, dictionary-encoded property columns."""
+
+import json
+
+# Low-cardinality string columns are sent as a dictionary plus integer codes; a column qualifies when its
+# distinct values number at most this fraction of its rows.
+DICTIONARY_MAX_RATIO = 0.5
+
+# Derived on the client from other columns (see `search_text` in topology.backends.node_feature).
+DERIVED_DEVICE_PROPERTIES = ("search_text",)
+
+
+def encode_column(values):
+    """Return ``values`` as-is, or ``{"dictionary": [...], "codes": [...]}`` for repetitive scalar columns."""
+    if not values or any(isinstance(value, (list, dict)) for value in values):
+        return values
+    dictionary = {}
+    for value in values:
+        dictionary.setdefault(value, len(dictionary))
+    if len(dictionary) > max(1, len(values) * DICTIONARY_MAX_RATIO):
+        return values
+    return {"dictionary": list(dictionary), "codes": [dictionary[value] for value in values]}
+
+
+def _columns(rows, skip=()):
+    """Parallel, possibly dictionary-encoded, columns for a list of property dicts (keys in first-seen order)."""
+    keys = {}
+    for row in rows:
+        for key in row:
+            if key not in skip:
+                keys.setdefault(key)
+    return {key: encode_column([row.get(key) for row in rows]) for key in keys}
+
+
+def _json_object(value):
+    if isinstance(value, dict):
+        return value
+    try:
+        parsed = json.loads(value) if value else {}
+    except (TypeError, ValueError):
+        return {"": value}
+    return parsed if isinstance(parsed, dict) else {"": value}
+
+
+def columnar_feature_collection(collection, skip=(), structured=()):
+    """Columnar form of a GeoJSON FeatureCollection of Points or two-point LineStrings.
+
+    ``coordinates`` is one flat list (``lon, lat`` per point, ``lon1, lat1, lon2, lat2`` per line), properties
+    become ``columns``, and each property in `structured` (an embedded JSON object string) becomes a nested set
+    of columns, one per object key in first-seen order. Text that is not a JSON object is kept under the "" key.
+    """
+    features = (collection or {}).get("features") or []
+    coordinates = []
+    for feature in features:
+        geometry = feature["geometry"]
+        points = [geometry["coordinates"]] if geometry["type"] == "Point" else geometry["coordinates"]
+        for lon, lat in points:
+            coordinates.extend((lon, lat))
+
+    rows = [feature.get("properties") or {} for feature in features]
+    result = {
+        "count": len(features),
+        "geometry": features[0]["geometry"]["type"] if features else None,
+        "coordinates": coordinates,
+        "columns": _columns(rows, skip=(*skip, *structured)),
+    }
+    for prop in structured:
+        result[prop] = _columns([_json_object(row.get(prop)) for row in rows])
+    return result
+
+
+def columnar_payload(data):
+    """Return the topology payload `data` with its ``devices`` / ``tunnels`` FeatureCollections as columns."""
+    return {
+        **data,
+        "format": "columnar",
+        "devices": columnar_feature_collection(data["devices"], skip=DERIVED_DEVICE_PROPERTIES),
+        "tunnels": columnar_feature_collection(data["tunnels"], structured=("tooltip",)),
+    }
@@ -0,0 +1,111 @@
+"""Process-wide, lazily created Neo4j driver shared by the API views, jobs and the realtime sync worker."""
+
+import atexit
+import logging
+import os
+import threading
+import time
+
+from django.conf import settings
+from neo4j import GraphDatabase
+
+from nautobot_app_vpn.utils import get_app_settings
+
+logger = logging.getLogger(__name__)
+
+NEO4J_SETTINGS_ATTRS = ("NEO4J_URI", "NEO4J_USER", "NEO4J_PASSWORD")
+
+# Defaults for PLUGINS_CONFIG["nautobot_app_vpn"]["neo4j"].
+DEFAULT_DRIVER_SETTINGS = {
+    "max_connection_pool_size": 100,  # Connections kept per process
+    "max_connection_lifetime": 3600,  # Seconds before a pooled connection is retired
+    "connection_acquisition_timeout": 60,  # Seconds to wait for a free pooled connection
+    "health_check_ttl": 30,  # Seconds a successful connectivity probe is trusted
+}
+
+_lock = threading.Lock()
+_driver = None
+_driver_pid = None
+_last_healthy = None
+
+
+def neo4j_is_configured():
+    """Return True when NEO4J_URI, NEO4J_USER and NEO4J_PASSWORD are all present in the Nautobot settings."""
+    return all(hasattr(settings, attr) for attr in NEO4J_SETTINGS_ATTRS)
+
+
+def get_neo4j_database():
+    """Name of the Neo4j database holding the VPN topology."""
+    return getattr(settings, "NEO4J_DATABASE", "neo4j")
+
+
+def get_driver_settings():
+    """Driver settings from PLUGINS_CONFIG["nautobot_app_vpn"]["neo4j"] merged over the defaults."""
+    return {**DEFAULT_DRIVER_SETTINGS, **get_app_settings("neo4j")}
+
+
+def get_neo4j_driver():
+    """Return the shared Neo4j driver for this process, creating it on first use.
+
+    The driver owns a connection pool, so callers only open sessions on it and must not close it. A driver
+    inherited through fork() is discarded and a fresh one is created in the child process.
+    """
+    global _driver, _driver_pid, _last_healthy  # pylint: disable=global-statement
+    pid = os.getpid()
+    if _driver is not None and _driver_pid == pid:
+        return _driver
+    with _lock:
+        if _driver is None or _driver_pid != pid:
+            config = get_driver_settings()
+            _driver = GraphDatabase.driver(
+                settings.NEO4J_URI,
+                auth=(settings.NEO4J_USER, settings.NEO4J_PASSWORD),
+                max_connection_pool_size=int(config["max_connection_pool_size"]),
+                max_connection_lifetime=float(config["max_connection_lifetime"]),
+                connection_acquisition_timeout=float(config["connection_acquisition_timeout"]),
+            )
+            _driver_pid = pid
+            _last_healthy = None
+            logger.debug("Created shared Neo4j driver for %s (pid %s).", settings.NEO4J_URI, pid)
+        return _driver
+
+
+def verify_neo4j_connectivity(force=False):
+    """Return the shared driver after making sure Neo4j is reachable.
+
+    A successful probe is cached for `health_check_ttl` seconds so hot paths do not pay a round trip per call;
+    `force` always probes. Connection errors from the driver are propagated unchanged.
+    """
+    global _last_healthy  # pylint: disable=global-statement
+    driver = get_neo4j_driver()
+    ttl = float(get_driver_settings()["health_check_ttl"])
+    if force or _last_healthy is None or time.monotonic() - _last_healthy > ttl:
+        try:
+            driver.verify_connectivity()
+        except Exception:
+            _last_healthy = None
+            raise
+        _last_healthy = time.monotonic()
+    return driver
+
+
+def close_neo4j_driver():
+    """Close the shared driver of this process (if any); the next call to get_neo4j_driver() creates a new one."""
+    global _driver, _driver_pid, _last_healthy  # pylint: disable=global-statement
+    with _lock:
+        driver, owner_pid = _driver, _driver_pid
+        _driver = _driver_pid = _last_healthy = None
+    if driver is not None and owner_pid == os.getpid():
+        driver.close()
+
+
+def _forget_driver_after_fork():
+    # The child must not use (or close) the parent's pooled sockets; drop the reference and start over lazily.
+    global _lock, _driver, _driver_pid, _last_healthy  # pylint: disable=global-statement
+    _lock = threading.Lock()
+    _driver = _driver_pid = _last_healthy = None
+
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_forget_driver_after_fork)
+atexit.register(close_neo4j_driver)
@@ -0,0 +1,165 @@
+"""Faceted filter counts computed from a per-generation facet index of the topology graph.
+
+The facet index is the drawable graph reduced to what the filters look at: ``{"nodes": {id: props},
+"tunnels": [[source_id, target_id, props]]}``. It is built by the topology backend once per sync generation
+(warmed by SyncNeo4jJob) and cached, so counting never queries the graph or the database.
+"""
+
+from bisect import bisect_right
+from collections import Counter, defaultdict
+
+from nautobot_app_vpn.topology.backends import RelationalTopologyBackend
+from nautobot_app_vpn.topology.cache import cached_topology_data, topology_cache_key
+
+# Facets narrowing nodes (a tunnel counts when either endpoint matches) and facets narrowing tunnels. "role" is
+# listed with the tunnel facets, like the dashboard's role dropdown, but the view matches it on nodes as well.
+NODE_FACETS = ("country", "platform", "location", "device")
+TUNNEL_FACETS = ("status", "role", "ike_version")
+NODE_FILTERS = (*NODE_FACETS, "role")
+
+_NODE_FACET_PROPERTY = {"country": "country", "platform": "platform_name", "location": "location_name"}
+
+node_matches = RelationalTopologyBackend.node_matches
+edge_matches = RelationalTopologyBackend.edge_matches
+
+
+def facet_index_cache_key(backend, generation):
+    """Cache key of the facet index of `backend` for sync `generation`."""
+    return topology_cache_key(f"facet-index-{backend.name}", {}, generation)
+
+
+def get_facet_index(backend, generation):
+    """Return the (cached) facet index of `backend` for sync `generation`."""
+    return cached_topology_data(facet_index_cache_key(backend, generation), backend.build_facet_index)
+
+
+def _node_values(props, facet):
+    if facet == "device":
+        return [name for name in props.get("device_names") or [] if name]
+    value = props.get(_NODE_FACET_PROPERTY[facet])
+    return [value] if value else []
+
+
+def _matching_nodes(nodes, node_ids, facet, values):
+    """Return ``{value: ids}``: the `node_ids` that `node_matches` selects for ``{facet: value}``."""
+    if facet != "device":
+        prop = _NODE_FACET_PROPERTY[facet]
+        groups = defaultdict(set)
+        for node_id in node_ids:
+            groups[nodes[node_id].get(prop)].add(node_id)
+        return {
+            value: set().union(
+                *(ids for key, ids in groups.items() if node_matches({prop: key}, {facet: value.lower()}))
+            )
+            for value in values
+        }
+
+    # A device name or pk, or a substring of the node label: the labels are searched as one string.
+    node_ids = list(node_ids)
+    exact = defaultdict(set)
+    labels, starts, offset = [], [], 0
+    for node_id in node_ids:
+        props = nodes[node_id]
+        for key in [name.lower() for name in props.get("device_names") or [] if name]:
+            exact[key].add(node_id)
+        for key in props.get("nautobot_device_pks") or []:
+            exact[key].add(node_id)
+        label = (props.get("label") or "").lower()
+        labels.append(label)
+        starts.append(offset)
+        offset += len(label) + 1
+    text = "\0".join(labels)
+    result = {}
+    for value in values:
+        needle = value.lower()
+        ids = set(exact.get(needle, ()))
+        position = text.find(needle)
+        while position != -1:
+            index = bisect_right(starts, position) - 1
+            ids.add(node_ids[index])
+            position = text.find(needle, starts[index + 1]) if index + 1 < len(starts) else -1
+        result[value] = ids
+    return result
+
+
+def _view(tunnels, matched, edge_filters):
+    """Return the tunnel count and node ids of the topology view for the `matched` nodes.
+
+    As in `RelationalTopologyBackend.build_graph`: tunnels touching a matched node (any tunnel when none matched)
+    that pass `edge_filters`, the matched nodes and those tunnels' endpoints.
+    """
+    count, node_ids = 0, set(matched)
+    for source_id, target_id, props in tunnels:
+        if matched and source_id not in matched and target_id not in matched:
+            continue
+        if not edge_matches(props, edge_filters):
+            continue
+        count += 1
+        node_ids.update((source_id, target_id))
+    return count, node_ids
+
+
+def _entry(value, tunnels, nodes):
+    return {"value": value, "tunnels": tunnels, "nodes": nodes}
+
+
+def _sorted_entries(entries):
+    return sorted(entries, key=lambda entry: str(entry["value"]).lower())
+
+
+def facet_counts(index, filters):
+    """Return ``{facet: [{"value", "tunnels", "nodes"}]}`` for every facet under the normalised `filters`.
+
+    Each facet is counted with all selected filters except its own (disjunctive faceting), and each value gets
+    what the topology view returns when it is selected with the others, using the same predicates
+    (`RelationalTopologyBackend.node_matches` / `edge_matches`): node filters, "role" included, select nodes and
+    the tunnels touching them; when no node matches, every tunnel passing the tunnel filters is returned. Values
+    are listed when the view returns a tunnel, or for a node facet a matching node.
+    """
+    nodes = index["nodes"]
+    tunnels = index["tunnels"]
+    node_filters = {key: filters[key] for key in NODE_FILTERS if key in filters}
+    edge_filters = {key: filters[key] for key in TUNNEL_FACETS if key in filters}
+
+    result = {}
+    fallback = None
+    for facet in NODE_FACETS:
+        other_nodes = {key: value for key, value in node_filters.items() if key != facet}
+        base = {node_id for node_id, props in nodes.items() if node_matches(props, other_nodes)}
+        values = sorted({value for props in nodes.values() for value in _node_values(props, facet)})
+        matching = _matching_nodes(nodes, base, facet, values)
+        values_by_node = defaultdict(set)
+        for value, node_ids in matching.items():
+            for node_id in node_ids:
+                values_by_node[node_id].add(value)
+        tunnel_counts = Counter()
+        node_sets = {value: set(node_ids) for value, node_ids in matching.items() if node_ids}
+        for source_id, target_id, props in tunnels:
+            if not edge_matches(props, edge_filters):
+                continue
+            for value in values_by_node.get(source_id, set()) | values_by_node.get(target_id, set()):
+                tunnel_counts[value] += 1
+                node_sets[value].update((source_id, target_id))
+        entries = [_entry(value, tunnel_counts[value], len(node_ids)) for value, node_ids in node_sets.items()]
+        unmatched = [value for value in values if value not in node_sets]
+        if unmatched:
+            if fallback is None:
+                fallback = _view(tunnels, set(), edge_filters)
+            if fallback[0]:
+                entries += [_entry(value, fallback[0], len(fallback[1])) for value in unmatched]
+        result[facet] = _sorted_entries(entries)
+
+    for facet in TUNNEL_FACETS:
+        other_nodes = {key: value for key, value in node_filters.items() if key != facet}
+        other_edges = {key: value for key, value in edge_filters.items() if key != facet}
+        matched = None
+        entries = []
+        for value in sorted({props.get(facet) for _, _, props in tunnels if props.get(facet)}):
+            if facet in NODE_FILTERS or matched is None:
+                value_nodes = {**other_nodes, facet: value.lower()} if facet in NODE_FILTERS else other_nodes
+                matched = {node_id for node_id, props in nodes.items() if node_matches(props, value_nodes)}
+            count, node_ids = _view(tunnels, matched, {**other_edges, facet: value.lower()})
+            if count:
+                entries.append(_entry(value, count, len(node_ids)))
+        result[facet] = _sorted_entries(entries)
+    return result
@@ -0,0 +1,51 @@
+"""Distinct dashboard filter values, computed with one UNION of per-facet DISTINCT queries."""
+
+from django.db.models import CharField, F, Value
+from nautobot.dcim.models import Platform
+
+from nautobot_app_vpn.models import IKEGateway, IPSECTunnel
+from nautobot_app_vpn.topology.payloads import device_country_code
+
+# Response keys, in the order the dashboard expects them.
+FILTER_OPTION_KEYS = ("country", "ike_version", "status", "role", "location", "device", "platform")
+
+
+def _facet(queryset, facet, field):
+    """``SELECT DISTINCT '<facet>', <field>`` over `queryset`, ready to be combined with union()."""
+    return (
+        queryset.annotate(facet=Value(facet, output_field=CharField()), value=F(field))
+        .values_list("facet", "value")
+        .order_by()
+    )
+
+
+def filter_options_queryset():
+    """One UNION query yielding ``(facet, value)`` rows for every facet except the derived "country".
+
+    Devices and their locations come from the local/peer device through tables of gateways that carry at least
+    one tunnel, so the cost grows with the number of distinct values rather than the number of tunnels.
+    """
+    tunnel_gateways = IPSECTunnel.objects.filter(ike_gateway__isnull=False).values("ike_gateway")
+    facets = [
+        _facet(IPSECTunnel.objects.all(), "status", "status__name"),
+        _facet(IPSECTunnel.objects.all(), "role", "role"),
+        _facet(IKEGateway.objects.filter(pk__in=tunnel_gateways), "ike_version", "ike_version"),
+        # Every defined platform is offered, which includes those of gateways and devices.
+        _facet(Platform.objects.all(), "platform", "name"),
+    ]
+    for through in (IKEGateway.local_devices.through, IKEGateway.peer_devices.through):
+        members = through.objects.filter(ikegateway__in=tunnel_gateways)
+        facets.append(_facet(members, "device", "device__name"))
+        facets.append(_facet(members, "location", "device__location__name"))
+    return facets[0].union(*facets[1:])
+
+
+def build_filter_options():
+    """Return ``{key: sorted distinct values}`` for FILTER_OPTION_KEYS."""
+    options = {key: set() for key in FILTER_OPTION_KEYS}
+    for facet, value in filter_options_queryset():
+        if value:
+            options[facet].add(str(value))
+    # Country is derived from the 'CODE-...' device name convention.
+    options["country"] = {device_country_code(None, name) for name in options["device"]}
+    return {key: sorted(filter(None, values)) for key, values in options.items()}
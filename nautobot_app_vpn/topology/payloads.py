@@ -0,0 +1,481 @@
+"""Build Neo4j VPNNode / TUNNEL payloads from Nautobot VPN objects."""
+# pylint: disable=broad-exception-caught
+
+import hashlib
+import json
+import logging
+import re
+from datetime import UTC, datetime
+from ipaddress import ip_address, ip_interface
+
+from django.db.models import Prefetch
+from nautobot.dcim.models import Device
+
+# ✅ Nautobot IPAM model uses `host` + `mask_length` (not `address`)
+from nautobot.ipam.models import IPAddress
+
+from nautobot_app_vpn.models import IKEGateway, IPSECTunnel
+
+logger = logging.getLogger(__name__)
+
+# Fallback coordinates by country code for when lat/long is not available
+FALLBACK_COORDS_BY_COUNTRY = {
+    "SG": (1.3521, 103.8198),
+    "UK": (51.5074, -0.1278),
+    "US": (38.8951, -77.0364),
+    "DE": (52.52, 13.4050),
+    "FR": (48.8566, 2.3522),
+    "IN": (28.6139, 77.2090),
+    "AU": (-33.8688, 151.2093),
+    "CN": (39.9042, 116.4074),
+    "ES": (40.4168, -3.7038),
+    "IT": (41.9028, 12.4964),
+    "NL": (52.3676, 4.9041),
+    "SE": (59.3293, 18.0686),
+    "PL": (52.2297, 21.0122),
+    "MX": (19.4326, -99.1332),
+    "ID": (-6.2088, 106.8456),
+    "BE": (50.8503, 4.3517),
+    "IE": (53.3498, -6.2603),
+    "CH": (46.9481, 7.4474),
+    "FI": (60.1695, 24.9354),
+    "LT": (54.6872, 25.2797),
+    "TR": (39.9208, 32.8541),
+    "NO": (59.9139, 10.7522),
+    "NZ": (-41.2865, 174.7762),
+    "DK": (55.6761, 12.5683),
+    "CL": (-33.4489, -70.6693),
+    "AT": (48.2082, 16.3738),
+    "JP": (35.6762, 139.6503),
+    "KR": (37.5665, 126.9780),
+    "BR": (-15.7801, -47.9292),
+    "CA": (45.4215, -75.6972),
+    "RU": (55.7558, 37.6173),
+    "ZA": (-33.9249, 18.4241),
+    "AE": (25.2048, 55.2708),
+    "SA": (24.7136, 46.6753),
+    "TH": (13.7563, 100.5018),
+    "MY": (3.1390, 101.6869),
+    "VN": (21.0285, 105.8542),
+    "PH": (14.5995, 120.9842),
+    "HK": (22.3193, 114.1694),
+    "TW": (25.0330, 121.5654),
+    # Add others as needed
+}
+
+# Properties left out of payload hashes: the hash itself and the sync timestamp, which changes on every run and would
+# mark every item as changed. The tooltip carries no timestamp (the dashboard shows meta.last_synced instead).
+HASH_EXCLUDED_PROPERTIES = frozenset({"payload_hash", "synced_at_utc"})
+
+# Lowercase copies of the properties the dashboard filters on, indexed in Neo4j (see topology.schema) so
+# case-insensitive filters are index seeks instead of toLower() scans. Maps source property -> copy.
+NODE_LOWERCASE_PROPERTIES = {
+    "label": "label_lc",
+    "country": "country_lc",
+    "platform_name": "platform_lc",
+    "location_name": "location_lc",
+    "role": "role_lc",
+}
+TUNNEL_LOWERCASE_PROPERTIES = {
+    "status": "status_lc",
+    "role": "role_lc",
+    "ike_version": "ike_version_lc",
+}
+
+
+# Precomputed once at import: country code -> ((lat_min, lat_max), (lon_min, lon_max)) spread for fallback nodes.
+# Known countries get +/-0.5 degrees around the capital, "UN" (unknown) spreads over the populated world.
+FALLBACK_COORD_RANGES = {
+    code: ((lat - 0.5, lat + 0.5), (lon - 0.5, lon + 0.5)) for code, (lat, lon) in FALLBACK_COORDS_BY_COUNTRY.items()
+}
+FALLBACK_COORD_RANGES["UN"] = ((-50.0, 50.0), (-180.0, 180.0))
+
+
+def _stable_fractions(key):
+    """Map a string to two reproducible floats in [0, 1) (unlike `random`, identical across runs and processes)."""
+    digest = hashlib.sha256(key.encode("utf-8")).digest()
+    return int.from_bytes(digest[:8], "big") / 2**64, int.from_bytes(digest[8:16], "big") / 2**64
+
+
+def get_fallback_coords_by_country(country_code, node_id=""):
+    """Get fallback (latitude, longitude) for a given country code.
+
+    The jitter inside the country's spread is derived from `node_id`, so the same node always lands on the same
+    spot and repeated syncs produce byte-identical node payloads.
+    """
+    country_key = (country_code or "UN").upper()
+    (lat_min, lat_max), (lon_min, lon_max) = FALLBACK_COORD_RANGES.get(country_key, FALLBACK_COORD_RANGES["UN"])
+    lat_fraction, lon_fraction = _stable_fractions(f"{country_key}:{node_id}")
+    return (
+        round(lat_min + lat_fraction * (lat_max - lat_min), 6),
+        round(lon_min + lon_fraction * (lon_max - lon_min), 6),
+    )
+
+
+def add_lowercase_copies(props, mapping):
+    """Add the lowercase copy of each `mapping` source property present in `props`; returns `props`."""
+    for source, target in mapping.items():
+        value = props.get(source)
+        if value is not None:
+            props[target] = str(value).lower()
+    return props
+
+
+def payload_hash(payload):
+    """Return a stable SHA-256 hex digest of a node or edge payload, ignoring volatile properties."""
+    canonical = {key: value for key, value in payload.items() if key not in HASH_EXCLUDED_PROPERTIES}
+    encoded = json.dumps(canonical, sort_keys=True, ensure_ascii=False, default=str).encode("utf-8")
+    return hashlib.sha256(encoded).hexdigest()
+
+
+def host_only(ip_value):
+    """Return just the host part of an IP string (CIDR or raw)."""
+    if not ip_value:
+        return ""
+    s = str(ip_value).strip()
+    try:
+        if "/" in s:
+            return str(ip_interface(s).ip)
+        return str(ip_address(s))
+    except Exception:
+        m = re.search(r"([0-9]{1,3}(?:\.[0-9]{1,3}){3})", s)
+        return m.group(1) if m else s
+
+
+def sanitize_filename(input_name):
+    """Replace characters that are unsafe in an icon filename."""
+    return re.sub(r"[^A-Za-z0-9_\-]", "_", input_name)
+
+
+def group_node_id(device_pks):
+    """Return the VPNNode id of the HA group formed by the given device PKs (order does not matter)."""
+    return f"group:{'|'.join(sorted(str(pk) for pk in device_pks))}"
+
+
+def manual_peer_node_id(peer_device_manual, peer_location_manual):
+    """Return the VPNNode id of a peer described only by a gateway's manual device/location fields."""
+    manual_peer_label = (peer_device_manual or peer_location_manual).strip()
+    # normalized id uses spaces and slashes replacement (consistent with get_node_id)
+    return f"manual_peer:{manual_peer_label.strip().lower().replace(' ', '_').replace('/', '_')}"
+
+
+def get_node_id(devices_list=None, manual_name=None):
+    """Return the VPNNode id for an HA device group or a manually defined peer."""
+    if devices_list:
+        return group_node_id(d.pk for d in devices_list)
+    if manual_name:
+        return f"manual_peer:{manual_name.strip().replace(' ', '_').replace('/', '_').lower()}"
+    return None
+
+
+def get_node_label(devices_list=None, manual_name=None):
+    """Return the display label for an HA device group or a manually defined peer."""
+    if devices_list:
+        return " <-> ".join(sorted(d.name for d in devices_list))
+    return manual_name or "Unknown Peer"
+
+
+def device_country_code(location_custom_fields, device_name):
+    """Country code from a location's `country_code`/`country` custom field, else the 'CODE-...' device name prefix."""
+    country = (location_custom_fields or {}).get("country_code") or (location_custom_fields or {}).get("country")
+    if country:
+        return str(country).upper()
+    if device_name:
+        parts = device_name.split("-")
+        return parts[0].upper() if parts else "UN"
+    return None
+
+
+def get_device_country(device_obj, manual_location_str=None):
+    """Derive a country code from location custom fields, the device name prefix or a manual location."""
+    if device_obj:
+        location_cf = getattr(device_obj.location, "custom_field_data", None) if device_obj.location else None
+        country = device_country_code(location_cf, device_obj.name)
+        if country:
+            return country
+    if manual_location_str:
+        parts = manual_location_str.split(",")
+        return (
+            parts[-1].strip().upper()
+            if len(parts) > 1
+            else (parts[0].strip().upper() if parts and parts[0].strip() else "UN")
+        )
+    return "UN"
+
+
+def load_interface_ip_index(hosts=None):
+    """Return the set of IP hosts assigned to any device or VM interface.
+
+    We consider an IP "present" if it is assigned to any interface. We store only the host, no prefix.
+    When `hosts` is given, only those hosts are looked up (enough to classify a handful of tunnels).
+    """
+    ip_index = set()
+    ip_qs = IPAddress.objects.all()
+    if hosts is not None:
+        ip_qs = ip_qs.filter(host__in=[host for host in hosts if host])
+    # Nautobot 2.x uses M2M relations: `interfaces` and `vm_interfaces`.
+    qs1 = ip_qs.filter(interfaces__isnull=False).values_list("host", flat=True)
+    qs2 = ip_qs.filter(vm_interfaces__isnull=False).values_list("host", flat=True)
+    for host in qs1.iterator():
+        if host:
+            ip_index.add(str(host))
+    for host in qs2.iterator():
+        if host:
+            ip_index.add(str(host))
+    return ip_index
+
+
+def tunnel_queryset():
+    """Return the IPSECTunnel queryset with everything the payload builder touches preloaded."""
+    device_prefetch_qs = Device.objects.select_related(
+        "platform", "role", "location", "status", "device_type", "primary_ip4"
+    )
+    return IPSECTunnel.objects.select_related(
+        "ike_gateway",
+        "ike_gateway__status",
+        "ike_gateway__local_platform",
+        "ike_gateway__peer_platform",
+        "status",
+        "tunnel_interface",
+        "ipsec_crypto_profile",
+    ).prefetch_related(
+        Prefetch("ike_gateway__local_devices", queryset=device_prefetch_qs),
+        Prefetch("ike_gateway__peer_devices", queryset=device_prefetch_qs),
+    )
+
+
+class TopologyPayloadBuilder:
+    """Turn IPSECTunnel objects into VPNNode and TUNNEL payloads, one tunnel at a time."""
+
+    def __init__(self, ip_index=None, now_utc=None):
+        """Initialize the builder with the interface IP index used for scope classification."""
+        self.ip_index = ip_index if ip_index is not None else set()
+        self.now_utc = now_utc or datetime.now(UTC)
+        self.node_counts = {"DeviceGroup": 0, "ManualPeer": 0}
+        self.edge_count = 0
+
+    def classify_scope(self, local_ip, peer_ip, has_local_devices=False, has_peer_devices=False):
+        """Classify a tunnel as 'internal' when both sides are known in Nautobot.
+
+        A tunnel is considered internal when:
+        * both local_ip and peer_ip are assigned to Nautobot interfaces, OR
+        * both local and peer device groups contain at least one Nautobot Device.
+        Everything else is treated as external.
+        """
+        try:
+            li = host_only(local_ip)
+            pi = host_only(peer_ip)
+            if li and pi and (li in self.ip_index) and (pi in self.ip_index):
+                return "internal"
+            if has_local_devices and has_peer_devices:
+                return "internal"
+        except Exception:  # defensive
+            pass
+        return "external"
+
+    def device_group_node(self, devices, platform_obj=None):
+        """Return the VPNNode payload for an (HA) group of Nautobot devices."""
+        node_id = get_node_id(devices_list=devices)
+        dev = devices[0]
+        country_code = get_device_country(dev, None)
+
+        # final lat/lon
+        if dev.location and dev.location.latitude and dev.location.longitude:
+            lat = float(dev.location.latitude)
+            lon = float(dev.location.longitude)
+        else:
+            lat, lon = get_fallback_coords_by_country(country_code, node_id)
+
+        loc_name = dev.location.name if dev.location else "Unknown"
+        platform_obj = platform_obj or dev.platform
+        p_name = platform_obj.name if platform_obj else "Unknown"
+        icon_f = f"{sanitize_filename(p_name)}.svg" if p_name != "Unknown" else "unknown.svg"
+
+        # NOTE: write BOTH lat/lon and latitude/longitude to nodes
+        node_props = {
+            "id": node_id,
+            "label": get_node_label(devices_list=devices),
+            "node_type": "DeviceGroup",
+            "country": country_code,
+            "location_name": loc_name,
+            "latitude": lat,
+            "longitude": lon,
+            "lat": lat,
+            "lon": lon,
+            "x": lon,
+            "y": lat,
+            "platform_name": p_name,
+            "icon_filename": icon_f,
+            "status": dev.status.name if dev.status else "Unknown",
+            "role": dev.role.name if dev.role else "Unknown",
+            # ✅ Nautobot: primary_ip4.host
+            "primary_ip": str(getattr(dev.primary_ip4, "host", "")) if dev.primary_ip4 else "",
+            "is_ha_pair": len(devices) > 1,
+            "model_name": dev.device_type.model if dev.device_type else "N/A",
+            "nautobot_device_pks": [str(d.pk) for d in devices],
+            "device_names": [d.name for d in devices],
+        }
+        add_lowercase_copies(node_props, NODE_LOWERCASE_PROPERTIES)
+        node_props["payload_hash"] = payload_hash(node_props)
+        return node_props
+
+    @staticmethod
+    def manual_peer_node_id(gw):
+        """Return the VPNNode id of the gateway's manually defined peer."""
+        return manual_peer_node_id(gw.peer_device_manual, gw.peer_location_manual)
+
+    def manual_peer_node(self, gw):
+        """Return the VPNNode payload for a peer that is only described by the gateway's manual fields."""
+        manual_peer_label = (gw.peer_device_manual or gw.peer_location_manual).strip()
+        node_id = self.manual_peer_node_id(gw)
+        icon_f = "unknown.svg"
+        if getattr(gw, "peer_platform", None) and getattr(gw.peer_platform, "name", None):
+            platform_name = gw.peer_platform.name.strip()
+            icon_f = (
+                f"{sanitize_filename(platform_name)}.svg"
+                if platform_name and platform_name.lower() != "unknown"
+                else "unknown.svg"
+            )
+
+        lat, lon = get_fallback_coords_by_country("UN", node_id)
+        node_props = {
+            "id": node_id,
+            "label": manual_peer_label,
+            "node_type": "DeviceGroup",
+            "country": "UN",
+            "location_name": gw.peer_location_manual or "",
+            "latitude": lat,
+            "longitude": lon,
+            "lat": lat,
+            "lon": lon,
+            "platform_name": getattr(getattr(gw, "peer_platform", None), "name", "Unknown") or "Unknown",
+            "icon_filename": icon_f,
+            "status": "Manual",
+            "role": "External",
+            "primary_ip": str(gw.peer_ip or "") or "",
+            "is_manual_peer": True,
+            "model_name": "",
+            "nautobot_device_pks": [],
+            "device_names": [manual_peer_label],
+        }
+        add_lowercase_copies(node_props, NODE_LOWERCASE_PROPERTIES)
+        node_props["payload_hash"] = payload_hash(node_props)
+        return node_props
+
+    def tunnel_edge(self, tunnel, gw, local_node_id, peer_node_id, local_devs_group, peer_devs_group):
+        """Return the TUNNEL relationship payload for one tunnel."""
+        local_ip_str = str(getattr(gw, "local_ip", "") or "")
+        peer_ip_str = str(getattr(gw, "peer_ip", "") or "")
+        scope_val = self.classify_scope(
+            local_ip_str,
+            peer_ip_str,
+            bool(local_devs_group),
+            bool(peer_devs_group),
+        )
+        status_name = getattr(tunnel.status, "name", "Unknown") if tunnel.status else "Unknown"
+        role_name = str(getattr(tunnel, "role", "") or "") or "Unknown"
+        ike_version = str(getattr(gw, "ike_version", "") or "") or "Unknown"
+        ipsec_profile_name = getattr(getattr(tunnel, "ipsec_crypto_profile", None), "name", None) or "N/A"
+        tunnel_interface_name = getattr(getattr(tunnel, "tunnel_interface", None), "name", None) or "N/A"
+        firewall_hostnames = ", ".join(
+            [d.name for d in local_devs_group + peer_devs_group if d and getattr(d, "name", None)]
+        )
+
+        tooltip_details = {
+            "Tunnel Name": tunnel.name or "N/A",
+            "Status": status_name,
+            "Role": role_name,
+            "IKE Gateway": getattr(gw, "name", "") or "N/A",
+            "IKE Version": ike_version,
+            "IPsec Profile": ipsec_profile_name,
+            "Tunnel Interface": tunnel_interface_name,
+            "Description": tunnel.description or "",
+            "Local IP": local_ip_str or "N/A",
+            "Peer IP": peer_ip_str or "N/A",
+            "Scope": scope_val,
+            "Firewalls": firewall_hostnames,
+        }
+
+        edge_props = {
+            "id": f"tunnel_{tunnel.pk}",
+            "label": tunnel.name or f"Tunnel {tunnel.pk}",
+            "nautobot_tunnel_pk": str(tunnel.pk),
+            "status": status_name,
+            "role": role_name,
+            "ike_gateway_name": getattr(gw, "name", "") or "N/A",
+            "ike_version": ike_version,
+            "ipsec_profile_name": ipsec_profile_name,
+            "tunnel_interface": tunnel_interface_name,
+            "description": tunnel.description or "",
+            "synced_at_utc": self.now_utc.isoformat(),
+            "local_ip": local_ip_str or "N/A",
+            "peer_ip": peer_ip_str or "N/A",
+            "scope": scope_val,  # ✅ for frontend color/filtering
+            "firewall_hostnames": firewall_hostnames,
+            # Single copy of the tooltip; the topology API exposes it to the frontend as `tooltip`.
+            "tooltip_details_json": json.dumps(tooltip_details, ensure_ascii=False),
+        }
+        add_lowercase_copies(edge_props, TUNNEL_LOWERCASE_PROPERTIES)
+        edge_props["payload_hash"] = payload_hash({"source_id": local_node_id, "target_id": peer_node_id, **edge_props})
+        return {"source_id": local_node_id, "target_id": peer_node_id, "properties": edge_props}
+
+    def tunnel_payloads(self, tunnel, known_node_ids=()):
+        """Return ``(nodes, edge)`` for one tunnel, or ``([], None)`` when it cannot be drawn.
+
+        `nodes` holds the local and peer VPNNode payloads, except those whose id is in `known_node_ids`
+        (already emitted by the caller), so shared HA groups are only built once per run.
+        """
+        gw: IKEGateway = tunnel.ike_gateway
+        if not gw:
+            return [], None
+
+        local_devs_group = list(gw.local_devices.all())
+        if not local_devs_group:
+            return [], None
+
+        peer_devs_group = list(gw.peer_devices.all())
+        nodes = []
+
+        # ---------- Local node ----------
+        local_node_id = get_node_id(devices_list=local_devs_group)
+        if local_node_id not in known_node_ids:
+            nodes.append(self.device_group_node(local_devs_group, gw.local_platform))
+
+        # ---------- Peer node ----------
+        if peer_devs_group:
+            peer_node_id = get_node_id(devices_list=peer_devs_group)
+            if peer_node_id not in known_node_ids:
+                nodes.append(self.device_group_node(peer_devs_group, gw.peer_platform))
+        elif (gw.peer_device_manual and gw.peer_device_manual.strip()) or (
+            gw.peer_location_manual and gw.peer_location_manual.strip()
+        ):
+            peer_node_id = self.manual_peer_node_id(gw)
+            if peer_node_id not in known_node_ids:
+                nodes.append(self.manual_peer_node(gw))
+        else:
+            logger.warning("No peer devices/manual peer data for tunnel %s (%s)", tunnel.name, tunnel.pk)
+            return nodes, None
+
+        # ---------- Edge ----------
+        edge = self.tunnel_edge(tunnel, gw, local_node_id, peer_node_id, local_devs_group, peer_devs_group)
+        return nodes, edge
+
+    def iter_payloads(self, tunnels):
+        """Lazily yield ``("node", props)`` and ``("edge", data)`` items for an iterable of tunnels.
+
+        Each VPNNode is yielded once, always before the first TUNNEL that references it, so a consumer can
+        write the stream in order without holding the whole graph in memory.
+        """
+        seen_node_ids = set()
+        for tunnel in tunnels:
+            nodes, edge = self.tunnel_payloads(tunnel, known_node_ids=seen_node_ids)
+            for node_props in nodes:
+                if node_props["id"] in seen_node_ids:
+                    continue
+                seen_node_ids.add(node_props["id"])
+                node_kind = "ManualPeer" if node_props.get("is_manual_peer") else "DeviceGroup"
+                self.node_counts[node_kind] += 1
+                yield "node", node_props
+            if edge:
+                self.edge_count += 1
+                yield "edge", edge
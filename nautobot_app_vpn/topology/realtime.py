@@ -0,0 +1,242 @@
+"""Near-real-time topology sync: coalesce model changes and apply them to Neo4j per tunnel."""
+# pylint: disable=broad-exception-caught
+
+import atexit
+import logging
+import os
+import threading
+import time
+
+from django.db import close_old_connections
+from django.db.models import Q
+
+from nautobot_app_vpn.models import IPSECTunnel
+from nautobot_app_vpn.topology.cache import bump_sync_generation
+from nautobot_app_vpn.topology.driver import get_neo4j_database, get_neo4j_driver, neo4j_is_configured
+from nautobot_app_vpn.topology.payloads import TopologyPayloadBuilder, load_interface_ip_index, tunnel_queryset
+from nautobot_app_vpn.topology.writer import ChunkedGraphWriter, get_sync_settings
+from nautobot_app_vpn.utils import get_app_settings
+
+logger = logging.getLogger(__name__)
+
+# Defaults for PLUGINS_CONFIG["nautobot_app_vpn"]["realtime_sync"].
+DEFAULT_REALTIME_SYNC_SETTINGS = {
+    "enabled": False,  # Connect the change signals and run the background worker
+    "debounce_seconds": 2.0,  # Quiet period after the last change before a batch is written
+    "max_delay_seconds": 10.0,  # Upper bound on how long a continuous burst of changes can postpone a write
+}
+
+# Kinds of changed objects the queue accepts; all of them are resolved to tunnel PKs by the worker.
+CHANGE_KINDS = ("tunnel", "gateway", "device", "location")
+
+EDGE_ENDPOINTS_QUERY = """
+UNWIND $edge_pks AS edge_pk
+MATCH (src:VPNNode)-[:TUNNEL {nautobot_tunnel_pk: edge_pk}]->(dst:VPNNode)
+RETURN src.id AS source_id, dst.id AS target_id
+"""
+
+
+def get_realtime_sync_settings():
+    """Realtime sync settings from PLUGINS_CONFIG["nautobot_app_vpn"]["realtime_sync"] merged over the defaults."""
+    config = {**DEFAULT_REALTIME_SYNC_SETTINGS, **get_app_settings("realtime_sync")}
+    config["enabled"] = bool(config["enabled"])
+    config["debounce_seconds"] = max(float(config["debounce_seconds"]), 0.0)
+    config["max_delay_seconds"] = max(float(config["max_delay_seconds"]), config["debounce_seconds"])
+    return config
+
+
+def resolve_tunnel_pks(changes):
+    """Turn a ``{kind: set(pks)}`` batch into the set of affected IPSECTunnel PKs (as strings)."""
+    tunnel_pks = {str(pk) for pk in changes.get("tunnel", ())}
+    related = Q()
+    if changes.get("gateway"):
+        related |= Q(ike_gateway__in=changes["gateway"])
+    if changes.get("device"):
+        related |= Q(ike_gateway__local_devices__in=changes["device"])
+        related |= Q(ike_gateway__peer_devices__in=changes["device"])
+    if changes.get("location"):
+        related |= Q(ike_gateway__local_devices__location__in=changes["location"])
+        related |= Q(ike_gateway__peer_devices__location__in=changes["location"])
+    if related:
+        tunnel_pks.update(str(pk) for pk in IPSECTunnel.objects.filter(related).values_list("pk", flat=True).distinct())
+    return tunnel_pks
+
+
+def apply_tunnel_changes(session, tunnel_pks, config=None):
+    """Upsert the graph for the given tunnels in one chunked pass and drop what they no longer reference.
+
+    Tunnels that were deleted (or can no longer be drawn) lose their TUNNEL relationship, and their former
+    endpoints are deleted when nothing else connects to them. Returns ``(edges_written, edges_deleted)``.
+    """
+    tunnel_pks = sorted(tunnel_pks)
+    previous_endpoints = set()
+    for record in session.run(EDGE_ENDPOINTS_QUERY, edge_pks=tunnel_pks):
+        previous_endpoints.update((record["source_id"], record["target_id"]))
+
+    tunnels = list(tunnel_queryset().filter(pk__in=tunnel_pks))
+    gateway_hosts = set()
+    for tunnel in tunnels:
+        if tunnel.ike_gateway:
+            gateway_hosts.update(
+                str(ip).split("/", maxsplit=1)[0]
+                for ip in (tunnel.ike_gateway.local_ip, tunnel.ike_gateway.peer_ip)
+                if ip
+            )
+    builder = TopologyPayloadBuilder(ip_index=load_interface_ip_index(hosts=gateway_hosts))
+
+    written_node_ids = set()
+    drawn_tunnel_pks = set()
+
+    def tracked(items):
+        for kind, payload in items:
+            if kind == "node":
+                written_node_ids.add(payload["id"])
+            else:
+                drawn_tunnel_pks.add(payload["properties"]["nautobot_tunnel_pk"])
+            yield kind, payload
+
+    writer = ChunkedGraphWriter(session, job_logger=logger, config=config)
+    _, edges_written = writer.write_graph(tracked(builder.iter_payloads(tunnels)), repoint_edges=True)
+
+    stale_edge_pks = [pk for pk in tunnel_pks if pk not in drawn_tunnel_pks]
+    if stale_edge_pks:
+        writer.delete_edges(stale_edge_pks)
+    stale_node_ids = sorted(previous_endpoints - written_node_ids)
+    if stale_node_ids:
+        writer.delete_isolated_nodes(stale_node_ids)
+    return edges_written, len(stale_edge_pks)
+
+
+def apply_topology_changes(changes):
+    """Worker callback: resolve a coalesced batch of changes and write it to Neo4j."""
+    tunnel_pks = resolve_tunnel_pks(changes)
+    if not tunnel_pks:
+        return
+    if not neo4j_is_configured():
+        logger.warning(
+            "Realtime topology sync skipped %s tunnel(s): Neo4j settings are not configured.", len(tunnel_pks)
+        )
+        return
+
+    started = time.monotonic()
+    with get_neo4j_driver().session(database=get_neo4j_database()) as session:
+        edges_written, edges_deleted = apply_tunnel_changes(session, tunnel_pks, config=get_sync_settings())
+    bump_sync_generation()
+    logger.info(
+        "Realtime topology sync: %s tunnel(s) affected, %s upserted, %s removed in %.3fs.",
+        len(tunnel_pks),
+        edges_written,
+        edges_deleted,
+        time.monotonic() - started,
+    )
+
+
+class TopologyChangeQueue:
+    """Debounced, coalescing queue of changed objects drained by a single background thread.
+
+    Changes are collected per kind in sets, so repeated edits of the same object collapse into one entry. The
+    worker waits until no change arrived for `debounce_seconds` (but never longer than `max_delay_seconds` after
+    the first change of a batch) and then hands the whole batch to `apply_func` at once.
+    """
+
+    def __init__(self, apply_func, debounce_seconds=2.0, max_delay_seconds=10.0):
+        """Initialize an empty queue; the worker thread is started on the first change."""
+        self.apply_func = apply_func
+        self.debounce_seconds = debounce_seconds
+        self.max_delay_seconds = max_delay_seconds
+        self._condition = threading.Condition()
+        self._pending = {kind: set() for kind in CHANGE_KINDS}
+        self._first_change = None
+        self._last_change = None
+        self._thread = None
+        self._pid = None
+
+    def _has_pending(self):
+        return any(self._pending.values())
+
+    def _take_pending(self):
+        batch = self._pending
+        self._pending = {kind: set() for kind in CHANGE_KINDS}
+        self._first_change = self._last_change = None
+        return batch
+
+    def _reset_after_fork(self):
+        # Threads and locks do not survive fork(): a pre-forking server's workers each get a fresh, empty queue.
+        self._condition = threading.Condition()
+        self._pending = {kind: set() for kind in CHANGE_KINDS}
+        self._first_change = self._last_change = None
+        self._thread = None
+        self._pid = os.getpid()
+
+    def enqueue(self, kind, pks):
+        """Queue changed objects of one kind (see CHANGE_KINDS) for the next batch."""
+        if kind not in CHANGE_KINDS:
+            raise ValueError(f"Unknown topology change kind: {kind}")
+        pks = {pk for pk in pks if pk is not None}
+        if not pks:
+            return
+        if self._pid != os.getpid():
+            self._reset_after_fork()
+        with self._condition:
+            now = time.monotonic()
+            self._pending[kind].update(pks)
+            self._first_change = self._first_change or now
+            self._last_change = now
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._run, name="vpn-topology-sync", daemon=True)
+                self._thread.start()
+            self._condition.notify()
+
+    def flush(self):
+        """Apply everything that is pending right now in the calling thread."""
+        with self._condition:
+            batch = self._take_pending() if self._has_pending() else None
+        if batch:
+            self._apply(batch)
+
+    def _apply(self, batch):
+        try:
+            self.apply_func(batch)
+        except Exception as exc:
+            logger.error("Realtime topology sync failed for %s: %s", batch, exc, exc_info=True)
+        finally:
+            close_old_connections()
+
+    def _run(self):
+        while True:
+            with self._condition:
+                while not self._has_pending():
+                    self._condition.wait()
+                while self._has_pending():
+                    deadline = min(
+                        self._last_change + self.debounce_seconds, self._first_change + self.max_delay_seconds
+                    )
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        break
+                    self._condition.wait(remaining)
+                # flush() may have taken the batch in the meantime.
+                batch = self._take_pending() if self._has_pending() else None
+            if batch:
+                self._apply(batch)
+
+
+_change_queue = None
+_change_queue_lock = threading.Lock()
+
+
+def get_change_queue():
+    """Return the process-wide TopologyChangeQueue, creating it from the app settings on first use."""
+    global _change_queue  # pylint: disable=global-statement
+    if _change_queue is None:
+        with _change_queue_lock:
+            if _change_queue is None:
+                config = get_realtime_sync_settings()
+                _change_queue = TopologyChangeQueue(
+                    apply_topology_changes,
+                    debounce_seconds=config["debounce_seconds"],
+                    max_delay_seconds=config["max_delay_seconds"],
+                )
+                # Best effort: don't lose the last few edits of a short-lived process (nbshell, management commands).
+                atexit.register(_change_queue.flush)
+    return _change_queue
@@ -0,0 +1,81 @@
+"""Idempotent Neo4j schema bootstrap for the VPN topology graph: constraints, indexes and lowercase backfill."""
+
+import logging
+
+from neo4j import exceptions as neo4j_exceptions
+
+from nautobot_app_vpn.topology.payloads import NODE_LOWERCASE_PROPERTIES, TUNNEL_LOWERCASE_PROPERTIES
+
+logger = logging.getLogger(__name__)
+
+# Lowercase node properties filtered with CONTAINS get TEXT indexes (substring seeks), the rest range indexes.
+NODE_TEXT_INDEX_PROPERTIES = frozenset({"label_lc", "platform_lc", "location_lc"})
+
+# (name, statement) pairs; every statement is a no-op when the constraint or index already exists.
+SCHEMA_STATEMENTS = (
+    (
+        "vpn_node_id_unique",
+        "CREATE CONSTRAINT vpn_node_id_unique IF NOT EXISTS FOR (n:VPNNode) REQUIRE n.id IS UNIQUE",
+    ),
+    (
+        "vpn_tunnel_pk",
+        "CREATE INDEX vpn_tunnel_pk IF NOT EXISTS FOR ()-[r:TUNNEL]-() ON (r.nautobot_tunnel_pk)",
+    ),
+    *(
+        (f"vpn_node_{prop}", f"CREATE INDEX vpn_node_{prop} IF NOT EXISTS FOR (n:VPNNode) ON (n.{prop})")
+        for prop in NODE_LOWERCASE_PROPERTIES.values()
+        if prop not in NODE_TEXT_INDEX_PROPERTIES
+    ),
+    *(
+        (f"vpn_node_{prop}_text", f"CREATE TEXT INDEX vpn_node_{prop}_text IF NOT EXISTS FOR (n:VPNNode) ON (n.{prop})")
+        for prop in sorted(NODE_TEXT_INDEX_PROPERTIES)
+    ),
+    *(
+        (f"vpn_tunnel_{prop}", f"CREATE INDEX vpn_tunnel_{prop} IF NOT EXISTS FOR ()-[r:TUNNEL]-() ON (r.{prop})")
+        for prop in TUNNEL_LOWERCASE_PROPERTIES.values()
+    ),
+)
+
+
+def _backfill_query(pattern, var, mapping, batch_size):
+    missing = " OR ".join(f"({var}.{src} IS NOT NULL AND {var}.{dst} IS NULL)" for src, dst in mapping.items())
+    assignments = ", ".join(f"{var}.{dst} = toLower(toString({var}.{src}))" for src, dst in mapping.items())
+    return (
+        f"MATCH {pattern} WHERE {missing} "
+        f"CALL {{ WITH {var} SET {assignments} }} IN TRANSACTIONS OF {int(batch_size)} ROWS"
+    )
+
+
+def backfill_queries(batch_size=1000):
+    """Auto-commit statements adding missing lowercase copies to a graph written before they existed."""
+    return {
+        "nodes": _backfill_query("(n:VPNNode)", "n", NODE_LOWERCASE_PROPERTIES, batch_size),
+        "tunnels": _backfill_query("(:VPNNode)-[r:TUNNEL]->(:VPNNode)", "r", TUNNEL_LOWERCASE_PROPERTIES, batch_size),
+    }
+
+
+def ensure_topology_schema(session, batch_size=1000, job_logger=None):
+    """Create the topology constraints and indexes and backfill lowercase filter properties.
+
+    Safe to run repeatedly. A statement that Neo4j rejects (e.g. duplicate ids preventing the uniqueness
+    constraint, or missing schema privileges) is logged and reported without stopping the others.
+    Returns ``{"applied": [names], "failed": {name: error}, "backfilled": {"nodes": n, "tunnels": n}}``.
+    """
+    log = job_logger or logger
+    result = {"applied": [], "failed": {}, "backfilled": {}}
+    for name, statement in SCHEMA_STATEMENTS:
+        try:
+            session.run(statement).consume()
+            result["applied"].append(name)
+        except neo4j_exceptions.Neo4jError as exc:
+            log.warning("Could not create Neo4j schema object %s: %s", name, exc)
+            result["failed"][name] = str(exc)
+
+    for kind, query in backfill_queries(batch_size).items():
+        try:
+            counters = session.run(query).consume().counters
+            result["backfilled"][kind] = counters.properties_set
+        except neo4j_exceptions.Neo4jError as exc:
+            log.warning("Could not backfill lowercase %s properties: %s", kind, exc)
+            result["failed"][f"backfill_{kind}"] = str(exc)
+    return result
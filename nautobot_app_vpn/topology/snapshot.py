@@ -0,0 +1,98 @@
+"""Compressed snapshots of the unfiltered dashboard topology, written once per sync run."""
+
+import gzip
+import logging
+
+from django.db import DatabaseError, transaction
+from rest_framework.renderers import JSONRenderer
+
+from nautobot_app_vpn.models import TopologySnapshot
+from nautobot_app_vpn.topology.cache import get_sync_state
+from nautobot_app_vpn.topology.columnar import columnar_payload
+from nautobot_app_vpn.topology.stats import topology_response_payload
+
+logger = logging.getLogger(__name__)
+
+# Written once per sync and read on every cold dashboard load, so favour ratio over compression speed.
+SNAPSHOT_COMPRESSLEVEL = 9
+
+# Responses are compressed per request, at the level Django's GZipMiddleware uses.
+RESPONSE_COMPRESSLEVEL = 6
+
+# A snapshot is stored per API renderer format, each converting the JSON payload to its wire form first.
+SNAPSHOT_FORMATS = {
+    "json": lambda payload: payload,
+    "columnar": columnar_payload,
+}
+
+# Last member of the snapshot's "meta" object, standing in for the tunnel statistics of the requesting user.
+TUNNEL_STATS_MARKER = "__tunnel_statistics__"
+
+
+def _json_members(data):
+    """Serialise the dict `data` like the API's JSON renderer, without the enclosing braces."""
+    return JSONRenderer().render(data)[1:-1]
+
+
+# The marker member as rendered, with the comma separating it from the previous "meta" member.
+_MARKER_MEMBER = b"," + _json_members({TUNNEL_STATS_MARKER: None})
+
+
+def render_snapshot_payload(payload):
+    """Serialise `payload` like the API's JSON renderers; the result must hold the TUNNEL_STATS_MARKER member."""
+    rendered = JSONRenderer().render(payload)
+    if _MARKER_MEMBER not in rendered:
+        raise ValueError(f"Topology snapshot payload has no {TUNNEL_STATS_MARKER} member")
+    return rendered
+
+
+def snapshot_body(snapshot, tunnel_stats, compress=True):
+    """Return the topology response stored in `snapshot` with `tunnel_stats` in place of the marker in "meta".
+
+    The stored gzip stream is decompressed and, with `compress`, the complete body is compressed again as a single
+    gzip member, so the response is an ordinary gzip stream whatever the size of the statistics.
+    """
+    head, _, tail = gzip.decompress(bytes(snapshot.payload)).rpartition(_MARKER_MEMBER)
+    members = _json_members(tunnel_stats)
+    body = head + (b"," + members if members else b"") + tail
+    if not compress:
+        return body
+    return gzip.compress(body, compresslevel=RESPONSE_COMPRESSLEVEL, mtime=0)
+
+
+def write_topology_snapshot(backend):
+    """Build the unfiltered topology response from `backend` and store it, per format, for the current generation.
+
+    The relational tunnel statistics are left out (they depend on the user and change between syncs) and merged
+    in by `snapshot_body` when a snapshot is served. Older snapshots of the backend are removed. Returns the new
+    TopologySnapshot rows.
+    """
+    sync_state = get_sync_state()
+    payload = topology_response_payload(backend.build_graph({}), sync_state, {TUNNEL_STATS_MARKER: None})
+    rendered = {fmt: render_snapshot_payload(convert(payload)) for fmt, convert in SNAPSHOT_FORMATS.items()}
+    with transaction.atomic():
+        snapshots = [
+            TopologySnapshot.objects.update_or_create(
+                backend=backend.name,
+                generation=sync_state["generation"],
+                format=fmt,
+                defaults={
+                    "payload": gzip.compress(body, compresslevel=SNAPSHOT_COMPRESSLEVEL, mtime=0),
+                    "size": len(body),
+                },
+            )[0]
+            for fmt, body in rendered.items()
+        ]
+        TopologySnapshot.objects.filter(backend=backend.name).exclude(
+            pk__in=[snapshot.pk for snapshot in snapshots]
+        ).delete()
+    return snapshots
+
+
+def get_topology_snapshot(backend_name, generation, fmt="json"):
+    """Return the `fmt` snapshot of `backend_name` for exactly `generation`, or None."""
+    try:
+        return TopologySnapshot.objects.filter(backend=backend_name, generation=generation, format=fmt).first()
+    except DatabaseError as db_error:
+        logger.debug("Unable to load topology snapshot due to database error: %s", db_error, exc_info=True)
+        return None
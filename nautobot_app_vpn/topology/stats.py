@@ -0,0 +1,106 @@
+"""Relational tunnel statistics shown alongside the topology graph."""
+
+import logging
+
+from django.core.exceptions import FieldDoesNotExist
+from django.db import DatabaseError
+from django.db.models import Count, Q
+from nautobot.extras.models import Status
+
+logger = logging.getLogger(__name__)
+
+
+def _has_field(model, field_name):
+    try:
+        model._meta.get_field(field_name)
+    except FieldDoesNotExist:
+        return False
+    return True
+
+
+# Older Nautobot releases had Status.slug; resolved once instead of introspecting the model per request.
+STATUS_HAS_SLUG = _has_field(Status, "slug")
+STATUS_VALUE_FIELDS = ("status__name", "status__slug") if STATUS_HAS_SLUG else ("status__name",)
+
+
+def tunnel_statistics(tunnels_qs, filters):
+    """Tunnel counts by status and role over `tunnels_qs`, narrowed by the "status" / "role" entries of `filters`."""
+    tracked_status = [
+        ("active", "Active"),
+        ("down", "Down"),
+        ("decommissioned", "Decommissioned"),
+        ("disabled", "Disabled"),
+        ("planned", "Planned"),
+    ]
+    status_counts = {slug: 0 for slug, _ in tracked_status}
+    status_labels = dict(tracked_status)
+    status_order = [slug for slug, _ in tracked_status]
+
+    role_labels = {
+        "primary": "Primary",
+        "secondary": "Secondary",
+        "tertiary": "Tertiary",
+        "unassigned": "Unassigned",
+    }
+    role_counts = {key: 0 for key in role_labels}
+    role_order = ["primary", "secondary", "tertiary"]
+    total_tunnels = 0
+
+    try:
+        status_filter = filters.get("status", "")
+        role_filter = filters.get("role", "")
+
+        if status_filter:
+            status_lookup = Q(status__name__iexact=status_filter)
+            if STATUS_HAS_SLUG:
+                status_lookup |= Q(status__slug__iexact=status_filter)
+            tunnels_qs = tunnels_qs.filter(status_lookup)
+
+        if role_filter:
+            tunnels_qs = tunnels_qs.filter(role__iexact=role_filter)
+
+        # One grouped query per (status, role) pair; status, role and overall totals are summed from it.
+        for row in tunnels_qs.order_by().values(*STATUS_VALUE_FIELDS, "role").annotate(total=Count("id")):
+            status_name = (row.get("status__name") or "").strip()
+            raw_key = row.get("status__slug") if STATUS_HAS_SLUG else status_name
+            slug_key = (raw_key or status_name or "unknown").strip().lower().replace(" ", "-")
+            if not slug_key:
+                slug_key = "unknown"
+            status_counts[slug_key] = status_counts.get(slug_key, 0) + row["total"]
+            status_labels[slug_key] = status_name or status_labels.get(slug_key, slug_key.title())
+            if slug_key not in status_order:
+                status_order.append(slug_key)
+
+            role_value = (row["role"] or "unassigned").lower()
+            role_counts[role_value] = role_counts.get(role_value, 0) + row["total"]
+            if role_value not in role_order:
+                role_order.append(role_value)
+
+            total_tunnels += row["total"]
+    except DatabaseError as agg_exc:
+        logger.error("Failed to compute relational tunnel statistics: %s", agg_exc, exc_info=True)
+
+    return {
+        "status_counts": status_counts,
+        "status_labels": status_labels,
+        "status_order": status_order,
+        "role_counts": role_counts,
+        "role_labels": role_labels,
+        "role_order": role_order,
+        "total_tunnels": total_tunnels,
+        "total_primary_tunnels": role_counts.get("primary", 0),
+        "total_secondary_tunnels": role_counts.get("secondary", 0),
+        "total_tertiary_tunnels": role_counts.get("tertiary", 0),
+        "total_unassigned_tunnels": role_counts.get("unassigned", 0),
+    }
+
+
+def topology_response_payload(graph, sync_state, tunnel_stats):
+    """Assemble the dashboard topology response from a backend graph, the sync state and tunnel statistics."""
+    meta = {
+        **graph["meta"],
+        "last_synced": sync_state["last_synced"],
+        "last_sync_status": sync_state["last_sync_status"],
+        **tunnel_stats,
+    }
+    return {"devices": graph["devices"], "tunnels": graph["tunnels"], "stats": graph["stats"], "meta": meta}
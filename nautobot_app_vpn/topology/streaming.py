@@ -0,0 +1,63 @@
+"""Incremental JSON encoding of the topology response for streamed (StreamingHttpResponse) delivery."""
+
+import json
+import logging
+
+from nautobot_app_vpn.topology.backends import GraphSummary
+from nautobot_app_vpn.topology.stats import topology_response_payload
+
+logger = logging.getLogger(__name__)
+
+# Features encoded per yielded chunk: large enough to avoid tiny socket writes, small enough to keep memory flat.
+STREAM_CHUNK_FEATURES = 500
+
+
+def _dumps(value):
+    # Same output as DRF's JSONRenderer defaults (compact separators, unescaped unicode).
+    return json.dumps(value, ensure_ascii=False, separators=(",", ":"))
+
+
+def stream_topology_json(items, sync_state, tunnel_stats, chunk_features=STREAM_CHUNK_FEATURES):
+    """Yield the topology response for `items` (see TopologyBackend.iter_graph) as UTF-8 JSON chunks.
+
+    The body has the same content as the regular response, with the keys in the order ``devices``, ``tunnels``,
+    ``stats``, ``meta``: the graph stats and meta are accumulated while the features pass through and written in
+    the trailing section. If the backend fails mid-stream, the arrays are closed and the trailer carries an
+    ``error`` entry instead of stats, as the status code has already been sent.
+    """
+    summary = GraphSummary()
+    add = {"devices": summary.add_device, "tunnels": summary.add_tunnel}
+    section = "devices"
+    yield b'{"devices":{"type":"FeatureCollection","features":['
+    batch = []
+    first = True
+    error = None
+    try:
+        for kind, feature in items:
+            if kind != section:
+                if batch:
+                    yield ((b"" if first else b",") + ",".join(batch).encode("utf-8"))
+                yield b']},"tunnels":{"type":"FeatureCollection","features":['
+                section, batch, first = kind, [], True
+            add[kind](feature)
+            batch.append(_dumps(feature))
+            if len(batch) >= chunk_features:
+                yield ((b"" if first else b",") + ",".join(batch).encode("utf-8"))
+                batch, first = [], False
+    except Exception as exc:  # pylint: disable=broad-exception-caught
+        logger.error("Topology stream aborted: %s", exc, exc_info=True)
+        error = "Could not retrieve topology data."
+
+    if batch:
+        yield ((b"" if first else b",") + ",".join(batch).encode("utf-8"))
+    if section == "devices":
+        yield b']},"tunnels":{"type":"FeatureCollection","features":['
+    if error is not None:
+        yield f']}},"error":{_dumps(error)}}}'.encode("utf-8")
+        return
+
+    stats, meta = summary.result()
+    payload = topology_response_payload(
+        {"devices": None, "tunnels": None, "stats": stats, "meta": meta}, sync_state, tunnel_stats
+    )
+    yield f']}},"stats":{_dumps(payload["stats"])},"meta":{_dumps(payload["meta"])}}}'.encode("utf-8")
@@ -0,0 +1,104 @@
+"""Mapbox Vector Tile encoding of the topology "devices" and "tunnels" layers.
+
+Needs the optional ``mapbox-vector-tile`` package (``pip install nautobot-app-vpn[tiles]``); `tiles_available()`
+reports whether it is installed.
+"""
+
+import json
+import math
+
+try:
+    import mapbox_vector_tile
+    from shapely.geometry import LineString
+    from shapely.ops import clip_by_rect
+except ImportError:  # pragma: no cover - optional dependency
+    mapbox_vector_tile = None
+
+from nautobot_app_vpn.topology.viewport import MAX_ZOOM, crop_graph, mercator
+
+MVT_CONTENT_TYPE = "application/vnd.mapbox-vector-tile"
+# Tile coordinate space and the margin kept around it, so symbols and line joins render across tile edges.
+TILE_EXTENT = 4096
+TILE_BUFFER = 64
+
+
+def tiles_available():
+    """Whether the optional mapbox-vector-tile dependency is installed."""
+    return mapbox_vector_tile is not None
+
+
+def valid_tile(z, x, y):
+    """Whether ``z/x/y`` addresses an existing tile."""
+    return 0 <= z <= MAX_ZOOM and 0 <= x < 2**z and 0 <= y < 2**z
+
+
+def tile_bbox(z, x, y, buffer=0):
+    """``[min_lon, min_lat, max_lon, max_lat]`` of tile ``z/x/y``, grown by `buffer` tile units on every side."""
+    n = 2**z
+    margin = buffer / TILE_EXTENT
+
+    def lon(tx):
+        return tx / n * 360.0 - 180.0
+
+    def lat(ty):
+        return math.degrees(math.atan(math.sinh(math.pi * (1 - 2 * ty / n))))
+
+    return [lon(x - margin), lat(min(y + 1 + margin, n)), lon(x + 1 + margin), lat(max(y - margin, 0))]
+
+
+def _tile_point(coords, z, x, y):
+    """Project ``[lon, lat]`` into the tile's coordinate space (origin top left, y down)."""
+    mx, my = mercator(float(coords[0]), float(coords[1]))
+    scale = (2**z) * TILE_EXTENT
+    return mx * scale - x * TILE_EXTENT, my * scale - y * TILE_EXTENT
+
+
+def _mvt_properties(props):
+    """MVT attributes only hold scalars: lists are joined, mappings JSON-encoded and nulls dropped."""
+    attrs = {}
+    for key, value in (props or {}).items():
+        if value is None or key.startswith("__"):
+            continue
+        if isinstance(value, (list, tuple)):
+            value = ", ".join(str(item) for item in value)
+        elif isinstance(value, dict):
+            value = json.dumps(value, sort_keys=True)
+        attrs[key] = value
+    return attrs
+
+
+def encode_tile(graph, z, x, y):
+    """Encode the features of a topology `graph` that fall into tile ``z/x/y`` as an MVT tile.
+
+    Devices become points of the "devices" layer and tunnels lines of the "tunnels" layer, clipped to the
+    buffered tile, with the GeoJSON properties as attributes.
+    """
+    if mapbox_vector_tile is None:
+        raise RuntimeError("Vector tiles need the optional 'mapbox-vector-tile' package.")
+
+    low, high = -TILE_BUFFER, TILE_EXTENT + TILE_BUFFER
+    candidates = crop_graph(graph, tile_bbox(z, x, y, buffer=TILE_BUFFER))
+
+    devices = []
+    for feature in candidates["devices"]["features"]:
+        px, py = _tile_point(feature["geometry"]["coordinates"], z, x, y)
+        if low <= px <= high and low <= py <= high:
+            devices.append(
+                {
+                    "geometry": {"type": "Point", "coordinates": [px, py]},
+                    "properties": _mvt_properties(feature["properties"]),
+                }
+            )
+
+    tunnels = []
+    for feature in candidates["tunnels"]["features"]:
+        line = LineString([_tile_point(c, z, x, y) for c in feature["geometry"]["coordinates"]])
+        clipped = clip_by_rect(line, low, low, high, high)
+        if clipped.is_empty or clipped.geom_type not in ("LineString", "MultiLineString"):
+            continue
+        tunnels.append({"geometry": clipped, "properties": _mvt_properties(feature["properties"])})
+
+    return mapbox_vector_tile.encode(
+        [{"name": "devices", "features": devices}, {"name": "tunnels", "features": tunnels}],
+        default_options={"y_coord_down": True, "extents": TILE_EXTENT},
+    )
@@ -0,0 +1,205 @@
+"""Viewport (bbox) cropping and zoom-dependent server-side clustering of the topology GeoJSON.
+
+Clustering uses a grid aligned with the Web Mercator tiles MapLibre renders: at zoom ``z`` every 256px tile is
+split into ``256 / cluster_grid_size`` cells per axis. Cells holding several devices become one cluster point,
+and tunnels between cells are bundled into one line per cell pair carrying the tunnel counts.
+"""
+
+import math
+from collections import Counter, defaultdict
+
+MAX_ZOOM = 24
+MAX_MERCATOR_LAT = 85.0511287798
+
+
+class ViewportError(ValueError):
+    """Invalid ``zoom`` / ``bbox`` query parameters."""
+
+
+def parse_viewport(params):
+    """Return ``{"zoom": int, "bbox": [min_lon, min_lat, max_lon, max_lat]}`` with the given keys only.
+
+    `bbox` is ``min_lon,min_lat,max_lon,max_lat`` in degrees; ``min_lon > max_lon`` denotes a box crossing the
+    antimeridian. Raises ViewportError for malformed values.
+    """
+    viewport = {}
+    zoom = str(params.get("zoom") or "").strip()
+    if zoom:
+        try:
+            viewport["zoom"] = int(float(zoom))
+        except (ValueError, OverflowError) as exc:  # "nan" / "inf"
+            raise ViewportError("zoom must be a number.") from exc
+        if not 0 <= viewport["zoom"] <= MAX_ZOOM:
+            raise ViewportError(f"zoom must be between 0 and {MAX_ZOOM}.")
+
+    bbox = str(params.get("bbox") or "").strip()
+    if bbox:
+        try:
+            min_lon, min_lat, max_lon, max_lat = (float(part) for part in bbox.split(","))
+        except ValueError as exc:
+            raise ViewportError("bbox must be 'min_lon,min_lat,max_lon,max_lat'.") from exc
+        if min_lat > max_lat or not all(math.isfinite(value) for value in (min_lon, min_lat, max_lon, max_lat)):
+            raise ViewportError("bbox must be 'min_lon,min_lat,max_lon,max_lat'.")
+        # Round so that near-identical viewports share cache entries and ETags.
+        viewport["bbox"] = [round(value, 4) for value in (min_lon, min_lat, max_lon, max_lat)]
+    return viewport
+
+
+def mercator(lon, lat):
+    """Normalised Web Mercator ``(x, y)`` in ``[0, 1]`` for a lon/lat pair."""
+    lat = max(-MAX_MERCATOR_LAT, min(MAX_MERCATOR_LAT, lat))
+    x = (lon + 180.0) / 360.0
+    y = (1.0 - math.log(math.tan(math.radians(lat)) + 1.0 / math.cos(math.radians(lat))) / math.pi) / 2.0
+    return x, y
+
+
+def grid_cell(coords, zoom, grid_size):
+    """Grid cell ``(cx, cy)`` of `coords` (``[lon, lat]``) at `zoom`, with `grid_size` pixel cells."""
+    cells = (2**zoom) * max(1, 256 // max(1, int(grid_size)))
+    x, y = mercator(float(coords[0]), float(coords[1]))
+    return min(int(x * cells), cells - 1), min(int(y * cells), cells - 1)
+
+
+def _dominant(counts):
+    return max(sorted(counts), key=counts.get) if counts else "unknown"
+
+
+def cluster_graph(graph, zoom, grid_size):
+    """Return a copy of `graph` with devices clustered per grid cell and tunnels bundled per cell pair.
+
+    Single-device cells keep their original feature, as do single tunnels between two such cells. Cluster
+    points carry ``cluster``, ``point_count``, ``status_counts`` and ``internal_tunnels``; bundles carry
+    ``bundle``, ``tunnel_count`` and ``status_counts``. `stats` and `meta` still describe the whole graph.
+    """
+    members = defaultdict(list)
+    for feature in graph["devices"]["features"]:
+        members[grid_cell(feature["geometry"]["coordinates"], zoom, grid_size)].append(feature)
+
+    devices = []
+    clustered_cells = {}
+    for cell, features in members.items():
+        if len(features) == 1:
+            devices.append(features[0])
+            continue
+        lon = sum(f["geometry"]["coordinates"][0] for f in features) / len(features)
+        lat = sum(f["geometry"]["coordinates"][1] for f in features) / len(features)
+        status_counts = Counter((f["properties"].get("status") or "unknown").lower() for f in features)
+        cluster = {
+            "type": "Feature",
+            "geometry": {"type": "Point", "coordinates": [lon, lat]},
+            "properties": {
+                "id": f"cluster:{zoom}:{cell[0]}:{cell[1]}",
+                "name": f"{len(features)} sites",
+                "cluster": True,
+                "point_count": len(features),
+                "status": _dominant(status_counts),
+                "status_counts": dict(status_counts),
+                "internal_tunnels": 0,
+                "search_text": " ".join(f["properties"].get("name") or "" for f in features),
+            },
+        }
+        clustered_cells[cell] = cluster
+        devices.append(cluster)
+
+    def endpoint(coords):
+        cell = grid_cell(coords, zoom, grid_size)
+        cluster = clustered_cells.get(cell)
+        return cell, (cluster["geometry"]["coordinates"] if cluster else list(coords)), cluster is not None
+
+    bundles = defaultdict(list)
+    for feature in graph["tunnels"]["features"]:
+        source, target = feature["geometry"]["coordinates"][0], feature["geometry"]["coordinates"][-1]
+        source_cell, source_point, source_clustered = endpoint(source)
+        target_cell, target_point, target_clustered = endpoint(target)
+        if source_cell == target_cell and source_clustered:
+            clustered_cells[source_cell]["properties"]["internal_tunnels"] += 1
+            continue
+        key = tuple(sorted((source_cell, target_cell)))
+        bundles[key].append((feature, source_point, target_point, source_clustered or target_clustered))
+
+    tunnels = []
+    for (cell_a, cell_b), entries in bundles.items():
+        if len(entries) == 1 and not entries[0][3]:
+            tunnels.append(entries[0][0])
+            continue
+        _, source_point, target_point, _ = entries[0]
+        status_counts = Counter((entry[0]["properties"].get("status") or "unknown").lower() for entry in entries)
+        tunnels.append(
+            {
+                "type": "Feature",
+                "geometry": {"type": "LineString", "coordinates": [source_point, target_point]},
+                "properties": {
+                    "name": f"{len(entries)} tunnels",
+                    "bundle": True,
+                    "bundle_id": f"bundle:{zoom}:{cell_a[0]}:{cell_a[1]}:{cell_b[0]}:{cell_b[1]}",
+                    "tunnel_count": len(entries),
+                    "status": _dominant(status_counts),
+                    "status_counts": dict(status_counts),
+                    "role": "",
+                    "ike_version": "",
+                    "scope": "",
+                    "tooltip": "",
+                },
+            }
+        )
+
+    return {
+        "devices": {"type": "FeatureCollection", "features": devices},
+        "tunnels": {"type": "FeatureCollection", "features": tunnels},
+        "stats": graph["stats"],
+        "meta": {**graph["meta"], "clusters_count": len(clustered_cells)},
+    }
+
+
+def _lon_in(lon, min_lon, max_lon):
+    if min_lon <= max_lon:
+        return min_lon <= lon <= max_lon
+    return lon >= min_lon or lon <= max_lon
+
+
+def _point_in(coords, bbox):
+    return _lon_in(coords[0], bbox[0], bbox[2]) and bbox[1] <= coords[1] <= bbox[3]
+
+
+def _extent_overlaps(coords, bbox):
+    """Whether the extent of a line overlaps `bbox` (conservative: may keep a line passing just outside)."""
+    lons = [c[0] for c in coords]
+    lats = [c[1] for c in coords]
+    if max(lats) < bbox[1] or min(lats) > bbox[3]:
+        return False
+    if bbox[0] <= bbox[2]:
+        return not (max(lons) < bbox[0] or min(lons) > bbox[2])
+    return max(lons) >= bbox[0] or min(lons) <= bbox[2]
+
+
+def crop_graph(graph, bbox):
+    """Return a copy of `graph` keeping devices inside `bbox` and tunnels whose extent overlaps it."""
+    devices = [f for f in graph["devices"]["features"] if _point_in(f["geometry"]["coordinates"], bbox)]
+    tunnels = [f for f in graph["tunnels"]["features"] if _extent_overlaps(f["geometry"]["coordinates"], bbox)]
+    return {
+        "devices": {"type": "FeatureCollection", "features": devices},
+        "tunnels": {"type": "FeatureCollection", "features": tunnels},
+        "stats": graph["stats"],
+        "meta": graph["meta"],
+    }
+
+
+def viewport_graph(graph, viewport, clustered=False):
+    """Crop `graph` (already clustered when `clustered`) to the bbox of a parsed `viewport`.
+
+    `meta` gains a ``viewport`` entry with the zoom, bbox, whether clustering applied and the returned counts,
+    next to the unchanged whole-graph counts.
+    """
+    if viewport.get("bbox"):
+        graph = crop_graph(graph, viewport["bbox"])
+    meta = {
+        **graph["meta"],
+        "viewport": {
+            "zoom": viewport.get("zoom"),
+            "bbox": viewport.get("bbox"),
+            "clustered": clustered,
+            "devices_returned": len(graph["devices"]["features"]),
+            "tunnels_returned": len(graph["tunnels"]["features"]),
+        },
+    }
+    return {**graph, "meta": meta}
@@ -0,0 +1,211 @@
+"""Chunked writes of VPNNode / TUNNEL payloads to Neo4j."""
+# pylint: disable=broad-exception-caught
+
+import logging
+import os
+import time
+from itertools import islice
+
+from nautobot_app_vpn.utils import get_app_settings
+
+logger = logging.getLogger(__name__)
+
+# Defaults for PLUGINS_CONFIG["nautobot_app_vpn"]["sync"].
+DEFAULT_SYNC_SETTINGS = {
+    "batch_size": 1000,  # Rows per UNWIND statement / write transaction
+    "queryset_chunk_size": 500,  # Tunnels fetched (and prefetched) per database round trip
+    "retry_failed_chunks": True,  # Retry a failed chunk on its own instead of failing the whole sync
+    "chunk_retries": 2,  # Retries per failed chunk before giving up
+    "bootstrap_schema": True,  # Ensure Neo4j constraints/indexes before writing (see topology.schema)
+    "write_snapshot": True,  # Store a pre-compressed unfiltered dashboard payload after each successful sync
+}
+
+NODE_UPSERT_QUERY = """
+UNWIND $nodes_batch AS node_props
+MERGE (n:VPNNode {id: node_props.id})
+SET n = node_props
+"""
+
+EDGE_REPOINT_QUERY = """
+UNWIND $edges_batch AS edge_data
+MATCH (src:VPNNode)-[old:TUNNEL {nautobot_tunnel_pk: edge_data.properties.nautobot_tunnel_pk}]->(dst:VPNNode)
+WHERE src.id <> edge_data.source_id OR dst.id <> edge_data.target_id
+DELETE old
+"""
+
+EDGE_UPSERT_QUERY = """
+UNWIND $edges_batch AS edge_data
+MATCH (src:VPNNode {id: edge_data.source_id})
+MATCH (dst:VPNNode {id: edge_data.target_id})
+MERGE (src)-[r:TUNNEL {nautobot_tunnel_pk: edge_data.properties.nautobot_tunnel_pk}]->(dst)
+SET r = edge_data.properties
+"""
+
+EDGE_DELETE_QUERY = """
+UNWIND $edge_pks AS edge_pk
+MATCH (:VPNNode)-[r:TUNNEL {nautobot_tunnel_pk: edge_pk}]->(:VPNNode)
+DELETE r
+"""
+
+NODE_DELETE_QUERY = """
+UNWIND $node_ids AS node_id
+MATCH (n:VPNNode {id: node_id})
+DETACH DELETE n
+"""
+
+ISOLATED_NODE_DELETE_QUERY = """
+UNWIND $node_ids AS node_id
+MATCH (n:VPNNode {id: node_id})
+WHERE NOT (n)-[:TUNNEL]-()
+DELETE n
+"""
+
+
+def get_sync_settings():
+    """Sync settings from PLUGINS_CONFIG["nautobot_app_vpn"]["sync"] merged over the defaults."""
+    config = {**DEFAULT_SYNC_SETTINGS, **get_app_settings("sync")}
+    config["batch_size"] = max(int(config["batch_size"]), 1)
+    config["queryset_chunk_size"] = max(int(config["queryset_chunk_size"]), 1)
+    config["chunk_retries"] = max(int(config["chunk_retries"]), 0)
+    config["bootstrap_schema"] = bool(config["bootstrap_schema"])
+    config["write_snapshot"] = bool(config["write_snapshot"])
+    return config
+
+
+def chunked(iterable, size):
+    """Yield lists of at most `size` items from any iterable without materialising it."""
+    iterator = iter(iterable)
+    while chunk := list(islice(iterator, size)):
+        yield chunk
+
+
+def process_rss_mib():
+    """Return the current resident set size of this process in MiB, or None where it cannot be read."""
+    try:
+        with open("/proc/self/statm", encoding="ascii") as statm:
+            resident_pages = int(statm.read().split()[1])
+        return resident_pages * os.sysconf("SC_PAGE_SIZE") / (1024 * 1024)
+    except (OSError, ValueError, IndexError, AttributeError):
+        pass
+    try:
+        import resource  # pylint: disable=import-outside-toplevel
+
+        # Peak rather than current RSS on platforms without /proc; kilobytes on Linux, bytes on macOS.
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+    except (ImportError, OSError):
+        return None
+
+
+class ChunkedGraphWriter:
+    """Write VPNNode / TUNNEL payloads to Neo4j in bounded chunks, one write transaction per chunk.
+
+    Every chunk is timed and logged together with the process RSS. A chunk that fails is retried on its own
+    (when `retry_failed_chunks` is enabled), so chunks that were already committed are never re-sent.
+    """
+
+    def __init__(self, session, job_logger=None, config=None):
+        """Initialize the writer for an open Neo4j session."""
+        self.session = session
+        self.logger = job_logger or logger
+        self.config = config or get_sync_settings()
+        self.chunk_numbers = {}
+        self.rows_written = {}
+        self.peak_rss_mib = process_rss_mib()
+
+    def _track_memory(self):
+        rss = process_rss_mib()
+        if rss is not None and (self.peak_rss_mib is None or rss > self.peak_rss_mib):
+            self.peak_rss_mib = rss
+        return rss
+
+    def write_chunk(self, label, queries, param_name, chunk):
+        """Write one chunk in its own transaction, retrying it on failure; raise RuntimeError if it keeps failing."""
+        chunk_number = self.chunk_numbers[label] = self.chunk_numbers.get(label, 0) + 1
+        attempts = 1 + (self.config["chunk_retries"] if self.config["retry_failed_chunks"] else 0)
+
+        def _work(tx):
+            for query in queries:
+                tx.run(query, {param_name: chunk}).consume()
+
+        for attempt in range(1, attempts + 1):
+            started = time.monotonic()
+            try:
+                self.session.execute_write(_work)
+            except Exception as exc:
+                self.logger.warning(
+                    "%s chunk %s (%s rows) failed after %.3fs (attempt %s/%s): %s",
+                    label,
+                    chunk_number,
+                    len(chunk),
+                    time.monotonic() - started,
+                    attempt,
+                    attempts,
+                    exc,
+                )
+                continue
+            rss = self._track_memory()
+            self.logger.info(
+                "%s chunk %s: %s rows in %.3fs%s",
+                label,
+                chunk_number,
+                len(chunk),
+                time.monotonic() - started,
+                f" (RSS {rss:.1f} MiB)" if rss is not None else "",
+            )
+            self.rows_written[label] = self.rows_written.get(label, 0) + len(chunk)
+            return len(chunk)
+        raise RuntimeError(f"{label} chunk {chunk_number} ({len(chunk)} rows) failed after {attempts} attempt(s).")
+
+    def write(self, label, queries, param_name, rows):
+        """Write any iterable of rows in fixed-size chunks; returns the number of rows written."""
+        written = 0
+        for chunk in chunked(rows, self.config["batch_size"]):
+            written += self.write_chunk(label, queries, param_name, chunk)
+        return written
+
+    def write_graph(self, items, repoint_edges=False):
+        """Consume a stream of ``("node", props)`` / ``("edge", data)`` items and upsert them in chunks.
+
+        Pending nodes are always flushed before a chunk of edges, so every TUNNEL finds both of its endpoints.
+        With `repoint_edges`, relationships whose endpoints changed are removed before the MERGE.
+        """
+        batch_size = self.config["batch_size"]
+        edge_queries = [EDGE_REPOINT_QUERY, EDGE_UPSERT_QUERY] if repoint_edges else [EDGE_UPSERT_QUERY]
+        node_buffer = []
+        edge_buffer = []
+
+        def _flush_nodes():
+            if node_buffer:
+                self.write_chunk("VPNNode upsert", [NODE_UPSERT_QUERY], "nodes_batch", node_buffer[:])
+                node_buffer.clear()
+
+        def _flush_edges():
+            _flush_nodes()
+            if edge_buffer:
+                self.write_chunk("TUNNEL upsert", edge_queries, "edges_batch", edge_buffer[:])
+                edge_buffer.clear()
+
+        for kind, payload in items:
+            if kind == "node":
+                node_buffer.append(payload)
+                if len(node_buffer) >= batch_size:
+                    _flush_nodes()
+            else:
+                edge_buffer.append(payload)
+                if len(edge_buffer) >= batch_size:
+                    _flush_edges()
+        _flush_edges()
+
+        return self.rows_written.get("VPNNode upsert", 0), self.rows_written.get("TUNNEL upsert", 0)
+
+    def delete_edges(self, edge_pks):
+        """Delete TUNNEL relationships by Nautobot tunnel pk."""
+        return self.write("Orphan TUNNEL delete", [EDGE_DELETE_QUERY], "edge_pks", edge_pks)
+
+    def delete_nodes(self, node_ids):
+        """Detach-delete VPNNodes by id."""
+        return self.write("Orphan VPNNode delete", [NODE_DELETE_QUERY], "node_ids", node_ids)
+
+    def delete_isolated_nodes(self, node_ids):
+        """Delete those of the given VPNNodes that no longer have any TUNNEL relationship."""
+        return self.write("Isolated VPNNode delete", [ISOLATED_NODE_DELETE_QUERY], "node_ids", node_ids)
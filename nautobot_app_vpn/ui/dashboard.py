@@ -51,6 +51,8 @@ class VPNDashboardUIViewSet(NautobotUIViewSet):
             "MAP_INITIAL_ZOOM": map_cfg.get("initial_zoom", 1.7),
             "MAP_INITIAL_PITCH": map_cfg.get("initial_pitch", 0),
             "MAP_INITIAL_BEARING": map_cfg.get("initial_bearing", 0),
+            # Load devices/tunnels as vector tiles from the topology-tiles endpoint instead of one GeoJSON
+            "MAP_VECTOR_TILES": bool(map_cfg.get("vector_tiles", False)),
         }
 
     def list(self, request, *args, **kwargs):
@@ -10,6 +10,7 @@ from nautobot_app_vpn.api.serializers import IKEGatewaySerializer
 from nautobot_app_vpn.filters import IKEGatewayFilterSet
 from nautobot_app_vpn.forms.ikegateway import IKEGatewayFilterForm, IKEGatewayForm
 from nautobot_app_vpn.models import IKEGateway
+from nautobot_app_vpn.models.querysets import annotate_ikegateway_list
 from nautobot_app_vpn.tables import IKEGatewayTable
 
 logger = logging.getLogger(__name__)
@@ -30,6 +31,14 @@ class IKEGatewayUIViewSet(NautobotUIViewSet):
     filterset_form_class = IKEGatewayFilterForm
     default_return_url = "plugins:nautobot_app_vpn:ikegateway_list"
 
+    def get_queryset(self):
+        """Compute the table's device and location name columns in SQL for the list view."""
+        queryset = super().get_queryset()
+        if self.action == "list":
+            # The annotations replace the relation prefetches; BaseTable still prefetches any visible M2M column.
+            queryset = annotate_ikegateway_list(queryset.prefetch_related(None))
+        return queryset
+
     def bulk_destroy(self, request, *args, **kwargs):
         """Bulk delete selected IKE Gateways."""
 
@@ -12,6 +12,7 @@ from nautobot_app_vpn.forms import IPSecProxyIDFormSet, IPSECTunnelFilterForm, I
 
 # Import models, forms, etc.
 from nautobot_app_vpn.models import IPSECTunnel
+from nautobot_app_vpn.models.querysets import annotate_ipsectunnel_list
 from nautobot_app_vpn.tables import IPSECTunnelTable
 
 logger = logging.getLogger(__name__)
@@ -38,6 +39,14 @@ class IPSECTunnelUIViewSet(NautobotUIViewSet):
     filterset_form_class = IPSECTunnelFilterForm
     default_return_url = "plugins:nautobot_app_vpn:ipsectunnel_list"
 
+    def get_queryset(self):
+        """Compute the table's device names and proxy ID count in SQL for the list view."""
+        queryset = super().get_queryset()
+        if self.action == "list":
+            # The annotations replace the relation prefetches; BaseTable still prefetches any visible M2M column.
+            queryset = annotate_ipsectunnel_list(queryset.prefetch_related(None))
+        return queryset
+
     def create(self, request, *args, **kwargs):
         """Handle creation of IPSec Tunnel and its associated Proxy IDs."""
 
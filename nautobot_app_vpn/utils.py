@@ -1,5 +1,6 @@
 """Utility functions for the Nautobot VPN plugin."""
 
+from django.conf import settings
 from nautobot.extras.models import Status
 
 
@@ -14,3 +15,8 @@ def get_default_status():
 def get_valid_statuses():
     """Returns a queryset of valid status options for use in forms or validation."""
     return Status.objects.filter(name__in=["Active", "Planned", "Staging", "Decommissioned", "Down"])
+
+
+def get_app_settings(section):
+    """Returns the PLUGINS_CONFIG["nautobot_app_vpn"][section] dictionary, or an empty dict when not configured."""
+    return getattr(settings, "PLUGINS_CONFIG", {}).get("nautobot_app_vpn", {}).get(section) or {}